@@ -0,0 +1,183 @@
+"""Animator：所有动画共用的一个帧时钟，取代各自串起来的 root.after 链"""
+"""
+- animate(duration_ms, update, ...) 登记一段补间：每个 tick 用真实时间算出进度 t∈[0,1]，
+  经过缓动函数后交给 update(t)；到 1 之后调用 on_done 并把自己删掉
+- call_later(ms, fn, ...) 就是时长为 0 的补间，用来排定机器人出手、下一步走棋
+- 每段补间属于一个分组，cancel(group) 一次取消整组（重新开局、读档时 cancel() 全部取消）
+- 只有一个 root.after 在排队：有补间在播放时按帧间隔 tick，只剩延时任务时直接睡到最早的那个；
+  机器卡顿时进度照样按时间走，中间的帧直接丢掉，总时长不变
+- 登记表里只有还没结束的补间，占用只和正在播放的动画数量有关
+- speed 是整体倍速：之后登记的补间时长和延时都除以它（正在播放的不受影响）
+"""
+
+import time
+import tkinter as tk
+from typing import Callable, Dict, Optional, Set
+
+FRAME_MS = 16 # 约 60 帧每秒
+
+
+def linear(t: float) -> float:
+    return t
+
+
+def ease_out_quad(t: float) -> float:
+    return 1 - (1 - t) * (1 - t)
+
+
+def ease_in_out_cubic(t: float) -> float:
+    return 4 * t * t * t if t < 0.5 else 1 - (-2 * t + 2) ** 3 / 2
+
+
+class Tween:
+    __slots__ = ("id", "group", "start", "duration", "update", "easing", "on_done")
+
+    def __init__(self, tween_id: int, group: str, start: float, duration: float,
+                 update: Optional[Callable[[float], None]], easing: Callable[[float], float],
+                 on_done: Optional[Callable[[], None]]):
+        self.id = tween_id
+        self.group = group
+        self.start = start
+        self.duration = duration
+        self.update = update
+        self.easing = easing
+        self.on_done = on_done
+
+
+class Animator:
+    def __init__(self, root, frame_ms: int = FRAME_MS, clock: Callable[[], float] = time.perf_counter):
+        self.root = root
+        self.frame = frame_ms / 1000
+        self.clock = clock
+        self._tweens: Dict[int, Tween] = {}
+        self._groups: Dict[str, Set[int]] = {}
+        self._next_id = 0
+        self._after_id = None
+        self._wake_at = None
+        self._last_tick = None
+        self.speed = 1.0
+        """统计：tick 次数、因为卡顿丢掉的帧数"""
+        self.ticks = 0
+        self.dropped = 0
+
+    def __len__(self):
+        return len(self._tweens)
+
+    def active(self, group: Optional[str] = None) -> bool:
+        if group is None:
+            return bool(self._tweens)
+        return bool(self._groups.get(group))
+
+    def animate(self, duration_ms: float, update: Optional[Callable[[float], None]], group: str = "default",
+                easing: Callable[[float], float] = linear, delay_ms: float = 0,
+                on_done: Optional[Callable[[], None]] = None) -> int:
+        """登记一段补间，返回它的 id（可以交给 cancel_tween）"""
+        self._next_id += 1
+        scale = 1000 * self.speed
+        tween = Tween(self._next_id, group, self.clock() + delay_ms / scale, max(0.0, duration_ms / scale),
+                      update, easing, on_done)
+        self._tweens[tween.id] = tween
+        self._groups.setdefault(group, set()).add(tween.id)
+        self._wake(tween.start)
+        return tween.id
+
+    def call_later(self, ms: float, fn: Callable[[], None], group: str = "default") -> int:
+        return self.animate(0, None, group, delay_ms=ms, on_done=fn)
+
+    def cancel_tween(self, tween_id: int, finish: bool = False):
+        tween = self._tweens.get(tween_id)
+        if tween is not None:
+            self._drop(tween)
+            if finish and tween.update is not None:
+                self._apply(tween, 1.0)
+
+    def cancel(self, group: Optional[str] = None, finish: bool = False):
+        """
+        取消一组（group=None 时取消全部）补间，on_done 不会再被调用。
+        finish=True 时先把补间直接放到终点，画面停在它本该到达的位置。
+        """
+        ids = list(self._tweens) if group is None else list(self._groups.get(group, ()))
+        for tween_id in ids:
+            self.cancel_tween(tween_id, finish)
+        if not self._tweens:
+            self._stop()
+            self._last_tick = None
+
+    # --- 时钟 ---
+    def _drop(self, tween: Tween):
+        del self._tweens[tween.id]
+        members = self._groups[tween.group]
+        members.discard(tween.id)
+        if not members:
+            del self._groups[tween.group]
+
+    def _apply(self, tween: Tween, t: float) -> bool:
+        """画一帧；界面已经销毁（TclError）时返回 False"""
+        try:
+            tween.update(tween.easing(t))
+        except tk.TclError:
+            return False
+        return True
+
+    def _stop(self):
+        if self._after_id is not None:
+            try:
+                self.root.after_cancel(self._after_id)
+            except Exception:
+                pass
+        self._after_id = None
+        self._wake_at = None
+
+    def _wake(self, at: float):
+        """保证在 at 之前会 tick 一次；已经排了更早的就不动"""
+        if self._wake_at is not None and self._wake_at <= at:
+            return
+        self._stop()
+        try:
+            if not self.root.winfo_exists():
+                return
+        except tk.TclError:
+            return
+        self._wake_at = at
+        delay = max(1, int(round((at - self.clock()) * 1000)))
+        self._after_id = self.root.after(delay, self._tick)
+
+    def _tick(self):
+        self._after_id = None
+        self._wake_at = None
+        now = self.clock()
+        self.ticks += 1
+        if self._last_tick is not None and now - self._last_tick > self.frame * 1.5:
+            self.dropped += int((now - self._last_tick) / self.frame) - 1
+        self._last_tick = now
+
+        try:
+            self._advance(now)
+        finally:
+            self._reschedule(now)
+
+    def _advance(self, now: float):
+        # 回调里可能登记新的补间或取消别的组，所以遍历一份拷贝
+        for tween in list(self._tweens.values()):
+            if tween.id not in self._tweens or tween.start > now:
+                continue
+            t = 1.0 if tween.duration == 0 else min(1.0, (now - tween.start) / tween.duration)
+            if tween.update is not None and not self._apply(tween, t):
+                self._drop(tween)
+                continue
+            if t >= 1.0:
+                self._drop(tween)
+                if tween.on_done is not None:
+                    tween.on_done()
+
+    def _reschedule(self, now: float):
+        if not self._tweens:
+            self._last_tick = None
+            return
+        # 有补间在播放就按帧间隔来，否则睡到最早的延时任务开始
+        running = any(tween.start <= now for tween in self._tweens.values())
+        if running:
+            self._wake(now + self.frame)
+        else:
+            self._last_tick = None
+            self._wake(min(tween.start for tween in self._tweens.values()))
@@ -0,0 +1,107 @@
+"""Autosaver：在后台线程里自动存档，界面线程只负责拷贝状态"""
+"""
+- submit(game) 在主线程里只做 snapshot.capture()（拷贝几个整数和字符串），立刻返回
+- 编码和写盘都在后台线程完成：先写 .tmp 并 fsync，再 os.replace 改名，
+  所以任何时刻磁盘上要么是旧的完整存档，要么是新的完整存档
+- 合并写入：两次写盘之间至少间隔 interval 秒，这段时间里提交的状态只保留最新的一份，
+  bot 对战再快也最多每个间隔写一次
+"""
+
+import atexit
+import os
+import threading
+import time
+from typing import Optional
+
+import snapshot
+
+AUTOSAVE_INTERVAL = 2.0
+EXIT_WAIT = 1.0 # 进程退出时最多等待最后一次写盘的秒数
+
+
+class Autosaver:
+    def __init__(self, path: str, interval: float = AUTOSAVE_INTERVAL):
+        self.path = path
+        self.interval = interval
+        self.submitted = 0
+        self.written = 0
+        self.last_error: Optional[OSError] = None
+        self._pending = None
+        self._closed = False
+        self._urgent = False
+        self._busy = False
+        self._cond = threading.Condition()
+        self._thread = threading.Thread(target=self._run, name="autosave", daemon=True)
+        self._thread.start()
+        atexit.register(self.close, EXIT_WAIT)
+
+    def submit(self, game):
+        """登记当前局面；只替换待写的那一份，不等待 I/O"""
+        state = snapshot.capture(game)
+        with self._cond:
+            self._pending = state
+            self.submitted += 1
+            self._cond.notify_all()
+
+    def _run(self):
+        last_write = float("-inf")
+        while True:
+            with self._cond:
+                while self._pending is None and not self._closed:
+                    self._cond.wait()
+                if self._pending is None: # 已关闭且没有待写内容
+                    return
+                # 距离上次写盘不足一个间隔时先等着，期间到来的新状态直接覆盖旧的
+                delay = last_write + self.interval - time.monotonic()
+                while delay > 0 and not (self._closed or self._urgent):
+                    self._cond.wait(delay)
+                    delay = last_write + self.interval - time.monotonic()
+                state, self._pending = self._pending, None
+                self._busy = True
+                closing = self._closed
+            try:
+                self._write(snapshot.encode_captured(state))
+                self.written += 1
+                self.last_error = None
+            except (OSError, ValueError) as e: # 写失败时保留上一次的完整存档
+                self.last_error = e
+            last_write = time.monotonic()
+            with self._cond:
+                self._busy = False
+                self._cond.notify_all()
+            if closing:
+                return
+
+    def _write(self, data: bytes):
+        """先写临时文件并刷到磁盘，再原子地改名覆盖"""
+        tmp = self.path + ".tmp"
+        with open(tmp, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.path)
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """不等间隔立即写出待写的状态，并等它落盘；超时返回 False"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            self._urgent = True
+            self._cond.notify_all()
+            try:
+                while self._pending is not None or self._busy:
+                    remaining = None if deadline is None else deadline - time.monotonic()
+                    if remaining is not None and remaining <= 0:
+                        return False
+                    self._cond.wait(remaining)
+                return True
+            finally:
+                self._urgent = False
+
+    def close(self, wait: float = 0):
+        """停止后台线程；还没写的最新状态仍会被写出。wait > 0 时最多等待这么多秒。"""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        atexit.unregister(self.close)
+        if wait > 0:
+            self._thread.join(wait)
@@ -0,0 +1,146 @@
+"""批量模拟引擎：用 NumPy 数组同时推进 N 局 × P 名玩家"""
+"""规则与 Game.take_turn 完全一致：越界规则和蛇梯都查 GameRules 编译好的表，掷出最大点数再掷一次、先到终点者胜"""
+
+import numpy as np
+from typing import Optional
+
+from board import Board
+from dice import Dice
+from rules import GameRules
+
+
+class BatchResult:
+    """一批模拟的结果（每个数组的下标就是对局编号）"""
+    def __init__(self, turns: np.ndarray, winners: np.ndarray, moves: int):
+        # 每局结束时的回合数（与 Game.turn 相同：0 号玩家掷骰时 +1）；未结束为 0
+        self.turns = turns
+        # 每局胜者的玩家下标；达到 max_turns 仍未结束的为 -1
+        self.winners = winners
+        # 整批一共执行的玩家移动次数（用于计算吞吐量）
+        self.moves = moves
+
+    def __len__(self):
+        return len(self.turns)
+
+    def __repr__(self):
+        return f"BatchResult(games={len(self)}, moves={self.moves})"
+
+
+class BatchSimulator:
+    def __init__(self,
+                 board: Board,
+                 num_players: int = 2,
+                 dice: Dice = None,
+                 seed: Optional[int] = None,
+                 max_turns: int = 10000,
+                 rules: GameRules = None):
+        if num_players < 1:
+            raise ValueError("num_players must be at least 1")
+        self.rules = rules if rules else GameRules()
+        if self.rules.has_choices:
+            raise ValueError("batch simulation does not support rules with choices (choose_die / allow_skip)")
+        self.board = board
+        self.num_players = num_players
+        self.dice = dice if dice else Dice()
+        self.max_turns = max_turns
+        self.rng = np.random.default_rng(seed)
+        self.final_square = board.final_square
+        # 每行 max_roll+1 列（第 0 列不用），这样 行号*stride+点数 就是扁平下标
+        self.stride = self.dice.max_roll + 1
+        self.table = self._build_table()
+        prob, alias, offset = self.dice.alias_table()
+        self._alias = (np.array(prob), np.array(alias), offset)
+
+    def _build_table(self) -> np.ndarray:
+        """把按规则编译好的 after_roll 表展开成一维数组，下标为 格子*stride+点数"""
+        return np.array(self.rules.table(self.board, self.dice.max_roll), dtype=np.int32).ravel()
+
+    def _draw_rolls(self, shape) -> np.ndarray:
+        """批量抽取点数；公平单骰直接取均匀整数，其余情况用骰子的别名表向量化抽样"""
+        if self.dice.is_fair_single():
+            return self.rng.integers(1, self.dice.sides + 1, size=shape, dtype=np.int32)
+        prob, alias, offset = self._alias
+        idx = self.rng.integers(0, prob.size, size=shape)
+        pick = np.where(self.rng.random(shape) < prob[idx], idx, alias[idx])
+        return (pick + offset).astype(np.int32)
+
+    def run(self, num_games: int) -> BatchResult:
+        """同时模拟 num_games 局，返回每局回合数与胜者"""
+        players = self.num_players
+        final = self.final_square
+        table = self.table
+        stride = self.stride
+
+        turns = np.zeros(num_games, dtype=np.int32)
+        winners = np.full(num_games, -1, dtype=np.int8 if players < 128 else np.int32)
+        # pos[p] 是所有进行中的对局里第 p 名玩家的位置，ids 是这些对局的编号
+        pos = np.zeros((players, num_games), dtype=np.int32)
+        ids = np.arange(num_games)
+        moves = 0
+
+        for turn in range(1, self.max_turns + 1):
+            if ids.size == 0:
+                break
+            # 一次性为这一回合的所有玩家抽取点数
+            rolls = self._draw_rolls((players, ids.size))
+            # done 标记本回合内已经分出胜负的对局；这些对局后面的玩家不再算作移动
+            done = None
+            for p in range(players):
+                start = pos[p]
+                new_pos = table[start * stride + rolls[p]]
+                if self.rules.extra_roll:
+                    moves += self._bonus_rolls(start, new_pos, rolls[p], done)
+                pos[p] = new_pos
+                won = new_pos == final
+                if done is None:
+                    moves += ids.size
+                    if not won.any():
+                        continue
+                    done = won
+                else:
+                    moves += ids.size - int(np.count_nonzero(done))
+                    won &= ~done
+                    if not won.any():
+                        continue
+                    done |= won
+                finished = ids[won]
+                turns[finished] = turn
+                winners[finished] = p
+
+            # 回合结束后用掩码一次性把已结束的对局移出活动数组
+            if done is not None:
+                keep = ~done
+                ids = ids[keep]
+                pos = pos[:, keep]
+
+        return BatchResult(turns, winners, moves)
+
+    def _bonus_rolls(self, start: np.ndarray, pos: np.ndarray, first: np.ndarray, done: Optional[np.ndarray]) -> int:
+        """
+        掷出最大点数的对局原地再掷，直到没掷出、到达终点或连续次数达到 penalty_streak
+        （作废的那一步退回这一轮开始的格子）。直接修改 pos，返回额外的移动次数（不含本回合已结束的对局）。
+        与 Game.move_current 的规则相同。
+        """
+        top, limit = self.dice.max_roll, self.rules.penalty_streak
+        table, stride, final = self.table, self.stride, self.final_square
+        streak = (first == top).astype(np.int32)
+        if limit:
+            forfeit = streak >= limit
+            pos[forfeit] = start[forfeit]
+            again = np.flatnonzero((streak > 0) & ~forfeit & (pos != final))
+        else:
+            again = np.flatnonzero((streak > 0) & (pos != final))
+        extra = 0
+        while again.size:
+            extra += again.size if done is None else int(np.count_nonzero(~done[again]))
+            rolls = self._draw_rolls(again.size)
+            bonus = rolls == top
+            streak[again] = np.where(bonus, streak[again] + 1, 0)
+            moved = table[pos[again] * stride + rolls]
+            if limit:
+                forfeit = bonus & (streak[again] >= limit)
+                moved[forfeit] = start[again[forfeit]]
+                bonus &= ~forfeit
+            pos[again] = moved
+            again = again[bonus & (moved != final)]
+        return extra
@@ -0,0 +1,58 @@
+"""大棋盘的构造时间和内存：几何按需计算，整张查找表第一次用到时才生成"""
+"""用法: python bench_board.py [边长]  （默认 1000，即 1000×1000 = 一百万格）"""
+
+import random
+import sys
+import time
+import tracemalloc
+
+from board import Board, DEFAULT_LADDERS, DEFAULT_SNAKES
+
+ROUNDS = 2000
+
+
+def _timeit(fn, rounds: int = ROUNDS) -> float:
+    """返回每次调用的平均微秒数"""
+    start = time.perf_counter()
+    for _ in range(rounds):
+        fn()
+    return (time.perf_counter() - start) / rounds * 1e6
+
+
+def _allocated(fn) -> int:
+    """fn() 执行完后仍然存活的字节数（结果保持引用直到测完）"""
+    tracemalloc.start()
+    result = fn()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del result
+    return size
+
+
+def main(side: int):
+    final = side * side
+    print(f"{side}x{side} board, {final} squares")
+    build = lambda: Board(DEFAULT_LADDERS, DEFAULT_SNAKES, rows=side, numbering="boustrophedon")
+    print(f"construct                 {_timeit(build):9.2f} us   {_allocated(build) / 1024:9.1f} KiB")
+
+    board = build()
+    rng = random.Random(0)
+    squares = [rng.randint(1, final) for _ in range(ROUNDS)]
+    it = iter(squares * 10)
+    print(f"square_center             {_timeit(lambda: board.square_center(next(it), 7000), ROUNDS * 10):9.3f} us")
+    it = iter(squares * 10)
+    print(f"land (one move)           {_timeit(lambda: board.land(next(it), 6), ROUNDS * 10):9.3f} us")
+
+    # 只有批量模拟、精确分析这类需要整张表的场景才付出生成的代价
+    tables = [("dest table (on demand)", lambda: build().dest)]
+    if final <= 1_000_000:
+        tables.append(("eager Point dict (old)", lambda: build().generate_square_coordinates()))
+    for label, fn in tables:
+        start = time.perf_counter()
+        fn()
+        elapsed = time.perf_counter() - start
+        print(f"{label:25s} {elapsed * 1e3:9.1f} ms   {_allocated(fn) / 2 ** 20:9.1f} MiB")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1000)
@@ -0,0 +1,81 @@
+"""测量掷骰动画每一帧的开销：旧的整画布合成 vs 新的小图 + coords 移动"""
+"""用法: python bench_dice_animation.py  （需要图形界面；没有显示器时只测不依赖 Tk 的合成部分）"""
+
+import time
+import tkinter as tk
+
+from PIL import Image, ImageTk
+
+import dice_renderer
+
+WINDOW_PX = 700
+DICE_SIZE = 64
+ROUNDS = 300
+
+
+def _arc(i: int, frames: int):
+    t = i / (frames - 1)
+    return int(60 + (WINDOW_PX // 2 - 60) * t), int(60 + (WINDOW_PX // 2 - 60) * t - 150 * (4 * t * (1 - t)))
+
+
+def _per_frame(fn, frames: int) -> float:
+    """返回每帧的平均微秒数"""
+    start = time.perf_counter()
+    for k in range(ROUNDS):
+        fn(k % frames)
+    return (time.perf_counter() - start) / ROUNDS * 1e6
+
+
+def main():
+    atlas = dice_renderer.get_atlas(DICE_SIZE)
+    frames = atlas.frames
+
+    def compose(i):
+        canvas_img = Image.new('RGBA', (WINDOW_PX, WINDOW_PX), (0, 0, 0, 0))
+        x, y = _arc(i, len(frames))
+        canvas_img.paste(frames[i], (x - DICE_SIZE // 2, y - DICE_SIZE // 2), frames[i])
+        return canvas_img
+
+    print(f"old compose only (no Tk)   {_per_frame(compose, len(frames)):9.1f} us/frame")
+
+    try:
+        root = tk.Tk()
+    except tk.TclError as e:
+        print(f"no display, skipping Tk measurements ({e})")
+        return
+    canvas = tk.Canvas(root, width=WINDOW_PX, height=WINDOW_PX)
+    canvas.pack()
+    root.update()
+
+    keep = []
+    full_item = canvas.create_image(0, 0, anchor=tk.NW)
+
+    def old_frame(i):
+        photo = ImageTk.PhotoImage(compose(i))
+        keep[:] = [photo]
+        canvas.itemconfig(full_item, image=photo)
+        root.update_idletasks()
+
+    print(f"old compose + upload + draw {_per_frame(old_frame, len(frames)):9.1f} us/frame")
+    canvas.delete(full_item)
+
+    photos = [ImageTk.PhotoImage(img) for img in frames]
+    item = canvas.create_image(0, 0, image=photos[0])
+
+    def new_frame(i):
+        canvas.coords(item, *_arc(i, len(frames)))
+        canvas.itemconfig(item, image=photos[i])
+        root.update_idletasks()
+
+    print(f"new coords + cached photo   {_per_frame(new_frame, len(frames)):9.1f} us/frame")
+
+    def new_frame_nodraw(i):
+        canvas.coords(item, *_arc(i, len(frames)))
+        canvas.itemconfig(item, image=photos[i])
+
+    print(f"new, callback cost only     {_per_frame(new_frame_nodraw, len(frames)):9.1f} us/frame")
+    root.destroy()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""对比逐像素的旧实现与 image_ops 向量化实现：结果是否一致、快多少"""
+"""用法: python bench_image_ops.py [图片 ...]  （默认使用四张动物图片）"""
+
+import os
+import sys
+import time
+
+from PIL import Image
+
+import image_ops
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_IMAGES = ["monkey.png", "elephant.png", "giraffe.png", "panda.png"]
+TOLERANCE = 50
+
+
+def remove_background_reference(img: Image.Image, tolerance: int = 50) -> Image.Image:
+    """原 GameUI._remove_background 的逐像素实现（只用于对照）"""
+    if img.mode != 'RGBA':
+        img = img.convert('RGBA')
+    width, height = img.size
+    corner_colors = [img.getpixel((0, 0)), img.getpixel((width - 1, 0)),
+                     img.getpixel((0, height - 1)), img.getpixel((width - 1, height - 1))]
+    bg_color = tuple(sum(c[i] for c in corner_colors) // len(corner_colors) for i in range(3))
+    new_data = []
+    for item in img.getdata():
+        r, g, b, a = item
+        dist = ((r - bg_color[0]) ** 2 + (g - bg_color[1]) ** 2 + (b - bg_color[2]) ** 2) ** 0.5
+        new_data.append((r, g, b, 0) if dist < tolerance else item)
+    new_img = Image.new('RGBA', img.size)
+    new_img.putdata(new_data)
+    return new_img
+
+
+def to_grayscale_reference(img: Image.Image) -> Image.Image:
+    """原 _draw_all_players 里电脑玩家分支的逐像素灰度化（只用于对照）"""
+    new_data = []
+    for item in img.getdata():
+        avg_color = int(sum(item[:3]) / 3)
+        new_data.append(tuple([avg_color] * 3 + [item[3]]))
+    new_img = Image.new('RGBA', img.size)
+    new_img.putdata(new_data)
+    return new_img
+
+
+def _best(fn, rounds: int) -> float:
+    """多次运行取最快一次（秒）"""
+    best = float("inf")
+    for _ in range(rounds):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main(paths):
+    total_old = total_new = 0.0
+    for path in paths:
+        img = Image.open(path).convert('RGBA')
+        img.load()
+
+        ref = remove_background_reference(img, TOLERANCE)
+        new = image_ops.remove_background(img, TOLERANCE)
+        same_bg = ref.tobytes() == new.tobytes()
+        same_gray = to_grayscale_reference(ref).tobytes() == image_ops.to_grayscale(new).tobytes()
+
+        old_t = _best(lambda: to_grayscale_reference(remove_background_reference(img, TOLERANCE)), 1)
+        new_t = _best(lambda: image_ops.to_grayscale(image_ops.remove_background(img, TOLERANCE)), 10)
+        feather_t = _best(lambda: image_ops.remove_background(img, TOLERANCE, feather=20), 10)
+        total_old += old_t
+        total_new += new_t
+        print(f"{os.path.basename(path):14s} {img.width}x{img.height:<5d} "
+              f"identical bg={same_bg} gray={same_gray}  "
+              f"loop {old_t * 1e3:8.1f} ms  numpy {new_t * 1e3:6.2f} ms  ({old_t / new_t:5.0f}x)  "
+              f"feather {feather_t * 1e3:6.2f} ms")
+    print(f"{'total':14s} loop {total_old * 1e3:.1f} ms  numpy {total_new * 1e3:.2f} ms  ({total_old / total_new:.0f}x)")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:] or [os.path.join(HERE, name) for name in DEFAULT_IMAGES])
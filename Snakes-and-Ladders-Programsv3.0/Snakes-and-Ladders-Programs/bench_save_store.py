@@ -0,0 +1,74 @@
+"""SaveStore 压力测试：写入大量存档后测量各种查询的延迟"""
+"""用法: python bench_save_store.py [存档数量]  （默认 10^6，数据库放在临时目录）"""
+
+import os
+import random
+import sys
+import tempfile
+import time
+
+from board import Board, DEFAULT_LADDERS, DEFAULT_SNAKES
+from game_core import Game
+from player import Player
+from save_store import SaveStore
+
+BATCH = 10000
+NAMES = [f"P{i}" for i in range(1000)]
+ROUNDS = 200
+
+
+def _games(board: Board, count: int, rng: random.Random):
+    """生成 count 局随机进度的对局（同一个 Game 对象反复改写，避免分配开销）"""
+    players = [Player("", "red", 1), Player("", "blue", 2)]
+    game = Game(board, players)
+    for _ in range(count):
+        players[0].name, players[1].name = rng.sample(NAMES, 2)
+        players[0].position = rng.randint(0, 100)
+        players[1].position = rng.randint(0, 99)
+        game.turn = rng.randint(1, 60)
+        game.winner = players[0] if players[0].position == 100 else None
+        yield game
+
+
+def _ms(fn, rounds: int = ROUNDS) -> float:
+    start = time.perf_counter()
+    for _ in range(rounds):
+        fn()
+    return (time.perf_counter() - start) / rounds * 1e3
+
+
+def main(count: int):
+    path = os.path.join(tempfile.mkdtemp(prefix="sl_store_"), "bench.db")
+    store = SaveStore(path)
+    board = Board(DEFAULT_LADDERS, DEFAULT_SNAKES)
+    rng = random.Random(1)
+
+    start = time.perf_counter()
+    games = _games(board, count, rng)
+    for done in range(0, count, BATCH):
+        store.save_many(next(games) for _ in range(min(BATCH, count - done)))
+    elapsed = time.perf_counter() - start
+    print(f"insert  {count} saves in {elapsed:.1f} s ({count / elapsed:,.0f}/s, "
+          f"{os.path.getsize(path) / count:.0f} B/save)")
+
+    ids = [rng.randint(1, count) for _ in range(ROUNDS)]
+    target = Game(Board(DEFAULT_LADDERS, DEFAULT_SNAKES), [])
+    first = store.list_slots()
+    deep = first[-1]
+    for _ in range(50): # 翻 50 页，测深分页
+        deep = store.list_slots(after=store.page_key(deep))[-1]
+
+    it = iter(ids)
+    print(f"load by id            {_ms(lambda: store.load(next(it), target)):.3f} ms")
+    print(f"first page            {_ms(lambda: store.list_slots()):.3f} ms")
+    print(f"page 51               {_ms(lambda: store.list_slots(after=store.page_key(deep))):.3f} ms")
+    print(f"unfinished page       {_ms(lambda: store.list_slots(finished=False)):.3f} ms")
+    print(f"by player page        {_ms(lambda: store.list_slots(player=rng.choice(NAMES))):.3f} ms")
+    it = iter(ids)
+    print(f"overwrite slot        {_ms(lambda: store.save(target, next(it))):.3f} ms")
+    print(f"count unfinished      {_ms(lambda: store.count(False), 5):.3f} ms")
+    store.close()
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 10 ** 6)
@@ -0,0 +1,107 @@
+"""对比 JSON 存档与二进制快照的大小和存取速度"""
+"""
+用法: python bench_snapshot.py [存档路径]  （默认使用 savegame.json）
+"baseline" 是引入快照之前的 JSON 存取方式（json.dump(indent=4) 写文本文件 / exists + json.load + from_dict），
+目标是比它快 10 倍、小 5 倍；"file floor" 是只打开、读完、关闭这个文件本身的开销。
+"""
+
+import json
+import os
+import sys
+import tempfile
+import time
+
+import snapshot
+from board import Board
+from game_core import Game
+
+ROUNDS = 20000
+REPEATS = 10
+TARGET_SPEEDUP = 10
+TARGET_SIZE = 5
+
+
+def _timeit(fn, rounds: int = ROUNDS) -> float:
+    """分 REPEATS 批运行，返回最快一批里每次调用的平均微秒数（单核机器上其他进程的干扰只会让某几批变慢）"""
+    best = float("inf")
+    per_batch = max(1, rounds // REPEATS)
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        for _ in range(per_batch):
+            fn()
+        best = min(best, time.perf_counter() - start)
+    return best / per_batch * 1e6
+
+
+def _baseline_save(game, path: str):
+    with open(path, 'w') as f:
+        json.dump(game.to_dict(), f, indent=4)
+
+
+def _baseline_load(game, path: str):
+    if not os.path.exists(path):
+        return None
+    with open(path, 'r') as f:
+        return game.from_dict(json.load(f))
+
+
+def _read_floor(path: str):
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.read(fd, 1 << 16)
+    finally:
+        os.close(fd)
+
+
+def _verdict(ratio: float, target: float) -> str:
+    return f"({ratio:.1f}x {'ok' if ratio >= target else f'< {target}x target'})"
+
+
+def main(source: str):
+    game = Game(Board(), [])
+    if game.load_game(source) is None:
+        sys.exit(f"cannot load {source}")
+
+    tmp = tempfile.mkdtemp(prefix="sl_bench_")
+    json_path = os.path.join(tmp, "bench.json")
+    bin_path = os.path.join(tmp, "bench" + snapshot.EXTENSION)
+    game.save_game(json_path)
+    game.save_game(bin_path)
+    json_size = os.path.getsize(json_path)
+    bin_size = os.path.getsize(bin_path)
+
+    json_bytes = json.dumps(game.to_dict(), indent=4).encode()
+    bin_bytes = snapshot.encode_game(game)
+
+    # 纯编解码（不含磁盘 I/O）
+    # 与 save_game/load_game 内部走的路径一致：JSON 经过 to_dict/from_dict，快照直接读写 Game
+    target = Game(Board(), [])
+    enc_json = _timeit(lambda: json.dumps(game.to_dict(), indent=4))
+    enc_bin = _timeit(lambda: snapshot.encode_game(game))
+    dec_json = _timeit(lambda: target.from_dict(json.loads(json_bytes)))
+    dec_bin = _timeit(lambda: snapshot.restore_game(target, bin_bytes))
+    valid = _timeit(lambda: snapshot.validate(bin_bytes))
+
+    # 完整的 save_game / load_game（含文件读写）
+    save_json = _timeit(lambda: game.save_game(json_path), ROUNDS // 10)
+    save_bin = _timeit(lambda: game.save_game(bin_path), ROUNDS // 10)
+    load_json = _timeit(lambda: target.load_game(json_path), ROUNDS // 10)
+    load_bin = _timeit(lambda: target.load_game(bin_path), ROUNDS // 10)
+    save_base = _timeit(lambda: _baseline_save(game, json_path), ROUNDS // 10)
+    load_base = _timeit(lambda: _baseline_load(target, json_path), ROUNDS // 10)
+    floor = _timeit(lambda: _read_floor(bin_path), ROUNDS // 10)
+
+    print(f"size         json {json_size:7d} B   binary {bin_size:7d} B   {_verdict(json_size / bin_size, TARGET_SIZE)}")
+    print(f"encode       json {enc_json:7.2f} us  binary {enc_bin:7.2f} us  ({enc_json / enc_bin:.1f}x)")
+    print(f"decode+apply json {dec_json:7.2f} us  binary {dec_bin:7.2f} us  ({dec_json / dec_bin:.1f}x)")
+    print(f"validate                          binary {valid:7.2f} us")
+    print(f"save_game    json {save_json:7.2f} us  binary {save_bin:7.2f} us  ({save_json / save_bin:.1f}x)")
+    print(f"load_game    json {load_json:7.2f} us  binary {load_bin:7.2f} us  ({load_json / load_bin:.1f}x)")
+    print(f"save vs baseline  {save_base:7.2f} us  binary {save_bin:7.2f} us  {_verdict(save_base / save_bin, TARGET_SPEEDUP)}")
+    print(f"load vs baseline  {load_base:7.2f} us  binary {load_bin:7.2f} us  {_verdict(load_base / load_bin, TARGET_SPEEDUP)}")
+    print(f"file floor (open + read + close)  {floor:7.2f} us  -> best possible load {load_base / floor:.1f}x")
+
+
+if __name__ == "__main__":
+    default = os.path.join(os.path.dirname(os.path.abspath(__file__)), "savegame.json")
+    main(sys.argv[1] if len(sys.argv) > 1 else default)
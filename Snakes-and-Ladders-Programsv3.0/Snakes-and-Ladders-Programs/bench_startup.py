@@ -0,0 +1,104 @@
+"""启动耗时测试：主菜单和第一张棋盘分别要多久才能操作"""
+"""
+用法: python bench_startup.py
+每一项都在全新的子进程里测量（模块没有被导入过，进程内缓存是空的）。
+cli.py 一项还检查 save 子命令没有带进 NumPy、SQLite、Tk 或 PIL。
+没有显示器时跳过需要 Tk 窗口的两项，只测导入、棋盘解码和精灵图预处理。
+"""
+
+import subprocess
+import sys
+import os
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+_PROBES = {
+    "import main (menu code)": """
+t = time.perf_counter(); import main; print(time.perf_counter() - t)
+""",
+    "import game_ui": """
+t = time.perf_counter(); import game_ui; print(time.perf_counter() - t)
+""",
+    "cli.py save info (imports + run)": """
+import contextlib, io, sys
+t = time.perf_counter()
+import cli
+with contextlib.redirect_stdout(io.StringIO()):
+    cli.main(["save", "info", "savegame.json"])
+print(time.perf_counter() - t)
+heavy = [m for m in ("numpy", "scipy", "sqlite3", "tkinter", "PIL") if m in sys.modules]
+assert not heavy, f"save info imported {heavy}"
+""",
+    "board jpeg: full decode + LANCZOS (old)": """
+from PIL import Image
+t = time.perf_counter()
+Image.open("snakes_and_ladders_boardimage.jpg").convert("RGB").resize((700, 700), Image.LANCZOS)
+print(time.perf_counter() - t)
+""",
+    "board jpeg: draft decode + LANCZOS": """
+from PIL import Image
+t = time.perf_counter()
+img = Image.open("snakes_and_ladders_boardimage.jpg"); img.draft(img.mode, (700, 700))
+img.convert("RGB").resize((700, 700), Image.LANCZOS)
+print(time.perf_counter() - t)
+""",
+    "assets: cold (board + sprites, empty cache)": """
+import tempfile, sprite_cache, game_ui
+from player import Player
+sprite_cache._default_cache = sprite_cache.SpriteCache(tempfile.mkdtemp())
+ui = game_ui.GameUI.__new__(game_ui.GameUI)
+ui.players = [Player("A", "red", 1), Player("B", "blue", 2, is_bot=True)]
+ui.board = game_ui.Board(); ui.board_image_name = "snakes_and_ladders_boardimage.jpg"; ui._sprites = sprite_cache.default_cache(); ui._dice_size = 64
+t = time.perf_counter(); ui._preprocess_assets(); print(time.perf_counter() - t)
+""",
+    "assets: warm (board + sprites, disk cache)": """
+import sprite_cache, game_ui
+from player import Player
+ui = game_ui.GameUI.__new__(game_ui.GameUI)
+ui.players = [Player("A", "red", 1), Player("B", "blue", 2, is_bot=True)]
+ui.board = game_ui.Board(); ui.board_image_name = "snakes_and_ladders_boardimage.jpg"; ui._sprites = sprite_cache.default_cache(); ui._dice_size = 64
+t = time.perf_counter(); ui._preprocess_assets(); print(time.perf_counter() - t)
+""",
+    "menu time-to-interactive (Tk)": """
+t = time.perf_counter()
+import main
+app = main.GameApp(); app.update()
+print(time.perf_counter() - t)
+""",
+    "first board time-to-interactive (Tk)": """
+import main
+from player import Player
+app = main.GameApp(); app.update()
+t = time.perf_counter()
+app.show_game([Player("A", "red", 1), Player("CPU", "blue", 2, is_bot=True)]); app.update()
+interactive = time.perf_counter() - t
+while not app.game_ui.assets_ready:
+    app.update(); time.sleep(0.002)
+print(interactive, time.perf_counter() - t)
+""",
+}
+
+
+def _run(code: str):
+    proc = subprocess.run([sys.executable, "-c", "import time\n" + code], cwd=HERE,
+                          capture_output=True, text=True)
+    if proc.returncode != 0:
+        return None, proc.stderr.strip().splitlines()[-1] if proc.stderr else "failed"
+    return [float(v) for v in proc.stdout.split()], None
+
+
+def main():
+    # 预热磁盘缓存，让 “warm” 一项真的是热的
+    _run(_PROBES["assets: warm (board + sprites, disk cache)"])
+    for name, code in _PROBES.items():
+        values, error = _run(code)
+        if values is None:
+            print(f"{name:44s} skipped ({error})")
+        elif len(values) == 2:
+            print(f"{name:44s} {values[0] * 1e3:8.1f} ms   (sprites swapped in after {values[1] * 1e3:.1f} ms)")
+        else:
+            print(f"{name:44s} {values[0] * 1e3:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
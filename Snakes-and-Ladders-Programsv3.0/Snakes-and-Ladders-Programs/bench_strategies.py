@@ -0,0 +1,91 @@
+"""expectimax 电脑玩家的决策耗时和棋力：100 格棋盘、4 名玩家、两颗骰子选一颗 + 允许跳过"""
+"""用法: python bench_strategies.py [对局数]"""
+
+import sys
+import time
+
+from board import Board, DEFAULT_LADDERS, DEFAULT_SNAKES
+from dice import Dice
+from game_core import Game
+from game_state import GameState
+from player import Player
+from rules import GameRules
+import strategies
+
+RULES = GameRules(choose_die=True, allow_skip=True)
+PLAYERS = 4
+LIMIT = 0.010 # 每步决策的延迟目标
+
+
+def _model_times(board: Board):
+    for rules in (GameRules(), GameRules(True, False), GameRules(False, True), RULES):
+        strategies._models.clear()
+        start = time.perf_counter()
+        model = strategies.race_model(board, Dice(), rules)
+        print(f"model {rules!r:48s} {(time.perf_counter() - start) * 1e3:7.1f} ms   "
+              f"expected rolls from start {model.expected[0]:.3f}")
+
+
+def _timer_noise(seconds: float = 1.0) -> float:
+    """空转时相邻两次读时钟的最大间隔：线程被系统调度走的时长，任何决策的最大延迟都躲不开它"""
+    worst = 0.0
+    last = time.perf_counter()
+    end = last + seconds
+    while last < end:
+        now = time.perf_counter()
+        worst = max(worst, now - last)
+        last = now
+    return worst
+
+
+def main(games: int = 400):
+    board = Board(DEFAULT_LADDERS, DEFAULT_SNAKES)
+    _model_times(board)
+
+    bot = strategies.ExpectimaxStrategy()
+    timings = []
+    depths = []
+    wins = 0
+    for seed in range(games):
+        # expectimax 轮流坐每个座位，其余是贪心
+        seat = seed % PLAYERS
+        players = [Player(f"P{i}", "red", i + 1, is_bot=True, strategy=bot if i == seat else None)
+                   for i in range(PLAYERS)]
+        game = Game(board, players, Dice(seed=seed), RULES)
+        game.start_new_game()
+        bot.prepare(game)
+        while game.state != GameState.GAME_OVER:
+            if game.current_index != seat:
+                game.take_turn()
+                continue
+            # 与 take_turn 相同的流程，只是把决策单独计时
+            rolls = game.roll()
+            start = time.perf_counter()
+            steps = game.choose(rolls)
+            if len(RULES.options(rolls)) > 1:
+                timings.append(time.perf_counter() - start)
+                depths.append(bot.last_depth)
+            player = game.current_player()
+            if game.current_index == 0:
+                game.turn += 1
+            player.move_to(board.roll_table(6)[player.position][steps])
+            if player.position == board.final_square:
+                game.state, game.winner = GameState.GAME_OVER, player
+            else:
+                game.next_player()
+        wins += game.winner is players[seat]
+
+    timings.sort()
+    pick = lambda q: timings[min(len(timings) - 1, int(len(timings) * q))] * 1e3
+    print(f"decisions {len(timings)}: p50 {pick(0.5):.2f} ms  p99 {pick(0.99):.2f} ms  max {timings[-1] * 1e3:.2f} ms"
+          f"  (budget {bot.time_budget * 1e3:.0f} ms)")
+    over = sum(t > LIMIT for t in timings)
+    print(f"over {LIMIT * 1e3:.0f} ms: {over}/{len(timings)} = {over / len(timings):.2%}   "
+          f"scheduler noise (idle timer gap) {_timer_noise() * 1e3:.2f} ms")
+    print(f"mean search depth {sum(depths) / len(depths):.2f} plies, table {len(bot.table)}/{bot.table.capacity}, "
+          f"hit rate {bot.table.hits / max(1, bot.table.hits + bot.table.misses):.1%}")
+    print(f"expectimax vs {PLAYERS - 1} greedy bots: won {wins}/{games} = {wins / games:.1%} (equal strength {1 / PLAYERS:.0%})")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 400)
@@ -1,89 +1,255 @@
 from point import Point
 from snake import Snake
 from ladder import Ladder
-from typing import Dict, List, Tuple
+from typing import Dict, Iterable, List, Tuple
 
 BOARD_SIZE = 10
 FINAL_SQUARE = BOARD_SIZE * BOARD_SIZE
 
+"""格子编号方式：ltr 每一行都从左到右；boustrophedon 蛇形，奇数行（从底行 0 数起）从右到左"""
+NUMBERINGS = ("ltr", "boustrophedon")
+
+"""超过终点时怎么办：clamp 停在终点；bounce 必须正好走到终点，多出来的步数往回退；stay 多了就不走"""
+OVERSHOOTS = ("clamp", "bounce", "stay")
+
+"""默认的蛇梯布局（界面、服务器和命令行工具共用）"""
+DEFAULT_LADDERS = {3: 51, 6: 27, 20: 70, 36: 55, 63: 95, 68: 98}
+DEFAULT_SNAKES = {34: 1, 25: 5, 47: 19, 65: 52, 87: 57, 91: 61, 99: 69}
+
 class Board:
+    """
+    rows × cols 的棋盘（默认 10×10），格子 1..rows*cols 从底行开始编号。
+    构造时只保存尺寸和蛇梯跳转表（字典，只含有蛇梯的格子），不为每个格子建对象：
+    像素坐标由 square_center 按行列算出，整张 dest / roll_table 查找表第一次用到时才生成，
+    所以 1000×1000 的棋盘也能在几微秒内建好。
+    """
     # 核心修复: 添加 ladders 和 snakes 参数
     def __init__(self, 
                  ladders: Dict[int, int] = None, 
                  snakes: Dict[int, int] = None, 
                  image_path: str = None, 
-                 canvas_px: int = 700):
+                 canvas_px: int = 700,
+                 rows: int = BOARD_SIZE,
+                 cols: int = None,
+                 numbering: str = "ltr"):
         
-        self.size = BOARD_SIZE
+        cols = cols if cols else rows
+        if rows < 1 or cols < 1:
+            raise ValueError(f"board must have at least one row and one column, got {rows}x{cols}")
+        if numbering not in NUMBERINGS:
+            raise ValueError(f"numbering must be one of {NUMBERINGS}, got {numbering!r}")
+        self.rows = rows
+        self.cols = cols
+        self.numbering = numbering
         self.image_path = image_path
         self.snakes: List[Snake] = []
         self.ladders: List[Ladder] = []
         self.canvas_px = canvas_px
         """每个格子的边长（整数除法），例如700//10=70像素"""
         self.cell_px = canvas_px // self.size
-        """字典，键为格子编号（1..100),值为该格子中心的Point(x,y),由后面这个函数来生成"""
-        self.square_coord = self.generate_square_coordinates()
+        self.final_square = rows * cols
 
-        # 核心修复: 根据传入的字典配置棋盘
-        if snakes:
-            for head, tail in snakes.items():
-                self.add_snake(head, tail)
-        
-        if ladders:
-            for bottom, top in ladders.items():
-                self.add_ladder(bottom, top)
+        """编译后的跳转表：jumps[格子] 是落地后(连续跳转结束)的最终位置，只含有蛇梯的格子"""
+        self.jumps: Dict[int, int] = {}
+        """同上，但所有蛇都直接回到起点 0（“蛇回起点”规则）"""
+        self.start_jumps: Dict[int, int] = {}
+        """完整的 dest 列表和 after_roll 表都是按需生成的，见 dest_table() 和 roll_table()"""
+        self._dests: Dict[bool, List[int]] = {}
+        self._roll_tables: Dict[Tuple[int, str, bool], List[List[int]]] = {}
+
+        # 核心修复: 根据传入的字典配置棋盘（一次性编译）
+        self.set_layout(
+            snakes.items() if snakes else (),
+            ladders.items() if ladders else ()
+        )
 
+    @property
+    def size(self) -> int:
+        """画布按较长的一边等分成 size×size 个格子（方形棋盘就是边长）"""
+        return max(self.rows, self.cols)
 
-    """下面的两个方法是将Snake和Ladder对象加入列表"""
+    """下面的两个方法是将Snake和Ladder对象加入列表，并重新编译查找表"""
     def add_snake(self, head: int, tail: int):
         self.snakes.append(Snake(head, tail))
+        try:
+            self._compile()
+        except ValueError:
+            self.snakes.pop() # 非法配置不留在棋盘上
+            raise
 
     def add_ladder(self, bottom: int, top: int):
         self.ladders.append(Ladder(bottom, top))
+        try:
+            self._compile()
+        except ValueError:
+            self.ladders.pop()
+            raise
 
-    """下面的方法就是加入你在游戏中，遇到蛇头或者蛇尾的时候，你会跳格子，往上跳或者是往下跳"""
-    def get_destination(self, square: int) -> int:
-        #检查玩家所处的格子有没有蛇或者是梯子
-        for s in self.snakes:
-            if s.head == square:
-                return s.tail
-        
-        for l in self.ladders:
-            if l.bottom == square:
-                return l.top
-        """如果既不是蛇头，又不是梯子的底部，则返回原来所处的位置"""
+    def set_layout(self, snakes: Iterable[Tuple[int, int]], ladders: Iterable[Tuple[int, int]]):
+        """整体替换所有蛇和梯子，只编译一次（加载存档时使用）"""
+        old_snakes, old_ladders = self.snakes, self.ladders
+        self.snakes = [Snake(head, tail) for head, tail in snakes]
+        self.ladders = [Ladder(bottom, top) for bottom, top in ladders]
+        try:
+            self._compile()
+        except ValueError:
+            self.snakes, self.ladders = old_snakes, old_ladders
+            raise
+
+    def _compile(self):
+        """
+        把蛇和梯子编译成扁平查找表。
+        连续跳转（例如梯子顶端正好是蛇头）会一直解析到底；
+        起点冲突、越界或者跳转成环时抛出 ValueError。
+        """
+        final = self.final_square
+        jumps: Dict[int, int] = {}
+        entries = [(s.head, s.tail, "snake") for s in self.snakes] + \
+                  [(l.bottom, l.top, "ladder") for l in self.ladders]
+        for start, end, kind in entries:
+            if not (0 < start < final) or not (0 <= end <= final):
+                raise ValueError(f"{kind} {start}->{end} is outside the board (1..{final})")
+            if kind == "snake" and end >= start:
+                raise ValueError(f"snake {start}->{end} must go down")
+            if kind == "ladder" and end <= start:
+                raise ValueError(f"ladder {start}->{end} must go up")
+            if jumps.get(start, end) != end:
+                raise ValueError(f"square {start} has conflicting jumps ({jumps[start]} and {end})")
+            jumps[start] = end
+
+        self.jumps = self._resolve(jumps)
+        heads = {s.head for s in self.snakes}
+        self.start_jumps = self._resolve({start: 0 if start in heads else end for start, end in jumps.items()})
+        self._dests = {}
+        self._roll_tables = {}
+        """当前布局的不可变快照，加载存档时用来快速判断布局是否变化"""
+        self.layout = (tuple((s.head, s.tail) for s in self.snakes),
+                       tuple((l.bottom, l.top) for l in self.ladders))
+        """同一布局摊平成 (蛇数, 头, 尾, ..., 底, 顶, ...)，二进制快照读档时直接和它比较"""
+        self.layout_flat = (len(self.snakes),) + tuple(sq for pairs in self.layout for pair in pairs for sq in pair)
+
+    @staticmethod
+    def _resolve(jumps: Dict[int, int]) -> Dict[int, int]:
+        """把连续跳转一直解析到底；成环时抛出 ValueError"""
+        resolved = {}
+        for start in jumps:
+            seen = {start}
+            square = jumps[start]
+            while square in jumps:
+                if square in seen:
+                    raise ValueError(f"jump chain starting at {start} loops forever")
+                seen.add(square)
+                square = jumps[square]
+            resolved[start] = square
+        return resolved
+
+    @property
+    def dest(self) -> List[int]:
+        """dest[格子] -> 连续跳转结束后的格子（整张表，第一次访问时生成）"""
+        return self.dest_table()
+
+    def dest_table(self, snakes_to_start: bool = False) -> List[int]:
+        dest = self._dests.get(snakes_to_start)
+        if dest is None:
+            dest = self._dests[snakes_to_start] = list(range(self.final_square + 1))
+            for start, end in (self.start_jumps if snakes_to_start else self.jumps).items():
+                dest[start] = end
+        return dest
+
+    def reach(self, square: int, steps: int, overshoot: str = "clamp") -> int:
+        """从 square 走 steps 步停下的格子（还没结算蛇梯）"""
+        target = square + steps
+        final = self.final_square
+        if target <= final:
+            return target
+        if overshoot == "clamp":
+            return final
+        if overshoot == "bounce":
+            return max(0, 2 * final - target)
         return square
+
+    def move(self, square: int, steps: int, overshoot: str = "clamp", snakes_to_start: bool = False) -> Tuple[int, int]:
+        """
+        从 square 走 steps 步：(结算蛇梯之前的格子, 结算之后的格子)，后者与 roll_table()[square][steps] 相同，
+        但不需要整张表（单步走棋用它，大棋盘上不会为了一步生成百万行的表）。
+        """
+        if not steps:
+            return square, square
+        target = square + steps
+        if target > self.final_square:
+            if overshoot == "stay":
+                return square, square # 这一步不走，也不再触发脚下的蛇梯
+            target = self.reach(square, steps, overshoot)
+        jumps = self.start_jumps if snakes_to_start else self.jumps
+        return target, jumps.get(target, target)
+
+    def land(self, square: int, steps: int, overshoot: str = "clamp", snakes_to_start: bool = False) -> int:
+        """只要 move() 的最终格子"""
+        return self.move(square, steps, overshoot, snakes_to_start)[1]
+
+    def walk(self, square: int, steps: int, overshoot: str = "clamp") -> List[int]:
+        """逐格走过的格子（界面动画用）：bounce 时先走到终点再往回退，stay 走不了时为空"""
+        final = self.final_square
+        if square + steps <= final or overshoot == "clamp":
+            return list(range(square + 1, min(square + steps, final) + 1))
+        if overshoot == "stay":
+            return []
+        return list(range(square + 1, final + 1)) + list(range(final - 1, self.reach(square, steps, overshoot) - 1, -1))
+
+    def roll_table(self, max_roll: int = 6, overshoot: str = "clamp", snakes_to_start: bool = False) -> List[List[int]]:
+        """
+        after_roll[格子][点数] -> 本次移动结束后的最终格子，第 0 列就是原地。
+        默认是经典规则（超过终点停在终点）；overshoot / snakes_to_start 编译进同一种表，
+        批量模拟和精确分析不需要知道规则细节。
+        """
+        key = (max_roll, overshoot, snakes_to_start)
+        table = self._roll_tables.get(key)
+        if table is None:
+            final = self.final_square
+            dest = self.dest_table(snakes_to_start)
+            if overshoot == "clamp":
+                table = [[dest[min(square + roll, final)] if roll else square for roll in range(max_roll + 1)]
+                         for square in range(final + 1)]
+            else:
+                stay = overshoot == "stay"
+                table = [[square if roll == 0 or (stay and square + roll > final)
+                          else dest[self.reach(square, roll, overshoot)]
+                          for roll in range(max_roll + 1)]
+                         for square in range(final + 1)]
+            self._roll_tables[key] = table
+        return table
+
+    @property
+    def after_roll(self) -> List[List[int]]:
+        """默认 6 面骰子的 after_roll 表"""
+        return self.roll_table(6)
+
+    """下面的方法就是加入你在游戏中，遇到蛇头或者蛇尾的时候，你会跳格子，往上跳或者是往下跳"""
+    def get_destination(self, square: int, snakes_to_start: bool = False) -> int:
+        """O(1) 查跳转表；没有蛇梯（或不在棋盘范围内）的格子原样返回"""
+        return (self.start_jumps if snakes_to_start else self.jumps).get(square, square)
     
     """下面的方法是生成棋盘上每个格子“像素中心坐标”的关键方法"""
+    def square_position(self, n: int) -> Tuple[int, int]:
+        """第 n 格的 (行, 列)：行从底行 0 开始，列从左边 0 开始"""
+        row, col = divmod(n - 1, self.cols)
+        if self.numbering == "boustrophedon" and row % 2:
+            col = self.cols - 1 - col # 奇数行从右到左
+        return row, col
+
+    def square_center(self, n: int, canvas_px: int = None) -> Tuple[int, int]:
+        """
+        第 n 格中心的像素坐标，直接按行列算出来，不缓存任何东西：
+        画布改变大小、或者棋盘有上百万格时，都不需要预先为每个格子生成坐标。
+        """
+        cell = (canvas_px if canvas_px else self.canvas_px) // self.size
+        row, col = self.square_position(n)
+        y_index = self.rows - 1 - row # Tkinter坐标系：Y轴向下为正，所以需要反转行索引
+        return int(col * cell + cell / 2), int(y_index * cell + cell / 2)
+
     def generate_square_coordinates(self) -> Dict[int, Point]:
-        coords = {}
-        """遍历所有的格号"""
-        for n in range(1, FINAL_SQUARE + 1):
-            """将格号转化为0基索引，这样方便于将格号转成0索引，便于整除与取余计算"""
-            idx = n - 1
-            
-            # 计算行和列 (从底行开始编号为0)
-            row = idx // self.size
-            col = idx % self.size
-
-            # 核心修复: 根据用户反馈，强制所有行都从左到右 (L-to-R)
-            # 或者反转逻辑以纠正用户观察到的“反向”移动
-            if row % 2 == 0:
-                # 偶数索引行（底行、第3行...）: 从左到右 (L-to-R)，保持不变
-                x_pos_index = col
-            else:
-                # 奇数索引行（第2行、第4行...）: 原本是 R-to-L。
-                # ！！！根据用户的“反着”反馈，将其改为 L-to-R ！！！
-                x_pos_index = col
-                # 原来的逻辑 (R-to-L): x_pos_index = self.size - 1 - col
-                
-            y_pos_index = self.size - 1 - row # Tkinter坐标系：Y轴向下为正，所以需要反转行索引
-
-            # 计算中心像素坐标
-            center_offset = self.cell_px / 2
-            x_center = x_pos_index * self.cell_px + center_offset
-            y_center = y_pos_index * self.cell_px + center_offset
-            
-            coords[n] = Point(int(x_center), int(y_center))
-            
-        return coords
\ No newline at end of file
+        """
+        一次性生成所有格子的 {格号: Point}（旧接口）。
+        格子多时很占内存，新代码请直接用 square_center。
+        """
+        return {n: Point(*self.square_center(n)) for n in range(1, self.final_square + 1)}
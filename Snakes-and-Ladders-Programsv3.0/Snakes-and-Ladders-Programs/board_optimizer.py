@@ -0,0 +1,235 @@
+"""棋盘布局优化器：用模拟退火搜索蛇和梯子的位置，让游戏时长接近设计目标"""
+"""
+每个候选布局都用精确的马尔可夫链打分，而不是重新模拟上千局：
+移动一条蛇/梯子只改变转移矩阵的一两列，是秩 1 修改，
+用 Sherman-Morrison 公式在 O(n^2) 内更新基本矩阵 N = (I-Q)^-1 即可。
+"""
+
+import math
+import random
+import numpy as np
+from typing import Dict, List, Optional, Tuple
+
+from board import Board, FINAL_SQUARE
+from dice import Dice
+
+# 违反约束（梯子起点离蛇头太近）时每一处的惩罚分
+VIOLATION_PENALTY = 1000.0
+# 累积这么多次增量更新后从头求逆一次，防止浮点误差积累
+REFRESH_EVERY = 500
+
+
+class OptimizationResult:
+    def __init__(self, snakes: Dict[int, int], ladders: Dict[int, int],
+                 mean: float, std: float, score: float, violations: int, evaluations: int):
+        self.snakes = snakes
+        self.ladders = ladders
+        self.mean = mean
+        self.std = std
+        self.score = score
+        self.violations = violations
+        self.evaluations = evaluations
+
+    def to_board(self, canvas_px: int = 700) -> Board:
+        return Board(ladders=self.ladders, snakes=self.snakes, canvas_px=canvas_px)
+
+    def __repr__(self):
+        return (f"OptimizationResult(mean={self.mean:.2f}, std={self.std:.2f}, "
+                f"violations={self.violations}, evaluations={self.evaluations})")
+
+
+class LayoutOptimizer:
+    def __init__(self,
+                 target_mean: float = 25.0,
+                 target_std: Optional[float] = None,
+                 std_weight: float = 0.05,
+                 min_gap: int = 5,
+                 min_length: int = 3,
+                 dice: Dice = None,
+                 final_square: int = FINAL_SQUARE,
+                 seed: Optional[int] = None):
+        """
+        :param target_mean: 单个玩家走完棋盘的目标期望掷骰次数
+        :param target_std: 目标标准差；为 None 时标准差越小越好（按 std_weight 加权）
+        :param min_gap: 梯子起点与蛇头之间至少要隔开的格数（距离 <= min_gap 视为违规）
+        :param min_length: 每条蛇/梯子最短跨越的格数
+        """
+        self.target_mean = target_mean
+        self.target_std = target_std
+        self.std_weight = std_weight
+        self.min_gap = min_gap
+        self.min_length = min_length
+        self.dice = dice if dice else Dice()
+        self.final_square = final_square
+        self.rng = random.Random(seed)
+
+        # raw[s, x]: 从格子 s 掷骰后（跳转之前）落在 x 的概率，与布局无关，只算一次
+        final = final_square
+        raw = np.zeros((final, final + 1))
+        for roll, p in enumerate(self.dice.distribution()):
+            if p:
+                for s in range(final):
+                    raw[s, min(s + roll, final)] += p
+        self._raw = raw
+
+    # --- 精确打分 ---
+
+    def _fundamental(self, dest: List[int]) -> np.ndarray:
+        """从头计算 N = (I-Q)^-1"""
+        final = self.final_square
+        q = np.zeros((final, final))
+        for x in range(1, final + 1):
+            if dest[x] < final:
+                q[:, dest[x]] += self._raw[:, x]
+        return np.linalg.inv(np.eye(final) - q)
+
+    def _rank_one(self, n: np.ndarray, square: int, old: int, new: int) -> Optional[np.ndarray]:
+        """格子 square 的跳转终点从 old 改为 new：Q' = Q + u (e_new - e_old)^T"""
+        final = self.final_square
+        nu = n @ self._raw[:, square]
+        v_n = np.zeros(final)
+        v_nu = 0.0
+        if new < final:
+            v_n += n[new]
+            v_nu += nu[new]
+        if old < final:
+            v_n -= n[old]
+            v_nu -= nu[old]
+        denom = 1.0 - v_nu
+        if abs(denom) < 1e-9:
+            return None  # 修改后 I-Q 奇异：存在永远走不到终点的格子
+        return n + np.outer(nu, v_n) / denom
+
+    def _metrics(self, n: np.ndarray) -> Tuple[float, float]:
+        """期望 t = N·1；方差 = ((2N - I) t)[0] - t[0]^2"""
+        t = n.sum(axis=1)
+        mean = t[0]
+        var = 2.0 * (n[0] @ t) - mean - mean * mean
+        return float(mean), math.sqrt(max(var, 0.0))
+
+    def _score(self, mean: float, std: float, violations: int) -> float:
+        score = (mean - self.target_mean) ** 2
+        if self.target_std is None:
+            score += self.std_weight * std * std
+        else:
+            score += (std - self.target_std) ** 2
+        return score + VIOLATION_PENALTY * violations
+
+    def _violations(self, jumps: Dict[int, Tuple[int, str]]) -> int:
+        heads = [s for s, (_, kind) in jumps.items() if kind == "snake"]
+        bottoms = [s for s, (_, kind) in jumps.items() if kind == "ladder"]
+        return sum(1 for b in bottoms for h in heads if abs(b - h) <= self.min_gap)
+
+    # --- 候选布局 ---
+
+    def _valid(self, jumps: Dict[int, Tuple[int, str]], start: int, end: int, kind: str) -> bool:
+        """新的 (start, end) 是否合法：不越界、方向正确、不与其他起点重叠、不形成连续跳转"""
+        final = self.final_square
+        if not (1 < start < final and 1 <= end < final):
+            return False
+        if kind == "snake" and start - end < self.min_length:
+            return False
+        if kind == "ladder" and end - start < self.min_length:
+            return False
+        if start in jumps or end in jumps:
+            return False
+        return all(e != start for e, _ in jumps.values())
+
+    def _propose(self, jumps: Dict[int, Tuple[int, str]]) -> Optional[Tuple[int, int, int]]:
+        """随机挑一条蛇/梯子，平移起点、平移终点或整体搬家；返回 (旧起点, 新起点, 新终点)"""
+        start = self.rng.choice(list(jumps))
+        end, kind = jumps[start]
+        op = self.rng.random()
+        if op < 0.4:
+            delta = self.rng.choice((-3, -2, -1, 1, 2, 3))
+            new_start, new_end = start + delta, end + delta
+        elif op < 0.8:
+            new_start, new_end = start, end + self.rng.randint(-8, 8)
+        else:
+            length = abs(end - start)
+            new_start = self.rng.randint(2, self.final_square - 1)
+            new_end = new_start - length if kind == "snake" else new_start + length
+
+        rest = dict(jumps)
+        del rest[start]
+        if (new_start, new_end) == (start, end) or not self._valid(rest, new_start, new_end, kind):
+            return None
+        return start, new_start, new_end
+
+    def optimize(self,
+                 snakes: Dict[int, int],
+                 ladders: Dict[int, int],
+                 iterations: int = 20000,
+                 start_temp: float = 5.0,
+                 end_temp: float = 0.01) -> OptimizationResult:
+        """
+        从给定布局出发做模拟退火，保持蛇和梯子的数量不变。
+        初始布局可以违反 min_gap（会被惩罚分推开），但不能有冲突或连续跳转。
+        """
+        final = self.final_square
+        jumps: Dict[int, Tuple[int, str]] = {}
+        for head, tail in snakes.items():
+            jumps[head] = (tail, "snake")
+        for bottom, top in ladders.items():
+            jumps[bottom] = (top, "ladder")
+        if len(jumps) != len(snakes) + len(ladders) or any(e in jumps for e, _ in jumps.values()):
+            raise ValueError("initial layout must not have shared starts or chained jumps")
+
+        dest = list(range(final + 1))
+        for start, (end, _) in jumps.items():
+            dest[start] = end
+        n = self._fundamental(dest)
+        mean, std = self._metrics(n)
+        violations = self._violations(jumps)
+        score = self._score(mean, std, violations)
+        best = (score, dict(jumps), mean, std, violations)
+        evaluations = 1
+        updates = 0
+
+        for i in range(iterations):
+            temp = start_temp * (end_temp / start_temp) ** (i / max(1, iterations - 1))
+            move = self._propose(jumps)
+            if move is None:
+                continue
+            old_start, new_start, new_end = move
+            old_end, kind = jumps[old_start]
+
+            # 旧起点恢复成普通格子，新起点指向新终点：最多两次秩 1 更新
+            if new_start == old_start:
+                cand = self._rank_one(n, old_start, old_end, new_end)
+            else:
+                cand = self._rank_one(n, old_start, old_end, old_start)
+                if cand is not None:
+                    cand = self._rank_one(cand, new_start, new_start, new_end)
+            evaluations += 1
+            if cand is None:
+                continue
+            cand_mean, cand_std = self._metrics(cand)
+            if not (0.0 < cand_mean < 1e9):
+                continue
+
+            del jumps[old_start]
+            jumps[new_start] = (new_end, kind)
+            cand_violations = self._violations(jumps)
+            cand_score = self._score(cand_mean, cand_std, cand_violations)
+
+            if cand_score <= score or self.rng.random() < math.exp((score - cand_score) / temp):
+                n, score, mean, std, violations = cand, cand_score, cand_mean, cand_std, cand_violations
+                dest[old_start] = old_start
+                dest[new_start] = new_end
+                updates += 1
+                if updates % REFRESH_EVERY == 0:
+                    n = self._fundamental(dest)
+                if score < best[0]:
+                    best = (score, dict(jumps), mean, std, violations)
+            else:
+                # 拒绝：把布局还原
+                del jumps[new_start]
+                jumps[old_start] = (old_end, kind)
+
+        score, layout, mean, std, violations = best
+        return OptimizationResult(
+            snakes={s: e for s, (e, kind) in sorted(layout.items()) if kind == "snake"},
+            ladders={s: e for s, (e, kind) in sorted(layout.items()) if kind == "ladder"},
+            mean=mean, std=std, score=score, violations=violations, evaluations=evaluations
+        )
@@ -0,0 +1,415 @@
+"""无界面的命令行入口：批量模拟、棋盘分析、存档查看与转换、电脑策略锦标赛"""
+"""
+用法:
+    python cli.py simulate --games 1000000 --players 4 --seed 7 --workers 8 > games.csv
+    python cli.py analyze --board layout.json --what distribution --format jsonl
+    python cli.py analyze --overshoot bounce --extra-roll --penalty-streak 3
+    python cli.py save info autosave.slsv savegame.json journal.sljn
+    python cli.py save convert journal.sljn position.slsv --step 40
+    python cli.py save events journal.sljn
+    python cli.py tournament greedy random expectimax --boards a.json b.json --workers 4 --checkpoint t.jsonl
+
+- 棋盘布局来自 JSON 文件（{"snakes": [[头, 尾], ...], "ladders": [[底, 顶], ...]}，
+  可选 "rows"、"cols"、"numbering"，默认 10×10），
+  存档文件（JSON 或 .slsv）也可以直接当布局用；不给 --board 时用默认布局
+- simulate / analyze / tournament 都接受同一组规则变体参数（--overshoot、--snakes-to-start、
+  --extra-roll、--penalty-streak），默认是经典规则
+- 输出是 CSV 或 JSON Lines，逐行写出：模拟按分片生成、写完就丢，内存占用与局数无关
+- 绝不导入 tkinter / PIL；NumPy、SciPy 只在 simulate / analyze 真正执行时才导入，
+  所以 --help、save 等子命令的启动时间只有解释器本身加上几个纯 Python 模块
+"""
+
+import argparse
+import json
+import os
+import sys
+from typing import Iterable, List, Optional, Sequence
+
+from board import Board, BOARD_SIZE, DEFAULT_LADDERS, DEFAULT_SNAKES, OVERSHOOTS
+from dice import Dice
+from game_core import Game
+from game_state import GameState
+from rules import GameRules
+import snapshot
+
+SIM_CHUNK = 10000 # 每个分片的局数，也是内存里同时存在的最多结果数（每个进程）
+FORMATS = ("csv", "jsonl")
+
+
+class CliError(Exception):
+    """命令行参数或输入文件有问题；消息直接打印给用户"""
+
+
+# --- 输出 ---
+
+class RowWriter:
+    """逐行写 CSV 或 JSON Lines；字段顺序固定，CSV 先写表头"""
+    def __init__(self, out, fmt: str, fields: Sequence[str]):
+        self.fields = tuple(fields)
+        self.rows = 0
+        if fmt == "csv":
+            import csv
+            writer = csv.writer(out, lineterminator="\n")
+            writer.writerow(self.fields)
+            self._write = writer.writerow
+        else:
+            dumps, write = json.JSONEncoder(separators=(",", ":")).encode, out.write
+            self._write = lambda row: write(dumps(dict(zip(self.fields, row))) + "\n")
+
+    def write(self, row: Sequence):
+        self._write(row)
+        self.rows += 1
+
+    def write_many(self, rows: Iterable[Sequence]):
+        for row in rows:
+            self.write(row)
+
+
+def _open_output(path: Optional[str]):
+    if not path or path == "-":
+        return sys.stdout
+    return open(path, "w", newline="", encoding="utf-8")
+
+
+# --- 输入 ---
+
+def load_board(path: Optional[str]) -> Board:
+    """从布局文件（或任意存档）读出蛇和梯子；path 为空时返回默认棋盘"""
+    if not path:
+        return Board(DEFAULT_LADDERS, DEFAULT_SNAKES)
+    try:
+        with open(path, "rb") as f:
+            raw = f.read()
+    except OSError as e:
+        raise CliError(f"cannot read board file: {e}")
+    try:
+        if snapshot.is_snapshot(raw):
+            data = snapshot.decode(raw)
+        else:
+            data = json.loads(raw)
+        snakes = [tuple(pair) for pair in data.get("snakes", [])]
+        ladders = [tuple(pair) for pair in data.get("ladders", [])]
+        board = Board(rows=data.get("rows", BOARD_SIZE), cols=data.get("cols"),
+                      numbering=data.get("numbering", "ltr"))
+        board.set_layout(snakes, ladders)
+    except (ValueError, TypeError, AttributeError) as e:
+        raise CliError(f"{path}: not a valid board layout ({e})")
+    return board
+
+
+def _dice(args) -> Dice:
+    try:
+        return Dice(sides=args.sides, count=args.dice)
+    except ValueError as e:
+        raise CliError(str(e))
+
+
+def _rules(args, choose_die: bool = False, allow_skip: bool = False) -> GameRules:
+    try:
+        return GameRules(choose_die, allow_skip, overshoot=args.overshoot, snakes_to_start=args.snakes_to_start,
+                         extra_roll=args.extra_roll, penalty_streak=args.penalty_streak)
+    except ValueError as e:
+        raise CliError(str(e))
+
+
+# --- simulate ---
+
+def _simulate_chunk(board: Board, dice: Dice, rules: GameRules, players: int, games: int, seed, max_turns: int):
+    """在当前进程（或进程池的子进程）里模拟一个分片，只返回两列结果"""
+    from batch_sim import BatchSimulator
+    result = BatchSimulator(board, players, dice, seed=seed, max_turns=max_turns, rules=rules).run(games)
+    return result.turns, result.winners
+
+
+def _chunks(args, entropy: int):
+    """
+    (起始局号, 局数, 随机数流) 的生成器。每个分片的种子由 (entropy, 分片号) 决定，
+    所以同一个 --seed 不论用几个进程、分片在哪里执行，每一局的结果都相同。
+    """
+    import numpy as np
+    for i, start in enumerate(range(0, args.games, args.chunk)):
+        yield start, min(args.chunk, args.games - start), np.random.SeedSequence(entropy, spawn_key=(i,))
+
+
+def _ordered_results(args, board: Board, dice: Dice, rules: GameRules, entropy: int):
+    """按分片顺序产出结果；多进程时最多同时有 2×workers 个分片在途，内存有上界"""
+    jobs = _chunks(args, entropy)
+    if args.workers <= 1:
+        for start, games, seed in jobs:
+            yield start, _simulate_chunk(board, dice, rules, args.players, games, seed, args.max_turns)
+        return
+
+    from collections import deque
+    from concurrent.futures import ProcessPoolExecutor
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        pending = deque()
+        for start, games, seed in jobs:
+            pending.append((start, pool.submit(_simulate_chunk, board, dice, rules, args.players, games, seed, args.max_turns)))
+            if len(pending) >= 2 * args.workers:
+                start, future = pending.popleft()
+                yield start, future.result()
+        while pending:
+            start, future = pending.popleft()
+            yield start, future.result()
+
+
+def cmd_simulate(args, out) -> int:
+    if args.games < 0 or args.players < 1 or args.chunk < 1:
+        raise CliError("--games must be >= 0, --players and --chunk must be >= 1")
+    board = load_board(args.board)
+    dice = _dice(args)
+    rules = _rules(args)
+    import numpy as np
+    entropy = np.random.SeedSequence(args.seed).entropy
+    if args.seed is None:
+        print(f"seed: {entropy}", file=sys.stderr) # 没指定种子时报告实际用的，便于复现
+
+    if args.summary:
+        writer = RowWriter(out, args.format, ("games", "finished", "mean_turns", *(f"wins_{p}" for p in range(args.players))))
+        finished = total_turns = 0
+        wins = np.zeros(args.players, dtype=np.int64)
+        for _, (turns, winners) in _ordered_results(args, board, dice, rules, entropy):
+            done = winners >= 0
+            finished += int(np.count_nonzero(done))
+            total_turns += int(turns[done].sum())
+            wins += np.bincount(winners[done], minlength=args.players)
+        writer.write((args.games, finished, round(total_turns / finished, 6) if finished else 0.0, *wins.tolist()))
+        return 0
+
+    writer = RowWriter(out, args.format, ("game", "turns", "winner"))
+    for start, (turns, winners) in _ordered_results(args, board, dice, rules, entropy):
+        writer.write_many(zip(range(start, start + len(turns)), turns.tolist(), winners.tolist()))
+    return 0
+
+
+# --- analyze ---
+
+def _quantile(cdf, q: float) -> int:
+    import numpy as np
+    return int(np.searchsorted(cdf, q))
+
+
+def cmd_analyze(args, out) -> int:
+    board = load_board(args.board)
+    dice = _dice(args)
+    rules = _rules(args)
+    import numpy as np
+    import markov
+    try:
+        analysis = markov.analyze(board, dice, rules)
+    except ValueError as e:
+        raise CliError(f"cannot analyze board: {e}")
+
+    if args.what == "visits":
+        writer = RowWriter(out, args.format, ("square", "expected_visits", "expected_rolls_to_finish"))
+        writer.write_many(zip(range(board.final_square + 1),
+                              np.round(analysis.visits, 9).tolist(),
+                              np.round(analysis.expected_turns_from, 9).tolist()))
+        return 0
+
+    single = analysis.turn_distribution(args.max_turns)
+    game = analysis.game_length_distribution(args.players, args.max_turns)
+    if args.what == "distribution":
+        writer = RowWriter(out, args.format, ("turn", "p_player", "p_game", "cdf_game"))
+        writer.write_many(zip(range(game.size), np.round(single, 12).tolist(),
+                              np.round(game, 12).tolist(), np.round(np.cumsum(game), 12).tolist()))
+        return 0
+
+    cdf = np.cumsum(game)
+    writer = RowWriter(out, args.format, ("final_square", "snakes", "ladders", "players", "expected_rolls",
+                                          "mean_game_turns", "median_turns", "p90_turns", "p99_turns"))
+    writer.write((board.final_square, len(board.snakes), len(board.ladders), args.players,
+                  round(analysis.expected_turns, 6), round(float((np.arange(game.size) * game).sum()), 6),
+                  _quantile(cdf, 0.5), _quantile(cdf, 0.9), _quantile(cdf, 0.99)))
+    return 0
+
+
+# --- save ---
+
+def _load_game(path: str, step: Optional[int] = None):
+    """读入存档（.slsv / JSON）或对局日志（.sljn，取第 step 步）；返回 (Game, 日志或 None)"""
+    from journal import Journal, JournalError, EXTENSION as JOURNAL_EXTENSION
+    if path.endswith(JOURNAL_EXTENSION):
+        try:
+            journal = Journal.load(path)
+            return journal.seek(len(journal) if step is None else step), journal
+        except (OSError, JournalError, IndexError) as e:
+            raise CliError(f"{path}: {e}")
+    if step is not None:
+        raise CliError("--step only applies to journal files")
+    game = Game(Board(), [])
+    if game.load_game(path) is None:
+        raise CliError(f"{path}: missing or not a valid save file")
+    return game, None
+
+
+_INFO_FIELDS = ("path", "format", "final_square", "snakes", "ladders", "players", "positions",
+                "turn", "current", "winner", "events")
+
+def _info_row(path: str, game: Game, journal) -> tuple:
+    if journal is not None:
+        fmt = "journal"
+    else:
+        with open(path, "rb") as f:
+            fmt = "slsv" if snapshot.is_snapshot(f.read(len(snapshot.MAGIC))) else "json"
+    over = game.state == GameState.GAME_OVER
+    return (path, fmt, game.board.final_square, len(game.board.snakes), len(game.board.ladders),
+            "|".join(p.name for p in game.players), "|".join(str(p.position) for p in game.players),
+            game.turn, "" if over else game.current_player().name, game.winner.name if over else "",
+            len(journal) if journal is not None else "")
+
+
+def cmd_save(args, out) -> int:
+    if args.action == "info":
+        writer = RowWriter(out, args.format, _INFO_FIELDS)
+        for path in args.paths:
+            writer.write(_info_row(path, *_load_game(path)))
+        return 0
+
+    if args.action == "convert":
+        game, _ = _load_game(args.src, args.step)
+        try:
+            game.save_game(args.dst)
+        except (OSError, ValueError) as e:
+            raise CliError(f"cannot write {args.dst}: {e}")
+        RowWriter(out, args.format, _INFO_FIELDS).write(_info_row(args.dst, *_load_game(args.dst)))
+        return 0
+
+    # events：逐条回放日志，每一步一行
+    _, journal = _load_game(args.src)
+    if journal is None:
+        raise CliError("events needs a journal file")
+    writer = RowWriter(out, args.format, ("step", "turn", "player", "roll", "pre", "post", "state"))
+    for step, ((index, roll, pre, post, _), game) in enumerate(journal.replay(), 1):
+        writer.write((step, game.turn, game.players[index].name, roll, pre, post, game.state.name))
+    return 0
+
+
+# --- tournament ---
+
+_STANDING_FIELDS = ("rank", "entrant", "rating", "games", "wins", "losses", "draws", "points")
+
+def cmd_tournament(args, out) -> int:
+    """进度逐场打到 stderr，最终排名写到输出；用同一个 --checkpoint 再跑就从断点继续"""
+    from tournament import Tournament, TournamentError
+    rules = _rules(args, args.choose_die, args.allow_skip)
+    boards = [load_board(path) for path in args.boards] if args.boards else [load_board(None)]
+
+    def progress(match, results, ratings):
+        a, b = ratings.table[match.a], ratings.table[match.b]
+        print(f"{match.id}: {results.count(0)}-{results.count(1)}"
+              f"  {match.a} {a.rating:.0f}  {match.b} {b.rating:.0f}", file=sys.stderr)
+
+    try:
+        tournament = Tournament(args.entrants, boards, rules,
+                                games=args.games, pairing=args.pairing, rounds=args.rounds,
+                                seed=args.seed, workers=args.workers, checkpoint=args.checkpoint)
+        ratings = tournament.run(None if args.quiet else progress)
+    except TournamentError as e:
+        raise CliError(str(e))
+    if tournament.resumed:
+        print(f"resumed {tournament.resumed} matches from {args.checkpoint}, played {tournament.played}",
+              file=sys.stderr)
+    writer = RowWriter(out, args.format, _STANDING_FIELDS)
+    for rank, s in enumerate(ratings.standings(), 1):
+        writer.write((rank, s.name, round(s.rating, 1), s.games, s.wins, s.losses, s.draws, s.points))
+    return 0
+
+
+# --- 参数 ---
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="cli.py", description="Headless Snakes and Ladders tools")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    def common(p, board: bool = True):
+        p.add_argument("--format", choices=FORMATS, default="csv")
+        p.add_argument("-o", "--output", help="output file (default: stdout)")
+        if board:
+            p.add_argument("--board", help="layout JSON or save file with snakes and ladders (default: built-in layout)")
+            p.add_argument("--sides", type=int, default=6, help="faces per die")
+            p.add_argument("--dice", type=int, default=1, help="dice rolled per turn (sum)")
+
+    def house_rules(p):
+        p.add_argument("--overshoot", choices=OVERSHOOTS, default="clamp",
+                       help="rolling past the last square: stop there, bounce back, or stay put")
+        p.add_argument("--snakes-to-start", action="store_true", help="every snake sends you back to square 0")
+        p.add_argument("--extra-roll", action="store_true", help="rolling the highest number earns another roll")
+        p.add_argument("--penalty-streak", type=int, default=0, metavar="N",
+                       help="with --extra-roll, the Nth highest roll in a row is void and sends you back")
+
+    p = sub.add_parser("simulate", help="simulate many games, one output row per game")
+    common(p)
+    p.add_argument("--games", type=int, default=1000)
+    p.add_argument("--players", type=int, default=2)
+    p.add_argument("--seed", type=int, help="random seed; results are identical for any --workers")
+    p.add_argument("--workers", type=int, default=1, help="worker processes")
+    p.add_argument("--max-turns", type=int, default=1000, help="games still running after this are reported with winner -1")
+    p.add_argument("--chunk", type=int, default=SIM_CHUNK, help="games per shard")
+    p.add_argument("--summary", action="store_true", help="write one aggregate row instead of one row per game")
+    house_rules(p)
+    p.set_defaults(func=cmd_simulate)
+
+    p = sub.add_parser("analyze", help="exact Markov-chain analysis of a board")
+    common(p)
+    p.add_argument("--players", type=int, default=2)
+    p.add_argument("--what", choices=("summary", "distribution", "visits"), default="summary")
+    p.add_argument("--max-turns", type=int, default=100000)
+    house_rules(p)
+    p.set_defaults(func=cmd_analyze)
+
+    p = sub.add_parser("save", help="inspect or convert save files and journals")
+    save = p.add_subparsers(dest="action", required=True)
+    q = save.add_parser("info", help="one row per file")
+    common(q, board=False)
+    q.add_argument("paths", nargs="+")
+    q = save.add_parser("convert", help="convert between .json, .slsv and journal positions")
+    common(q, board=False)
+    q.add_argument("src")
+    q.add_argument("dst", help="format follows the extension (.slsv is binary)")
+    q.add_argument("--step", type=int, help="journal step to export (default: last)")
+    q = save.add_parser("events", help="replay a journal, one row per move")
+    common(q, board=False)
+    q.add_argument("src")
+    p.set_defaults(func=cmd_save)
+
+    p = sub.add_parser("tournament", help="rate bot strategies against each other, one output row per entrant")
+    common(p, board=False)
+    p.add_argument("entrants", nargs="+", help='strategies, e.g. greedy random "expectimax:time_budget=0.002"')
+    p.add_argument("--boards", nargs="+", help="layout JSON or save files (default: built-in layout)")
+    p.add_argument("--pairing", choices=("round-robin", "swiss"), default="round-robin")
+    p.add_argument("--rounds", type=int, default=1, help="round-robin repeats, or Swiss rounds")
+    p.add_argument("--games", type=int, default=10, help="games per match; seats alternate every game")
+    p.add_argument("--seed", type=int, default=0)
+    p.add_argument("--workers", type=int, default=1, help="worker processes")
+    p.add_argument("--checkpoint", help="append-only results file; rerun with the same file to resume")
+    p.add_argument("--choose-die", action=argparse.BooleanOptionalAction, default=True,
+                   help="roll two dice and move by either (default: on)")
+    p.add_argument("--allow-skip", action=argparse.BooleanOptionalAction, default=True,
+                   help="allow staying put instead of moving (default: on)")
+    house_rules(p)
+    p.add_argument("-q", "--quiet", action="store_true", help="no per-match progress on stderr")
+    p.set_defaults(func=cmd_tournament)
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    out = None
+    try:
+        out = _open_output(args.output)
+        return args.func(args, out)
+    except BrokenPipeError:
+        # 输出被 head 之类提前关掉：不再打印回溯
+        sys.stdout = open(os.devnull, "w")
+        return 0
+    except (CliError, OSError) as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 1
+    finally:
+        if out is not None and out is not sys.stdout:
+            out.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,12 +1,124 @@
 import random
+from typing import List, Optional, Sequence, Tuple
+
+"""每次批量预取多少个点数"""
+BUFFER_SIZE = 1024
 
 class Dice:
-    def __init__(self,sides:int=6):
-        self.sides=sides
+    def __init__(self,
+                 sides: int = 6,
+                 count: int = 1,
+                 weights: Optional[Sequence[float]] = None,
+                 seed: Optional[int] = None,
+                 buffer_size: int = BUFFER_SIZE):
+        """
+        :param sides: 每个骰子的面数
+        :param count: 一次掷几个骰子（结果取点数之和）
+        :param weights: 每一面的权重（灌铅骰子），长度必须等于 sides；None 表示公平骰子
+        :param seed: 每个骰子实例独立的随机种子，相同种子得到相同的点数序列
+        """
+        if sides < 1 or count < 1:
+            raise ValueError("sides and count must be at least 1")
+        if weights is not None and (len(weights) != sides or min(weights) < 0 or sum(weights) <= 0):
+            raise ValueError(f"weights must be {sides} non-negative numbers with a positive sum")
+        self.sides = sides
+        self.count = count
+        self.weights = list(weights) if weights is not None else None
+        self.seed = seed
+        self.rng = random.Random(seed)
+        self.buffer_size = buffer_size
+        self._probs = self._build_distribution()
+        self._alias_prob, self._alias = self._build_alias_table()
+        self._buffer: List[int] = []
+
+    @property
+    def min_roll(self) -> int:
+        return self.count
+
+    @property
+    def max_roll(self) -> int:
+        return self.sides * self.count
+
+    def distribution(self) -> List[float]:
+        """精确的点数分布：distribution()[k] = P(掷出 k)，下标 0..max_roll"""
+        return list(self._probs)
+
+    def _build_distribution(self) -> List[float]:
+        """单个骰子的分布做 count 次卷积，得到点数之和的分布"""
+        weights = self.weights if self.weights is not None else [1.0] * self.sides
+        total = float(sum(weights))
+        face = [0.0] + [w / total for w in weights]
+        probs = [1.0]
+        for _ in range(self.count):
+            nxt = [0.0] * (len(probs) + self.sides)
+            for s, ps in enumerate(probs):
+                if ps:
+                    for f in range(1, self.sides + 1):
+                        nxt[s + f] += ps * face[f]
+            probs = nxt
+        return probs
+
+    def _build_alias_table(self) -> Tuple[List[float], List[int]]:
+        """Vose 别名表：在 min_roll..max_roll 上以 O(1) 抽样任意分布"""
+        outcomes = self._probs[self.min_roll:]
+        k = len(outcomes)
+        scaled = [p * k for p in outcomes]
+        prob = [1.0] * k
+        alias = list(range(k))
+        small = [i for i, p in enumerate(scaled) if p < 1.0]
+        large = [i for i, p in enumerate(scaled) if p >= 1.0]
+        while small and large:
+            s, l = small.pop(), large.pop()
+            prob[s] = scaled[s]
+            alias[s] = l
+            scaled[l] -= 1.0 - scaled[s]
+            (small if scaled[l] < 1.0 else large).append(l)
+        return prob, alias
+
+    def alias_table(self) -> Tuple[List[float], List[int], int]:
+        """返回 (prob, alias, 偏移量)，供批量模拟用 NumPy 向量化抽样"""
+        return list(self._alias_prob), list(self._alias), self.min_roll
+
+    def is_fair_single(self) -> bool:
+        return self.count == 1 and self.weights is None
+
+    def roll_many(self, n: int) -> List[int]:
+        """一次性生成 n 个点数"""
+        rng = self.rng
+        if self.is_fair_single():
+            sides = self.sides
+            random_ = rng.random
+            return [int(random_() * sides) + 1 for _ in range(n)]
+        prob, alias, offset = self._alias_prob, self._alias, self.min_roll
+        k = len(prob)
+        random_ = rng.random
+        out = []
+        for _ in range(n):
+            u = random_() * k
+            i = int(u)
+            out.append((i if u - i < prob[i] else alias[i]) + offset)
+        return out
 
     def roll(self):
-        return random.randint(1,self.sides)
-    
+        # 从预取缓冲区里取；用完了再整批补充
+        if not self._buffer:
+            self._buffer = self.roll_many(self.buffer_size)
+            self._buffer.reverse()
+        return self._buffer.pop()
+
+    def getstate(self) -> tuple:
+        """(随机数生成器的状态, 还没用掉的预取点数)；setstate 之后掷出的点数与保存时接下来会掷出的完全相同"""
+        return self.rng.getstate(), list(self._buffer)
+
+    def setstate(self, state: tuple):
+        rng_state, buffer = state
+        self.rng.setstate(rng_state)
+        self._buffer = list(buffer)
+
+    def __repr__(self):
+        kind = "loaded" if self.weights is not None else "fair"
+        return f"Dice({self.count}d{self.sides}, {kind})"
+
 # roll_sides=Dice(6)
 # print(roll_sides.roll())
-    
+
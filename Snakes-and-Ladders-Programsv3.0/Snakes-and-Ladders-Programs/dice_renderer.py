@@ -0,0 +1,88 @@
+"""程序绘制的骰子：4 倍超采样画出抗锯齿的骰子面，所有面和掷骰帧放进一张图集"""
+"""
+原来的做法是在 5120×5120 上画每一面再缩到 64px（每面约 100 MB）。这里只在
+显示尺寸的 SUPERSAMPLE 倍上绘制，再用 Image.reduce 做盒式滤波缩小，边缘同样平滑。
+同一尺寸的图集在进程里只生成一次，之后的 GameUI 直接复用。
+"""
+
+from typing import Dict, List, Tuple
+
+from PIL import Image, ImageDraw
+
+SUPERSAMPLE = 4
+FRAME_COUNT = 30
+FRAME_TURN = 47 # 相邻两帧之间的旋转角度（度），让掷骰过程看起来在翻滚
+
+_GAP = 0.22
+_PIPS = {
+    1: [(0.5, 0.5)],
+    2: [(0.5 - _GAP, 0.5 - _GAP), (0.5 + _GAP, 0.5 + _GAP)],
+    3: [(0.5 - _GAP, 0.5 - _GAP), (0.5, 0.5), (0.5 + _GAP, 0.5 + _GAP)],
+    4: [(0.5 - _GAP, 0.5 - _GAP), (0.5 + _GAP, 0.5 - _GAP), (0.5 - _GAP, 0.5 + _GAP), (0.5 + _GAP, 0.5 + _GAP)],
+    5: [(0.5 - _GAP, 0.5 - _GAP), (0.5 + _GAP, 0.5 - _GAP), (0.5, 0.5),
+        (0.5 - _GAP, 0.5 + _GAP), (0.5 + _GAP, 0.5 + _GAP)],
+    6: [(0.5 - _GAP, 0.5 - _GAP), (0.5 - _GAP, 0.5), (0.5 + _GAP, 0.5 - _GAP),
+        (0.5 - _GAP, 0.5 + _GAP), (0.5 + _GAP, 0.5), (0.5 + _GAP, 0.5 + _GAP)],
+}
+
+
+def _draw_face(n: int, size: int) -> Image.Image:
+    """在 size×size 上直接画一面（比例与原来 GameUI 的画法相同）"""
+    img = Image.new('RGBA', (size, size), (240, 240, 240, 255))
+    draw = ImageDraw.Draw(img)
+    pad = int(size * 0.06)
+    draw.rounded_rectangle([(pad, pad), (size - pad - 1, size - pad - 1)], radius=max(8, size // 32),
+                           fill=(255, 255, 255), outline=(30, 30, 30), width=max(2, size // 128))
+    pip_r = max(4, size // 12)
+    for x, y in _PIPS[n]:
+        px, py = int(x * size), int(y * size)
+        draw.ellipse([(px - pip_r, py - pip_r), (px + pip_r, py + pip_r)], fill=(20, 20, 20))
+    return img
+
+
+def render_face(n: int, size: int, supersample: int = SUPERSAMPLE) -> Image.Image:
+    """抗锯齿的一面：先画在 supersample 倍大小上，再按块平均缩小"""
+    return _draw_face(n, size * supersample).reduce(supersample)
+
+
+class DiceAtlas:
+    """
+    一张横向排列的图集：前 6 格是 1..6 点，后面是掷骰动画帧。
+    faces / frames 是从图集裁出来的小图，供 GameUI 直接使用。
+    """
+    def __init__(self, size: int, frame_count: int = FRAME_COUNT, supersample: int = SUPERSAMPLE):
+        self.size = size
+        big = [_draw_face(n, size * supersample) for n in range(1, 7)]
+        cells = [img.reduce(supersample) for img in big]
+        # 掷骰帧：轮流显示各面并逐帧旋转，四角留透明。
+        # 旋转在 2 倍尺寸上做（BICUBIC 在 4 倍尺寸上太慢），缩小时再平滑一次边缘
+        half = max(1, supersample // 2)
+        mid = [img.reduce(half) for img in big]
+        for i in range(frame_count):
+            turned = mid[i % 6].rotate(i * FRAME_TURN, resample=Image.BICUBIC, fillcolor=(0, 0, 0, 0))
+            cells.append(turned.reduce(supersample // half))
+
+        self.image = Image.new('RGBA', (size * len(cells), size), (0, 0, 0, 0))
+        for i, cell in enumerate(cells):
+            self.image.paste(cell, (i * size, 0))
+        self.faces: List[Image.Image] = [self.cell(i) for i in range(6)]
+        self.frames: List[Image.Image] = [self.cell(6 + i) for i in range(frame_count)]
+
+    def box(self, index: int) -> Tuple[int, int, int, int]:
+        return index * self.size, 0, (index + 1) * self.size, self.size
+
+    def cell(self, index: int) -> Image.Image:
+        return self.image.crop(self.box(index))
+
+    def face(self, n: int) -> Image.Image:
+        return self.faces[n - 1]
+
+
+_atlases: Dict[Tuple[int, int], DiceAtlas] = {}
+
+def get_atlas(size: int, frame_count: int = FRAME_COUNT) -> DiceAtlas:
+    """每种 (尺寸, 帧数) 在进程里只生成一次"""
+    atlas = _atlases.get((size, frame_count))
+    if atlas is None:
+        atlas = _atlases[(size, frame_count)] = DiceAtlas(size, frame_count)
+    return atlas
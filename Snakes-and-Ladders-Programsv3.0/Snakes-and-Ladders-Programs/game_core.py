@@ -6,18 +6,80 @@ from snake import Snake # 确保导入
 from ladder import Ladder # 确保导入
 import json
 import os
-from typing import List, Optional
+import threading
+import snapshot
+from rules import GameRules
+from typing import List, Optional, Tuple
+
+_O_BINARY = getattr(os, "O_BINARY", 0) # Windows 上低层文件描述符默认是文本模式
+_READ_CHUNK = 1 << 16
+
+
+def _write_file(path: str, data: bytes):
+    """
+    先把快照完整写进同目录下的临时文件，再用 os.replace 原子地替换存档（与 autosave 相同）：
+    写到一半崩溃或出错时，磁盘上仍是旧的完整存档。临时文件名带进程号和线程号，
+    同时保存同一个存档的几个线程不会互相覆盖临时文件。
+    """
+    tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC | _O_BINARY, 0o666)
+    try:
+        try:
+            view = memoryview(data)
+            while view:
+                view = view[os.write(fd, view):] # os.write 可能只写了一部分
+        finally:
+            os.close(fd)
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+        raise
+
+
+def _read_file(path: str) -> bytes:
+    """
+    直接用文件描述符读完整个文件（存档很小，省掉 open() 建缓冲对象的开销）。
+    一次读不满缓冲区就说明已经读完，不必再多一次返回空串的 read。
+    """
+    fd = os.open(path, os.O_RDONLY | _O_BINARY)
+    try:
+        chunk = os.read(fd, _READ_CHUNK)
+        if len(chunk) < _READ_CHUNK:
+            return chunk
+        chunks = [chunk]
+        while chunk:
+            chunk = os.read(fd, _READ_CHUNK)
+            chunks.append(chunk)
+        return b"".join(chunks)
+    finally:
+        os.close(fd)
+
 
 class Game:
-    def __init__(self, board: Board, players: List[Player], dice: Dice = None):
+    def __init__(self, board: Board, players: List[Player], dice: Dice = None, rules: GameRules = None):
         self.board = board
         self.players = players
         self.dice = dice if dice else Dice()
+        """可选规则（两颗骰子选一颗、允许跳过）；默认是没有选择的经典规则"""
+        self.rules = rules if rules else GameRules()
+        """上一回合掷出的点数（两颗骰子规则下是两个），界面写日志用"""
+        self.last_rolls: Tuple[int, ...] = ()
         self.current_index = 0
         self.state = GameState.CONFIGURING
         self.winner = None
         # 核心修复: 初始化回合计数器
         self.turn = 0 
+        """当前玩家这一轮连续掷出最大点数的次数（>0 表示下一把是奖励的再掷一次）"""
+        self.streak = 0
+        """当前玩家这一轮开始时的格子（连续掷出太多次最大点数时退回这里）"""
+        self.turn_start = 0
+        """上一步是否因为连续掷出最大点数而作废"""
+        self.forfeited = False
+        """可选的对局日志（journal.Journal），每走一步追加一条事件"""
+        self.journal = None
 
     def start_new_game(self):
         """初始化新游戏状态 (确保所有玩家位置回到 0)"""
@@ -27,6 +89,19 @@ class Game:
         self.current_index = 0
         self.winner = None
         self.turn = 0 # 重置回合数
+        self.streak = 0
+        if self.journal is not None:
+            self.journal.begin(self)
+
+    def attach_journal(self, journal):
+        """从当前局面开始写日志；之后开新局或加载存档都会重新开始一份"""
+        self.journal = journal
+        journal.begin(self)
+
+    def record_move(self, index: int, roll: int, pre: int, before: GameState):
+        """一步走完、状态更新之后调用（take_turn 和 GameUI 共用）"""
+        if self.journal is not None:
+            self.journal.record(self, index, roll, pre, self.players[index].position, before)
 
     def current_player(self):
         """获取当前轮到行动的玩家"""
@@ -36,39 +111,85 @@ class Game:
         """循环轮换玩家索引"""
         self.current_index = (self.current_index + 1) % len(self.players)
         
-    def take_turn(self):
-        """
-        处理单人次的完整回合逻辑（如果不需要动画，可以直接调用这个）。
-        在 GameUI 中，这部分逻辑被分散到 on_roll 和 step_move 中处理动画。
-        """
-        p = self.current_player()
-        roll = self.dice.roll()
+    def roll(self) -> Tuple[int, ...]:
+        """按规则掷这一回合的骰子"""
+        self.last_rolls = self.rules.roll(self.dice)
+        return self.last_rolls
 
-        # 移动
-        p.move_by(roll)
+    def choose(self, rolls: Tuple[int, ...]) -> int:
+        """这一把点数下当前玩家走几步：只有一个选项时直接走，否则交给玩家的策略"""
+        options = self.rules.options(rolls)
+        if len(options) == 1:
+            return options[0]
+        from strategies import GREEDY # 只有规则给出多个选项时才需要；读档、经典规则的对局（cli save 等）不必导入
+        strategy = self.current_player().strategy or GREEDY
+        return strategy.choose(self, rolls, options)
 
-        # 边界校正
-        final_square = self.board.size * self.board.size
-        if p.position > final_square:
-            p.move_to(final_square)
+    # --- 一步棋的三个阶段：take_turn 和 GameUI（带动画）都按这个顺序调用，结果完全相同 ---
+    def begin_roll(self):
+        """掷骰之前调用：新的一轮（不是奖励的再掷一次）开始时记下起点；轮到 0 号玩家时回合数 +1"""
+        if not self.streak:
+            self.turn_start = self.current_player().position
+            if self.current_index == 0:
+                self.turn += 1
 
-        # 蛇梯
-        p.move_to(self.board.get_destination(p.position))
+    def move_current(self, rolls: Tuple[int, ...], steps: int) -> int:
+        """
+        按规则把当前玩家走 steps 步（越界规则、蛇梯都查编译好的表），更新连续次数；
+        返回蛇梯跳转前的格子（写日志用）。不换人，换人由 end_move 决定。
+        """
+        p = self.current_player()
+        rules = self.rules
+        self.forfeited = False
+        if rules.bonus(rolls, self.dice.max_roll):
+            self.streak += 1
+            if self.streak == rules.penalty_streak:
+                # 连续掷出太多次最大点数：这一步作废，回到这一轮开始的格子
+                self.streak = 0
+                self.forfeited = True
+                p.move_to(self.turn_start)
+                return self.turn_start
+        else:
+            self.streak = 0
+        pre, post = rules.move(self.board, p.position, steps)
+        p.move_to(post)
+        return pre
 
-        # 检查胜利
-        if p.position == final_square:
+    def end_move(self):
+        """走完之后：到达终点就结束；掷出最大点数（且规则允许再掷）时还是同一名玩家，否则换下家"""
+        p = self.current_player()
+        if p.position == self.board.final_square:
             self.state = GameState.GAME_OVER
             self.winner = p
-        else:
+            self.streak = 0 # 用最大点数走到终点时不再有下一掷
+        elif not self.streak:
             self.next_player()
-        
-        return roll, p.position
 
-    def save_game(self, path: str):
-        """将当前游戏状态保存到 JSON 文件"""
-        data = {
+    def take_turn(self):
+        """
+        处理单人次的完整回合逻辑（如果不需要动画，可以直接调用这个）。
+        在 GameUI 中，同样的 begin_roll / move_current / end_move 被分散到动画的各个阶段。
+        返回 (走的步数, 新位置)；经典规则下步数就是掷出的点数。
+        """
+        p = self.current_player()
+        index, before = self.current_index, self.state
+        self.begin_roll()
+        rolls = self.roll()
+        steps = self.choose(rolls)
+        pre = self.move_current(rolls, steps) # 蛇梯跳转前的格子，只用于日志
+        self.end_move()
+        self.record_move(index, steps, pre, before)
+        return steps, p.position
+
+    def to_dict(self) -> dict:
+        """当前游戏状态，结构与存档 JSON 相同（服务器等无界面场景直接使用）"""
+        return {
             "current_index": self.current_index,
             "turn": self.turn,
+            # 规则（GameRules.key()）和一串“再掷一次”进行到一半时的状态
+            "rules": list(self.rules.key()),
+            "streak": self.streak,
+            "turn_start": self.turn_start,
             "players": [
                 {
                     "name": p.name,
@@ -80,23 +201,47 @@ class Game:
                 for p in self.players
             ],
             # 保存棋盘配置（如果它是动态生成的）
+            "rows": self.board.rows,
+            "cols": self.board.cols,
+            "numbering": self.board.numbering,
             "snakes": [(s.head, s.tail) for s in self.board.snakes],
             "ladders": [(l.bottom, l.top) for l in self.board.ladders]
         }
-        with open(path, 'w') as f:
-            json.dump(data, f, indent=4)
+
+    def save_game(self, path: str, binary: Optional[bool] = None):
+        """
+        将当前游戏状态保存到文件。
+        binary 为 None 时按扩展名决定：.slsv 写紧凑的二进制快照，其余写可读的 JSON。
+        """
+        if binary is None:
+            binary = path.endswith(snapshot.EXTENSION)
+        if binary:
+            _write_file(path, snapshot.encode_game(self))
+        else:
+            with open(path, 'w') as f:
+                json.dump(self.to_dict(), f, indent=4)
 
     def load_game(self, path: str) -> Optional[List[Player]]:
-        """从 JSON 文件加载游戏状态"""
-        if not os.path.exists(path):
+        """从存档加载游戏状态（自动识别二进制快照和 JSON）"""
+        try:
+            raw = _read_file(path)
+        except FileNotFoundError:
             return None
+        if snapshot.is_snapshot(raw):
+            try:
+                return snapshot.restore_game(self, raw)
+            except ValueError:
+                return None # 蛇梯配置冲突或成环
 
         try:
-            with open(path, 'r') as f:
-                data = json.load(f)
-        except json.JSONDecodeError:
+            data = json.loads(raw)
+        except (ValueError, UnicodeDecodeError):
             return None # 文件损坏
 
+        return self.from_dict(data)
+
+    def from_dict(self, data: dict) -> Optional[List[Player]]:
+        """从 to_dict() 的结构恢复游戏状态，数据不合法时返回 None"""
         loaded_players = []
         try:
             # 1. 加载玩家
@@ -110,27 +255,64 @@ class Game:
                 player.move_to(p_data["position"])
                 loaded_players.append(player)
 
-            self.players = loaded_players
-            self.current_index = data.get("current_index", 0)
-            self.turn = data.get("turn", 0) # 加载回合数
-            self.state = GameState.WAITING_ROLL # 游戏加载后，等待掷骰子
-
-            # 2. 加载棋盘结构（如果有变化）
-            self.board.snakes = []
-            self.board.ladders = []
-            for head, tail in data.get("snakes", []):
-                self.board.add_snake(head, tail)
-            for bottom, top in data.get("ladders", []):
-                self.board.add_ladder(bottom, top)
-            
-            # 3. 检查是否已结束
-            final_square = self.board.size * self.board.size
-            winner = next((p for p in self.players if p.position == final_square), None)
-            if winner:
-                self.state = GameState.GAME_OVER
-                self.winner = winner
+            # 旧存档没有棋盘形状和规则，沿用当前棋盘和规则
+            shape = (data["rows"], data.get("cols", data["rows"]), data.get("numbering", "ltr")) if "rows" in data else None
+            turn_state = (GameRules(*data["rules"]), data.get("streak", 0), data.get("turn_start", 0)) \
+                if "rules" in data else None
+            return self.restore(
+                loaded_players,
+                data.get("current_index", 0),
+                data.get("turn", 0), # 加载回合数
+                [tuple(pair) for pair in data.get("snakes", [])],
+                [tuple(pair) for pair in data.get("ladders", [])],
+                shape,
+                data.get("final_square"),
+                turn_state
+            )
+
+        except (KeyError, IndexError, TypeError, ValueError):
+            return None # 数据结构不正确（ValueError: 蛇梯配置冲突或成环）
+
+    def restore(self, players: List[Player], current_index: int, turn: int,
+                snakes: List[Tuple[int, int]], ladders: List[Tuple[int, int]],
+                shape: Optional[Tuple[int, int, str]] = None, final_square: Optional[int] = None,
+                turn_state: Optional[Tuple[GameRules, int, int]] = None) -> List[Player]:
+        """
+        用已经解析好的数据恢复游戏（JSON 和二进制快照共用）。
+        shape = (行数, 列数, 编号方式) 与当前棋盘不同时换一块这个形状的新棋盘；
+        turn_state = (规则, streak, turn_start)；旧存档没有时保留当前规则，从新的一轮开始。
+        棋盘配置非法、或存档记录的终点与棋盘对不上时抛出 ValueError。
+        """
+        board = self.board
+        if shape is not None and tuple(shape) != (board.rows, board.cols, board.numbering):
+            rows, cols, numbering = shape
+            board = Board(image_path=board.image_path, canvas_px=board.canvas_px,
+                          rows=rows, cols=cols, numbering=numbering)
+        if final_square is not None and final_square != board.final_square:
+            raise ValueError(f"save is for a board ending at {final_square}, not {board.final_square}")
+        # 只有和当前棋盘不同时才整体替换并重新编译查找表
+        if (tuple(snakes), tuple(ladders)) != board.layout:
+            board.set_layout(snakes, ladders)
+        self.board = board
 
-            return loaded_players # 成功加载时返回玩家列表
+        self.players = players
+        self.current_index = current_index
+        self.turn = turn
+        if turn_state is not None:
+            self.rules, self.streak, self.turn_start = turn_state
+        else:
+            self.streak = 0
+        self.state = GameState.WAITING_ROLL # 游戏加载后，等待掷骰子
+
+        # 检查是否已结束
+        final_square = self.board.final_square
+        self.winner = None
+        for p in players:
+            if p.position == final_square:
+                self.winner = p
+                self.state = GameState.GAME_OVER
+                break
 
-        except (KeyError, IndexError, TypeError):
-            return None # 数据结构不正确
\ No newline at end of file
+        if self.journal is not None:
+            self.journal.begin(self) # 加载后的局面作为新日志的起点
+        return players # 成功加载时返回玩家列表
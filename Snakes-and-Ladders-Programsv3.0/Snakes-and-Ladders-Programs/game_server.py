@@ -0,0 +1,298 @@
+"""asyncio 游戏服务器：在一个进程里托管成千上万个互不相关的 Game 会话"""
+"""
+协议：TCP 或 Unix socket 上的逐行 JSON，每行一个请求、一个响应。
+    {"op": "create", "players": ["A", "B"], "seed": 1}  -> {"ok": true, "session": "..."}
+    {"op": "join",   "session": "...", "name": "C"}     -> 只能在第一次掷骰之前加入
+    {"op": "roll",   "session": "...", "name": "A"}     -> name 可选，用来校验是否轮到此人
+    {"op": "state",  "session": "..."}
+    {"op": "save",   "session": "..."}                  -> 立即写盘，返回文件路径
+请求里带 "id" 字段时会原样带回，方便客户端流水线发送。
+回合逻辑完全由 Game.take_turn 驱动，不依赖 Tk；空闲的会话会被换出到磁盘，下次访问时再恢复。
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import re
+import sys
+import tempfile
+import time
+import uuid
+from typing import Dict, Optional
+
+from board import Board, DEFAULT_LADDERS, DEFAULT_SNAKES
+from dice import Dice
+from game_core import Game
+from game_state import GameState
+from player import Player
+
+PLAYER_COLORS = ["red", "blue", "green", "purple", "orange", "cyan"]
+MAX_PLAYERS = len(PLAYER_COLORS)
+# 会话空闲多少秒后换出到磁盘
+IDLE_TIMEOUT = 300.0
+# 每隔多少秒扫描一次空闲会话
+EVICT_INTERVAL = 10.0
+# 服务器里的骰子只预取少量点数，避免上万个会话各自持有大缓冲区
+DICE_BUFFER = 16
+SESSION_ID = re.compile(r"[0-9a-f]{12}")
+
+
+class ProtocolError(Exception):
+    """请求不合法；消息会原样返回给客户端"""
+
+
+class Session:
+    def __init__(self, sid: str, game: Game):
+        self.sid = sid
+        self.game = game
+        self.last_active = time.monotonic()
+
+
+class GameServer:
+    def __init__(self, save_dir: str, idle_timeout: float = IDLE_TIMEOUT):
+        self.save_dir = save_dir
+        self.idle_timeout = idle_timeout
+        os.makedirs(save_dir, exist_ok=True)
+        # 默认布局的会话共用同一个（只读的）棋盘及其编译好的查找表；布局不同的会话恢复时各有一块
+        self.board = Board(DEFAULT_LADDERS, DEFAULT_SNAKES)
+        self.sessions: Dict[str, Session] = {}
+        self.evicted = 0
+        self.restored = 0
+        self._evict_task: Optional[asyncio.Task] = None
+
+    # --- 会话管理 ---
+
+    def _path(self, sid: str) -> str:
+        return os.path.join(self.save_dir, f"{sid}.json")
+
+    async def _get(self, sid) -> Session:
+        """取出会话；不在内存里就从磁盘恢复"""
+        if not isinstance(sid, str) or not SESSION_ID.fullmatch(sid):
+            raise ProtocolError("invalid session id")
+        session = self.sessions.get(sid)
+        if session is None:
+            session = await asyncio.get_running_loop().run_in_executor(None, self._restore, sid)
+            if session is None:
+                raise ProtocolError(f"unknown session {sid}")
+            # 恢复期间可能有并发请求已经把它放回来了
+            session = self.sessions.setdefault(sid, session)
+            self.restored += 1
+        session.last_active = time.monotonic()
+        return session
+
+    def _new_game(self, seed=None, board: Board = None) -> Game:
+        return Game(board if board else self.board, [], Dice(seed=seed, buffer_size=DICE_BUFFER))
+
+    @staticmethod
+    def _dump(game: Game) -> dict:
+        """换出 / 保存用的数据：存档 JSON 再加上骰子的种子和随机状态，恢复后接着掷出同样的点数序列"""
+        (version, internal, gauss), buffer = game.dice.getstate()
+        return {**game.to_dict(), "dice": {"seed": game.dice.seed, "rng": [version, list(internal), gauss],
+                                          "buffer": buffer}}
+
+    def _restore(self, sid: str) -> Optional[Session]:
+        try:
+            with open(self._path(sid)) as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None # 不存在或已损坏
+        if not isinstance(data, dict):
+            return None
+        dice = data.get("dice") # 旧的换出文件没有骰子状态，只能重新开一个随机序列
+        try:
+            # 恢复时会把存档的蛇梯写进棋盘：布局和默认的不同时给这个会话单独一块棋盘，共享的那块保持只读
+            layout = (tuple(map(tuple, data.get("snakes", []))), tuple(map(tuple, data.get("ladders", []))))
+            board = None if layout == self.board.layout else Board()
+            game = self._new_game(dice["seed"] if dice else None, board)
+            if game.from_dict(data) is None:
+                return None
+            if dice:
+                version, internal, gauss = dice["rng"]
+                game.dice.setstate(((version, tuple(internal), gauss), dice["buffer"]))
+        except (KeyError, TypeError, ValueError):
+            return None
+        return Session(sid, game)
+
+    def _write(self, sid: str, data: dict):
+        """
+        先写临时文件再改名，崩溃时不会留下半个存档。
+        临时文件名每次都不同：换出和 save 请求可能在线程池里同时写同一个会话。
+        """
+        path = self._path(sid)
+        fd, tmp = tempfile.mkstemp(dir=self.save_dir, prefix=sid + ".", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump(data, f)
+            os.replace(tmp, path)
+        except BaseException:
+            try:
+                os.remove(tmp)
+            except OSError:
+                pass
+            raise
+
+    async def evict_idle(self):
+        """把空闲超时的会话写盘并移出内存；写盘在线程池里进行，不阻塞事件循环"""
+        now = time.monotonic()
+        idle = [s for s in self.sessions.values() if now - s.last_active >= self.idle_timeout]
+        loop = asyncio.get_running_loop()
+        for session in idle:
+            data = self._dump(session.game)
+            try:
+                await loop.run_in_executor(None, self._write, session.sid, data)
+            except OSError as e:
+                # 磁盘满、权限不对等：这个会话留在内存里，下一轮再试，不影响其他会话
+                print(f"cannot evict session {session.sid}: {e}", file=sys.stderr)
+                continue
+            # 写盘期间如果又有请求访问它，就保留在内存里
+            current = self.sessions.get(session.sid)
+            if current is session and time.monotonic() - session.last_active >= self.idle_timeout:
+                del self.sessions[session.sid]
+                self.evicted += 1
+
+    async def _evict_loop(self, interval: float):
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await self.evict_idle()
+            except OSError as e:
+                print(f"evicting idle sessions failed: {e}", file=sys.stderr) # 扫描任务不能因此退出
+
+    # --- 协议处理 ---
+
+    @staticmethod
+    def _state(game: Game) -> dict:
+        data = {
+            "turn": game.turn,
+            "state": game.state.name,
+            "current": game.current_index,
+            "players": [{"name": p.name, "position": p.position, "is_bot": p.is_bot} for p in game.players],
+        }
+        if game.winner is not None:
+            data["winner"] = game.winner.name
+        return data
+
+    @staticmethod
+    def _add_player(game: Game, name, is_bot: bool = False) -> Player:
+        if not isinstance(name, str) or not name:
+            raise ProtocolError("player name must be a non-empty string")
+        if len(game.players) >= MAX_PLAYERS:
+            raise ProtocolError("session is full")
+        if any(p.name == name for p in game.players):
+            raise ProtocolError(f"player {name} already joined")
+        number = len(game.players) + 1
+        player = Player(name, PLAYER_COLORS[number - 1], number, is_bot=is_bot)
+        game.players.append(player)
+        return player
+
+    async def handle(self, request: dict) -> dict:
+        op = request.get("op")
+        if op == "create":
+            names = request.get("players")
+            if not isinstance(names, list) or not names or not all(isinstance(name, str) for name in names):
+                raise ProtocolError("players must be a non-empty list of names")
+            sid = uuid.uuid4().hex[:12]
+            game = self._new_game(request.get("seed"))
+            for name in names:
+                self._add_player(game, name)
+            self.sessions[sid] = Session(sid, game)
+            return {"session": sid, **self._state(game)}
+
+        session = await self._get(request.get("session"))
+        game = session.game
+        if op == "join":
+            # 还没有人掷过骰子之前都可以加入
+            if game.turn > 0 or game.state not in (GameState.CONFIGURING, GameState.WAITING_ROLL):
+                raise ProtocolError("game already started")
+            player = self._add_player(game, request.get("name"), bool(request.get("is_bot", False)))
+            return {"number": player.number, **self._state(game)}
+        if op == "roll":
+            if not game.players:
+                raise ProtocolError("no players in session")
+            if game.state == GameState.CONFIGURING:
+                game.start_new_game()
+            if game.state == GameState.GAME_OVER:
+                raise ProtocolError("game is over")
+            name = request.get("name")
+            if name is not None and game.current_player().name != name:
+                raise ProtocolError(f"not {name}'s turn")
+            player = game.current_player()
+            roll, position = game.take_turn()
+            return {"player": player.name, "roll": roll, "position": position, **self._state(game)}
+        if op == "state":
+            return self._state(game)
+        if op == "save":
+            await asyncio.get_running_loop().run_in_executor(None, self._write, session.sid, self._dump(game))
+            return {"path": self._path(session.sid)}
+        raise ProtocolError(f"unknown op {op!r}")
+
+    async def _client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                request = None
+                try:
+                    request = json.loads(line)
+                    if not isinstance(request, dict):
+                        raise ProtocolError("request must be a JSON object")
+                    response = {"ok": True, **await self.handle(request)}
+                except (ProtocolError, ValueError, TypeError) as e:
+                    response = {"ok": False, "error": str(e)}
+                except OSError as e: # save 写盘失败
+                    response = {"ok": False, "error": f"cannot write save: {e}"}
+                if isinstance(request, dict) and "id" in request:
+                    response["id"] = request["id"]
+                writer.write(json.dumps(response).encode() + b"\n")
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def start(self, host: str = "127.0.0.1", port: int = 8765, unix_path: Optional[str] = None,
+                    evict_interval: float = EVICT_INTERVAL) -> asyncio.AbstractServer:
+        if unix_path:
+            server = await asyncio.start_unix_server(self._client, path=unix_path)
+        else:
+            server = await asyncio.start_server(self._client, host, port)
+        self._evict_task = asyncio.create_task(self._evict_loop(evict_interval))
+        return server
+
+    async def stop(self):
+        """停止空闲扫描，并把内存里所有会话写盘"""
+        if self._evict_task:
+            self._evict_task.cancel()
+        loop = asyncio.get_running_loop()
+        for session in list(self.sessions.values()):
+            try:
+                await loop.run_in_executor(None, self._write, session.sid, self._dump(session.game))
+            except OSError as e:
+                print(f"cannot save session {session.sid}: {e}", file=sys.stderr)
+
+
+async def _serve(args):
+    server_obj = GameServer(args.save_dir, idle_timeout=args.idle_timeout)
+    server = await server_obj.start(args.host, args.port, args.unix)
+    where = args.unix or f"{args.host}:{args.port}"
+    print(f"Snakes and Ladders server listening on {where}")
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        await server_obj.stop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Snakes and Ladders game server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--unix", help="listen on a Unix socket instead of TCP")
+    parser.add_argument("--save-dir", default=os.path.join(os.path.dirname(os.path.abspath(__file__)), "sessions"))
+    parser.add_argument("--idle-timeout", type=float, default=IDLE_TIMEOUT)
+    try:
+        asyncio.run(_serve(parser.parse_args()))
+    except KeyboardInterrupt:
+        pass
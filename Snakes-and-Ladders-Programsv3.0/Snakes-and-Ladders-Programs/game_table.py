@@ -0,0 +1,422 @@
+"""GameTable：用“结构数组”在一块紧凑内存里保存大量对局"""
+"""
+每局只占几十个字节：位置、当前玩家、回合、状态、胜者、“再掷一次”的进度和上一步是否作废都放在 array 模块的定长数组里，
+玩家名单按内容去重后共享（没有对局再用时释放），棋盘（及其编译好的查找表）和规则在所有使用它们的对局之间共享。
+通过 GameView / PlayerView 游标可以像操作 Game / Player 一样读写某一局。
+"""
+
+from array import array
+from typing import Dict, List, Optional, Tuple
+
+from board import Board
+from dice import Dice
+from game_core import Game
+from game_state import GameState
+from player import Player
+from rules import GameRules
+from strategies import GREEDY
+
+NO_WINNER = -1
+_STATES = list(GameState)
+# 玩家名单里每个玩家保存的只读信息
+Roster = Tuple[Tuple[str, str, int, bool], ...]
+
+
+class GameTable:
+    def __init__(self, max_players: int = 4, dice: Dice = None):
+        self.max_players = max_players
+        self.dice = dice if dice else Dice()
+        # 共享的棋盘和玩家名单；对局里只保存它们的下标
+        self.boards: List[Board] = []
+        self._board_ids: Dict[int, int] = {}
+        self.rosters: List[Roster] = []
+        self._roster_ids: Dict[Roster, int] = {}
+        # 每份名单被多少局引用；降到 0 时释放，下标留给之后的新名单
+        self._roster_refs: List[int] = []
+        self._free_rosters: List[int] = []
+        self.rule_sets: List[GameRules] = []
+        self._rule_ids: Dict[GameRules, int] = {}
+
+        # 每局一项（positions 每局 max_players 项）
+        self.positions = array('H')
+        self.num_players = array('B')
+        self.current = array('B')
+        self.turn = array('I')
+        self.state = array('B')
+        self.winner = array('b')
+        self.board_id = array('B')
+        self.roster_id = array('I')
+        self.rules_id = array('B')
+        # 与 Game.streak / Game.turn_start 相同：连续掷出最大点数的次数、这一轮开始时的格子
+        self.streak = array('B')
+        self.turn_start = array('H')
+        # 与 Game.forfeited 相同：上一步是否因为连续掷出最大点数而作废
+        self.forfeited = array('B')
+        self._free: List[int] = []
+
+    # --- 共享资源 ---
+
+    def add_board(self, board: Board) -> int:
+        """登记一个棋盘（按对象去重）。登记后请不要再修改它的蛇梯。"""
+        bid = self._board_ids.get(id(board))
+        if bid is None:
+            if len(self.boards) > 0xFF:
+                raise ValueError("a GameTable can hold at most 256 distinct boards")
+            if board.final_square > 0xFFFF and self.positions.typecode == 'H':
+                # 超大棋盘放不进 16 位，整体升级为 32 位位置
+                self.positions = array('I', self.positions)
+                self.turn_start = array('I', self.turn_start)
+            bid = len(self.boards)
+            self.boards.append(board)
+            self._board_ids[id(board)] = bid
+        return bid
+
+    def add_rules(self, rules: GameRules) -> int:
+        """登记一套规则（按内容去重）"""
+        rid = self._rule_ids.get(rules)
+        if rid is None:
+            if len(self.rule_sets) > 0xFF:
+                raise ValueError("a GameTable can hold at most 256 distinct rule sets")
+            rid = len(self.rule_sets)
+            self.rule_sets.append(rules)
+            self._rule_ids[rules] = rid
+        return rid
+
+    def _intern_roster(self, players: List[Player]) -> int:
+        """按内容去重并增加引用计数；每次调用都要对应一次 _release_roster"""
+        roster = tuple((p.name, p.color, p.number, p.is_bot) for p in players)
+        rid = self._roster_ids.get(roster)
+        if rid is not None:
+            self._roster_refs[rid] += 1
+        elif self._free_rosters:
+            rid = self._free_rosters.pop()
+            self.rosters[rid] = roster
+            self._roster_refs[rid] = 1
+            self._roster_ids[roster] = rid
+        else:
+            rid = len(self.rosters)
+            self.rosters.append(roster)
+            self._roster_refs.append(1)
+            self._roster_ids[roster] = rid
+        return rid
+
+    def _release_roster(self, rid: int):
+        """最后一局不再使用时丢掉这份名单（名字等字符串随之释放）"""
+        self._roster_refs[rid] -= 1
+        if not self._roster_refs[rid]:
+            del self._roster_ids[self.rosters[rid]]
+            self.rosters[rid] = ()
+            self._free_rosters.append(rid)
+
+    # --- 对局 ---
+
+    def add_game(self, players: List[Player], board: Board, state: GameState = GameState.WAITING_ROLL,
+                 rules: GameRules = None) -> int:
+        """新增一局，返回对局编号。玩家的当前位置会被复制进表里；rules 默认是经典规则。"""
+        if not 0 < len(players) <= self.max_players:
+            raise ValueError(f"a game needs 1..{self.max_players} players")
+        bid = self.add_board(board)
+        ruleset = self.add_rules(rules if rules else GameRules())
+        rid = self._intern_roster(players)
+        slots = [p.position for p in players] + [0] * (self.max_players - len(players))
+        if self._free:
+            gid = self._free.pop()
+            base = gid * self.max_players
+            self.positions[base:base + self.max_players] = array(self.positions.typecode, slots)
+            self.num_players[gid] = len(players)
+            self.current[gid] = 0
+            self.turn[gid] = 0
+            self.state[gid] = state.value
+            self.winner[gid] = NO_WINNER
+            self.board_id[gid] = bid
+            self.roster_id[gid] = rid
+            self.rules_id[gid] = ruleset
+            self.streak[gid] = 0
+            self.turn_start[gid] = 0
+            self.forfeited[gid] = 0
+        else:
+            gid = len(self.num_players)
+            self.positions.extend(slots)
+            self.num_players.append(len(players))
+            self.current.append(0)
+            self.turn.append(0)
+            self.state.append(state.value)
+            self.winner.append(NO_WINNER)
+            self.board_id.append(bid)
+            self.roster_id.append(rid)
+            self.rules_id.append(ruleset)
+            self.streak.append(0)
+            self.turn_start.append(0)
+            self.forfeited.append(0)
+        return gid
+
+    def add_from_game(self, game: Game) -> int:
+        """把一个现有的 Game 对象压缩进表里"""
+        gid = self.add_game(game.players, game.board, game.state, game.rules)
+        self.current[gid] = game.current_index
+        self.turn[gid] = game.turn
+        self.streak[gid] = game.streak
+        self.turn_start[gid] = game.turn_start
+        self.forfeited[gid] = game.forfeited
+        if game.winner is not None:
+            self.winner[gid] = game.players.index(game.winner)
+        return gid
+
+    def _check(self, gid: int):
+        """对局必须存在且没有被释放（玩家数为 0 就是空槽位），否则抛出 KeyError"""
+        if not 0 <= gid < len(self.num_players):
+            raise KeyError(f"no game {gid}")
+        if not self.num_players[gid]:
+            raise KeyError(f"game {gid} has been removed")
+
+    def remove(self, gid: int):
+        """释放一局，它的槽位会被后面新增的对局复用；重复释放抛出 KeyError"""
+        self._check(gid)
+        self.num_players[gid] = 0
+        self._release_roster(self.roster_id[gid])
+        self._free.append(gid)
+
+    def view(self, gid: int) -> "GameView":
+        self._check(gid)
+        return GameView(self, gid)
+
+    def __len__(self):
+        return len(self.num_players) - len(self._free)
+
+    def bytes_per_game(self) -> int:
+        """每局在定长数组里占用的字节数（不含共享的棋盘和名单）"""
+        return (self.positions.itemsize * self.max_players + self.num_players.itemsize +
+                self.current.itemsize + self.turn.itemsize + self.state.itemsize +
+                self.winner.itemsize + self.board_id.itemsize + self.roster_id.itemsize +
+                self.rules_id.itemsize + self.streak.itemsize + self.turn_start.itemsize +
+                self.forfeited.itemsize)
+
+
+class PlayerView:
+    """表中某局某个玩家的游标，接口与 Player 相同"""
+    __slots__ = ("_table", "_gid", "_index")
+
+    def __init__(self, table: GameTable, gid: int, index: int):
+        self._table = table
+        self._gid = gid
+        self._index = index
+
+    def _info(self):
+        table = self._table
+        return table.rosters[table.roster_id[self._gid]][self._index]
+
+    @property
+    def name(self) -> str:
+        return self._info()[0]
+
+    @property
+    def color(self) -> str:
+        return self._info()[1]
+
+    @property
+    def number(self) -> int:
+        return self._info()[2]
+
+    @property
+    def is_bot(self) -> bool:
+        return self._info()[3]
+
+    @property
+    def strategy(self):
+        """表里不保存策略，规则给出多个选项时与没有策略的 Player 一样走贪心选择"""
+        return None
+
+    @property
+    def position(self) -> int:
+        return self._table.positions[self._gid * self._table.max_players + self._index]
+
+    @position.setter
+    def position(self, square: int):
+        self._table.positions[self._gid * self._table.max_players + self._index] = square
+
+    def move_by(self, steps: int):
+        board = self._table.boards[self._table.board_id[self._gid]]
+        self.position = min(self.position + steps, board.final_square)
+
+    def move_to(self, square: int):
+        self.position = square
+
+    def get_position(self) -> int:
+        return self.position
+
+    def __eq__(self, other):
+        return isinstance(other, PlayerView) and (self._table, self._gid, self._index) == \
+            (other._table, other._gid, other._index)
+
+    def __hash__(self):
+        return hash((id(self._table), self._gid, self._index))
+
+    def __repr__(self):
+        bot_status = ", Bot" if self.is_bot else ""
+        return f"Player({self.name}, pos={self.position}{bot_status})"
+
+
+class GameView:
+    """表中某一局的游标，接口与 Game 相同（状态全部读写自 GameTable）"""
+    __slots__ = ("_table", "_gid")
+
+    def __init__(self, table: GameTable, gid: int):
+        self._table = table
+        self._gid = gid
+
+    @property
+    def board(self) -> Board:
+        return self._table.boards[self._table.board_id[self._gid]]
+
+    @property
+    def dice(self) -> Dice:
+        return self._table.dice
+
+    @property
+    def rules(self) -> GameRules:
+        return self._table.rule_sets[self._table.rules_id[self._gid]]
+
+    @property
+    def streak(self) -> int:
+        return self._table.streak[self._gid]
+
+    @property
+    def turn_start(self) -> int:
+        return self._table.turn_start[self._gid]
+
+    @property
+    def forfeited(self) -> bool:
+        return bool(self._table.forfeited[self._gid])
+
+    @property
+    def players(self) -> List[PlayerView]:
+        return [PlayerView(self._table, self._gid, i) for i in range(self._table.num_players[self._gid])]
+
+    @property
+    def current_index(self) -> int:
+        return self._table.current[self._gid]
+
+    @current_index.setter
+    def current_index(self, index: int):
+        self._table.current[self._gid] = index
+
+    @property
+    def turn(self) -> int:
+        return self._table.turn[self._gid]
+
+    @turn.setter
+    def turn(self, value: int):
+        self._table.turn[self._gid] = value
+
+    @property
+    def state(self) -> GameState:
+        return _STATES[self._table.state[self._gid]]
+
+    @state.setter
+    def state(self, value: GameState):
+        self._table.state[self._gid] = value.value
+
+    @property
+    def winner(self) -> Optional[PlayerView]:
+        index = self._table.winner[self._gid]
+        return None if index == NO_WINNER else PlayerView(self._table, self._gid, index)
+
+    @winner.setter
+    def winner(self, player: Optional[PlayerView]):
+        self._table.winner[self._gid] = NO_WINNER if player is None else player._index
+
+    def start_new_game(self):
+        table, gid = self._table, self._gid
+        base = gid * table.max_players
+        for i in range(table.num_players[gid]):
+            table.positions[base + i] = 0
+        table.state[gid] = GameState.WAITING_ROLL.value
+        table.current[gid] = 0
+        table.winner[gid] = NO_WINNER
+        table.turn[gid] = 0
+        table.streak[gid] = 0
+        table.forfeited[gid] = 0
+
+    def current_player(self) -> PlayerView:
+        return PlayerView(self._table, self._gid, self._table.current[self._gid])
+
+    def next_player(self):
+        table, gid = self._table, self._gid
+        table.current[gid] = (table.current[gid] + 1) % table.num_players[gid]
+
+    # --- 与 Game 相同的三个阶段，直接在数组上读写 ---
+    def begin_roll(self):
+        table, gid = self._table, self._gid
+        if not table.streak[gid]:
+            index = table.current[gid]
+            table.turn_start[gid] = table.positions[gid * table.max_players + index]
+            if index == 0:
+                table.turn[gid] += 1
+
+    def roll(self) -> Tuple[int, ...]:
+        return self.rules.roll(self._table.dice)
+
+    def choose(self, rolls: Tuple[int, ...]) -> int:
+        options = self.rules.options(rolls)
+        if len(options) == 1:
+            return options[0]
+        return GREEDY.choose(self, rolls, options)
+
+    def move_current(self, rolls: Tuple[int, ...], steps: int) -> int:
+        table, gid = self._table, self._gid
+        rules = self.rules
+        slot = gid * table.max_players + table.current[gid]
+        table.forfeited[gid] = 0
+        if rules.bonus(rolls, table.dice.max_roll):
+            table.streak[gid] += 1
+            if table.streak[gid] == rules.penalty_streak:
+                table.streak[gid] = 0
+                table.forfeited[gid] = 1
+                table.positions[slot] = table.turn_start[gid]
+                return table.turn_start[gid]
+        else:
+            table.streak[gid] = 0
+        pre, table.positions[slot] = rules.move(self.board, table.positions[slot], steps)
+        return pre
+
+    def end_move(self):
+        table, gid = self._table, self._gid
+        index = table.current[gid]
+        if table.positions[gid * table.max_players + index] == self.board.final_square:
+            table.state[gid] = GameState.GAME_OVER.value
+            table.winner[gid] = index
+            table.streak[gid] = 0
+        elif not table.streak[gid]:
+            table.current[gid] = (index + 1) % table.num_players[gid]
+
+    def take_turn(self):
+        """与 Game.take_turn 相同：按这局的规则掷骰、选择、走棋、换人，返回 (走的步数, 新位置)"""
+        table = self._table
+        slot = self._gid * table.max_players + table.current[self._gid]
+        self.begin_roll()
+        rolls = self.roll()
+        steps = self.choose(rolls)
+        self.move_current(rolls, steps)
+        self.end_move()
+        return steps, table.positions[slot]
+
+    def to_game(self) -> Game:
+        """还原成一个普通的 Game 对象（棋盘仍然是共享的那一个）"""
+        players = []
+        for p in self.players:
+            player = Player(p.name, p.color, p.number, is_bot=p.is_bot)
+            player.move_to(p.position)
+            players.append(player)
+        game = Game(self.board, players, self.dice, self.rules)
+        game.current_index = self.current_index
+        game.turn = self.turn
+        game.streak = self.streak
+        game.turn_start = self.turn_start
+        game.forfeited = self.forfeited
+        game.state = self.state
+        index = self._table.winner[self._gid]
+        game.winner = None if index == NO_WINNER else players[index]
+        return game
+
+    def __repr__(self):
+        return f"GameView({self._gid}, turn={self.turn}, state={self.state.name})"
@@ -1,8 +1,12 @@
 import tkinter as tk
 from tkinter import messagebox, simpledialog, filedialog
-from PIL import Image, ImageTk, ImageDraw # 需要安装 Pillow 库
+from PIL import Image, ImageTk # 需要安装 Pillow 库
 import math
 import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 import json
 from typing import List, Optional, Dict, Tuple
 
@@ -10,8 +14,18 @@ from typing import List, Optional, Dict, Tuple
 from game_state import GameState # 游戏状态枚举
 from player import Player       # 玩家类 (来自 player.py)
 from dice import Dice           # 骰子类 (来自 dice.py)
-from board import Board         # 棋盘类 (来自 board.py)
+from board import Board, DEFAULT_LADDERS, DEFAULT_SNAKES # 棋盘类与默认布局 (来自 board.py)
 from game_core import Game      # 游戏核心逻辑类 (来自 game_core.py)
+from journal import Journal, EXTENSION as JOURNAL_EXTENSION # 对局日志 (来自 journal.py)
+from save_store import SaveStore, SaveSlot, DB_NAME, PAGE_SIZE # 多槽位存档库 (来自 save_store.py)
+from autosave import Autosaver  # 后台自动存档 (来自 autosave.py)
+from sprite_cache import default_cache # 预处理精灵图的缓存 (来自 sprite_cache.py)
+import image_ops                # 向量化的去背景 / 灰度化 (来自 image_ops.py)
+import dice_renderer            # 程序绘制的骰子图集 (来自 dice_renderer.py)
+from animator import Animator, ease_in_out_cubic # 统一的帧时钟 (来自 animator.py)
+from rules import GameRules     # 可选规则 (来自 rules.py)
+from strategies import ExpectimaxStrategy # 电脑玩家的决策 (来自 strategies.py)
+import snapshot
 from point import Point         # 坐标类 (来自 point.py)
 
 
@@ -24,22 +38,183 @@ FULL_WINDOW_WIDTH = WINDOW_PX + MENU_WIDTH # 新增：总窗口宽度
 PLAYER_RADIUS = 12
 PLAYER_COLORS = ["red", "blue", "green", "purple", "orange", "cyan"]
 ANIMATION_STEP_MS = 120
+BOT_DELAY_MS = 1000 # 电脑玩家出手前的停顿（1x 时）
+# 速度档位：动画和停顿按倍数缩短；0 表示极速，回合不播动画直接结算（人类玩家有选择时仍然会问）
+SPEED_LEVELS = (("1x", 1), ("4x", 4), ("16x", 16), ("Instant", 0))
+INSTANT_FRAME_BUDGET = 0.008 # 极速模式下每帧最多花在结算回合上的秒数，之后让界面刷新一次
+FAST_FORWARD_MAX_TURNS = 1_000_000 # 快进的保险上限
 
 ANIMAL_IMAGE_FILES = ["monkey.png", "elephant.png", "giraffe.png", "panda.png"]
 
 ANIMAL_EMOJI = ["🐱", "🐘", "🦒", "🐼"]
 
-DEFAULT_LADDERS = {3: 51, 6: 27, 20: 70, 36: 55, 63: 95, 68: 98}
-DEFAULT_SNAKES = {34: 1, 25: 5, 47: 19, 65: 52, 87: 57, 91: 61, 99: 69}
-
+# 旧版的单文件存档：第一次打开存档库时会被导入为一个槽位
 SAVE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "savegame.json")
+STORE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), DB_NAME)
+AUTOSAVE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "autosave" + snapshot.EXTENSION)
+JOURNAL_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "journal" + JOURNAL_EXTENSION)
 
 # --- 3D 骰子模拟常量 (新增或修改) ---
 DICE_3D_FRAMES_COUNT = 30 
+DICE_FRAME_MS = 40 # 掷骰动画每帧的目标间隔
+DICE_BOUNCE_MS = 320
+TOKEN_HOP_PX = 10 # 棋子走一格时跳起的高度
+ASSET_POLL_MS = 30 # 主线程检查后台预处理是否完成的间隔
+SAVE_POLL_MS = 30 # 主线程检查手动保存是否写完的间隔
+RESIZE_DEBOUNCE_MS = 150 # 窗口停止拖动这么久之后才按新尺寸重画
+MIN_BOARD_PX = 300
+LAYER_CACHE_SIZE = 4 # 最多保留几个尺寸的底图 / 棋子图层
+BOARD_SOURCE_PX = 1400 # 底图解码后保留的源尺寸，各个画布尺寸都从它缩放
+TOKEN_SOURCE_PX = 256 # 棋子去背景后保留的源尺寸
 DICE_3D_THROW_BASE_NAME = "dice_3d_throw_" 
 DICE_3D_RESULT_BASE_NAME = "dice_3d_result_"
 
 
+_asset_executor: Optional[ThreadPoolExecutor] = None
+
+def _asset_pool() -> ThreadPoolExecutor:
+    """所有 GameUI 共用一个后台线程：预处理任务排队执行，精灵图缓存不会被并发访问"""
+    global _asset_executor
+    if _asset_executor is None:
+        _asset_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="assets")
+    return _asset_executor
+
+
+_save_store: Optional[SaveStore] = None
+_import_lock = threading.Lock()
+
+def _open_store() -> SaveStore:
+    """打开一个存档库连接；空库第一次打开时导入旧的 savegame.json（加锁，两个线程不会各导入一次）"""
+    store = SaveStore(STORE_PATH)
+    with _import_lock:
+        if store.count() == 0 and os.path.exists(SAVE_PATH):
+            temp_game = Game(Board(DEFAULT_LADDERS, DEFAULT_SNAKES, canvas_px=WINDOW_PX), [], Dice())
+            store.import_file(SAVE_PATH, temp_game)
+    return store
+
+def open_save_store() -> SaveStore:
+    """界面线程共用的存档库连接（列出和读取槽位）"""
+    global _save_store
+    if _save_store is None:
+        _save_store = _open_store()
+    return _save_store
+
+
+_store_executor: Optional[ThreadPoolExecutor] = None
+_worker_store: Optional[SaveStore] = None
+
+def _store_pool() -> ThreadPoolExecutor:
+    """手动保存在这个后台线程里写库；sqlite3 的连接只能在创建它的线程里用，所以它单独开一个连接"""
+    global _store_executor
+    if _store_executor is None:
+        _store_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="savestore")
+    return _store_executor
+
+def _save_record(record: tuple, slot_id: Optional[int]) -> int:
+    """在 _store_pool 的线程里运行"""
+    global _worker_store
+    if _worker_store is None:
+        _worker_store = _open_store()
+    return _worker_store.save_record(record, slot_id)
+
+
+# --- 存档选择：LoadDialog (分页列出存档库里的槽位) ---
+
+class LoadDialog(simpledialog.Dialog):
+    def __init__(self, master, store: SaveStore):
+        self.store = store
+        self.slots: List[SaveSlot] = []
+        """每一页的起点（上一页最后一项的 page_key），第一页为 None"""
+        self._pages: List[Optional[Tuple[float, int]]] = [None]
+        self.player_var = tk.StringVar(master)
+        self.result = None
+        """读档成功时是读进来的 Game（规则、轮到谁、再掷一次的进度都在里面）"""
+        self.game: Optional[Game] = None
+        super().__init__(master)
+
+    def body(self, master):
+        self.title("Load Game")
+
+        search = tk.Frame(master)
+        tk.Label(search, text="Player:").pack(side=tk.LEFT)
+        entry = tk.Entry(search, textvariable=self.player_var, width=20)
+        entry.pack(side=tk.LEFT, padx=5)
+        entry.bind("<Return>", lambda e: self._reset())
+        tk.Button(search, text="Filter", command=self._reset).pack(side=tk.LEFT)
+        search.pack(pady=(5, 5))
+
+        self.listbox = tk.Listbox(master, width=70, height=PAGE_SIZE, activestyle="dotbox")
+        self.listbox.pack(padx=5)
+        self.listbox.bind("<Double-Button-1>", lambda e: self.ok())
+        self.page_label = tk.Label(master, text="")
+        self.page_label.pack(pady=(5, 0))
+
+        self._show_page()
+        return self.listbox
+
+    def buttonbox(self):
+        box = tk.Frame(self)
+        tk.Button(box, text="< Prev", width=8, command=self._prev_page).pack(side=tk.LEFT, padx=5, pady=5)
+        tk.Button(box, text="Next >", width=8, command=self._next_page).pack(side=tk.LEFT, padx=5, pady=5)
+        tk.Button(box, text="Load", width=10, command=self.ok).pack(side=tk.LEFT, padx=5, pady=5)
+        if os.path.exists(AUTOSAVE_PATH):
+            tk.Button(box, text="Resume Autosave", width=14, command=self._load_autosave).pack(side=tk.LEFT, padx=5, pady=5)
+        tk.Button(box, text="Cancel", width=10, command=self.cancel).pack(side=tk.LEFT, padx=5, pady=5)
+        self.bind("<Escape>", self.cancel)
+        box.pack()
+
+    def _show_page(self):
+        """只查询当前这一页（键集分页），不读取任何存档内容"""
+        player = self.player_var.get().strip() or None
+        self.slots = self.store.list_slots(after=self._pages[-1], player=player)
+        self.listbox.delete(0, tk.END)
+        for slot in self.slots:
+            self.listbox.insert(tk.END, slot.label())
+        if self.slots:
+            self.listbox.selection_set(0)
+        self.page_label.config(text=f"Page {len(self._pages)}  ({self.store.count()} saves)")
+
+    def _reset(self):
+        self._pages = [None]
+        self._show_page()
+
+    def _next_page(self):
+        if len(self.slots) == PAGE_SIZE:
+            self._pages.append(self.store.page_key(self.slots[-1]))
+            self._show_page()
+
+    def _prev_page(self):
+        if len(self._pages) > 1:
+            self._pages.pop()
+            self._show_page()
+
+    def _load_autosave(self):
+        temp_board = Board(DEFAULT_LADDERS, DEFAULT_SNAKES, canvas_px=WINDOW_PX)
+        temp_game = Game(temp_board, [], Dice())
+        loaded_players = temp_game.load_game(AUTOSAVE_PATH)
+        if not loaded_players:
+            messagebox.showerror("Load Failed", "The autosave is corrupted.", parent=self)
+            return
+        self.result = loaded_players
+        self.game = temp_game
+        self.cancel()
+
+    def validate(self):
+        selection = self.listbox.curselection()
+        if not selection:
+            messagebox.showwarning("Load Game", "Select a saved game first.", parent=self)
+            return False
+        temp_board = Board(DEFAULT_LADDERS, DEFAULT_SNAKES, canvas_px=WINDOW_PX)
+        temp_game = Game(temp_board, [], Dice())
+        loaded_players = self.store.load(self.slots[selection[0]].id, temp_game)
+        if not loaded_players:
+            messagebox.showerror("Load Failed", "This save is corrupted.", parent=self)
+            return False
+        self.result = loaded_players
+        self.game = temp_game
+        return True
+
+
 # --- UI 分层配置：SetupDialog (继承 tk.simpledialog.Dialog) ---
 
 class SetupDialog(simpledialog.Dialog):
@@ -47,7 +222,16 @@ class SetupDialog(simpledialog.Dialog):
         self.load_only = load_only
         self.players_list: Optional[List[Player]] = None
         self.num_players_var = tk.IntVar(master, value=2)
+        self.choose_die_var = tk.BooleanVar(master, value=False)
+        self.allow_skip_var = tk.BooleanVar(master, value=False)
+        """家庭规则（见 rules.py）"""
+        self.exact_finish_var = tk.BooleanVar(master, value=False)
+        self.extra_roll_var = tk.BooleanVar(master, value=False)
+        self.three_sixes_var = tk.BooleanVar(master, value=False)
+        self.snakes_to_start_var = tk.BooleanVar(master, value=False)
         self.result = None  # 关键修复：初始化 result 属性，确保总是存在
+        self.rules: Optional[GameRules] = None # 新游戏选择的规则；读档时是存档里的规则
+        self.loaded: Optional[Game] = None # 读档时读进来的 Game
         super().__init__(master) 
 
     def body(self, master):
@@ -59,6 +243,12 @@ class SetupDialog(simpledialog.Dialog):
             tk.Label(master, text="Number of Human Players (1-4):").pack()
             tk.Spinbox(master, from_=1, to=4, textvariable=self.num_players_var, width=5).pack()
             tk.Label(master, text="Note: 1 player will add a CPU Bot.").pack(pady=(5, 10))
+            tk.Checkbutton(master, text="Roll two dice, move by either one", variable=self.choose_die_var).pack(anchor=tk.W)
+            tk.Checkbutton(master, text="Allow skipping a move", variable=self.allow_skip_var).pack(anchor=tk.W)
+            tk.Checkbutton(master, text="Land exactly on the last square (bounce back)", variable=self.exact_finish_var).pack(anchor=tk.W)
+            tk.Checkbutton(master, text="Roll again on a 6", variable=self.extra_roll_var).pack(anchor=tk.W)
+            tk.Checkbutton(master, text="Three 6s in a row lose the turn", variable=self.three_sixes_var).pack(anchor=tk.W)
+            tk.Checkbutton(master, text="Snakes send you back to start", variable=self.snakes_to_start_var).pack(anchor=tk.W)
         else:
             tk.Label(master, text="Select Load Game or Cancel.", font=("Arial", 12)).pack(pady=10)
 
@@ -101,36 +291,51 @@ class SetupDialog(simpledialog.Dialog):
             messagebox.showinfo("Bot Added", "Only one human player. Added CPU Bot.", parent=self.master)
         
         self.result = players_list
+        three_sixes = self.three_sixes_var.get() # 连续三个 6 的惩罚本身就意味着 6 可以再掷
+        self.rules = GameRules(self.choose_die_var.get(), self.allow_skip_var.get(),
+                               overshoot="bounce" if self.exact_finish_var.get() else "clamp",
+                               snakes_to_start=self.snakes_to_start_var.get(),
+                               extra_roll=self.extra_roll_var.get() or three_sixes,
+                               penalty_streak=3 if three_sixes else 0)
 
     def load_game(self):
-        # 实例化 Board 时需要传递必要的参数
-        temp_board = Board(DEFAULT_LADDERS, DEFAULT_SNAKES, canvas_px=WINDOW_PX) 
-        temp_game = Game(temp_board, [], Dice())
-        
-        loaded_players = temp_game.load_game(SAVE_PATH)
-        
+        store = open_save_store()
+        if store.count() == 0 and not os.path.exists(AUTOSAVE_PATH):
+            messagebox.showerror("Load Failed", "No saved games found.", parent=self.master)
+            self.result = None
+            return
+
+        dialog = LoadDialog(self, store)
+        loaded_players = dialog.result
         if loaded_players:
             self.result = loaded_players
+            self.loaded = dialog.game
+            self.rules = dialog.game.rules
             self.cancel() 
         else:
-            messagebox.showerror("Load Failed", "No save file found or file is corrupted.", parent=self.master)
-            self.result = None
+            self.result = None # 在选择框里取消了
 
 
 # --- GameUI (主游戏界面) ---
 
 class GameUI:
-    def __init__(self, root, initial_players: List[Player], board_image_name="snakes_and_ladders_boardimage.jpg"):
+    def __init__(self, root, initial_players: List[Player], board_image_name="snakes_and_ladders_boardimage.jpg",
+                 rules: Optional[GameRules] = None, loaded: Optional[Game] = None):
         self.root = root
         self.root.title("Snakes and Ladders")
         self.board_image_name = board_image_name
         self.players = initial_players
         
         # 核心修复 1: 初始化待取消的动画 ID 列表 (解决 TclError 的关键)
-        self._pending_after_ids: List[str] = [] 
+        # 所有动画和延时动作都挂在这一个帧时钟上，按分组取消
+        self.animator = Animator(self.root)
+        self.speed = 1
+        self._fast_forward_pending = False
+        self._choice_frame = None
+        self._saving = False
         
         self.root.geometry(f"{FULL_WINDOW_WIDTH}x{WINDOW_PX + 50}") 
-        self.root.resizable(True, False) 
+        self.root.resizable(True, True) 
 
         # 1. 创建主 Frame
         self.main_frame = tk.Frame(self.root)
@@ -142,66 +347,179 @@ class GameUI:
             snakes=DEFAULT_SNAKES, 
             canvas_px=WINDOW_PX
         )
-        self.game = Game(self.board, self.players, Dice())
-        
-        # 检查这是否是一个加载的游戏（即是否有玩家不在起始点 0）
-        is_loaded_game = any(p.position > 0 for p in self.players)
+        self.game = Game(self.board, self.players, Dice(), rules)
+        # 电脑玩家默认用 expectimax；规则有选择时先把单人模型算好，之后每步只做搜索
+        for p in self.players:
+            if p.is_bot and p.strategy is None:
+                p.strategy = ExpectimaxStrategy()
+                if self.game.rules.has_choices:
+                    p.strategy.prepare(self.game)
+        """存档库里对应的槽位：第一次保存时新建，之后的保存覆盖同一个槽位"""
+        self.save_slot: Optional[int] = None
+        """每个回合结束时在后台线程里自动存档（不阻塞界面）"""
+        self.autosaver = Autosaver(AUTOSAVE_PATH)
         
-        if not is_loaded_game:
-            # 如果是新游戏（玩家位置都是 0），则调用 start_new_game 彻底初始化状态
+        # 是否读档看有没有传进读出来的 Game，而不是看棋子位置：所有人都还在 0 格的存档也要接着它的进度
+        if loaded is None:
+            # 新游戏：调用 start_new_game 彻底初始化状态
             self.game.start_new_game() 
         else:
-             # 如果是加载的游戏，我们只需设置当前玩家索引和状态
-             self.game.current_index = next((i for i, p in enumerate(self.players) if p.number == 1), 0)
-             self.game.state = GameState.WAITING_ROLL
+            # 读档：轮到谁、回合数和一串“再掷一次”的进度都按存档恢复（规则已经通过 rules 传进来）
+            self.game.current_index = loaded.current_index
+            self.game.turn = loaded.turn
+            self.game.streak, self.game.turn_start = loaded.streak, loaded.turn_start
+            self.game.state = GameState.WAITING_ROLL
+
+        # 从当前局面开始写对局日志（可回放，也能转回普通存档）
+        self.game.attach_journal(Journal(JOURNAL_PATH))
         
         # 3. 布局：左侧画布，右侧控制面板
-        self.canvas = tk.Canvas(self.main_frame, width=WINDOW_PX, height=WINDOW_PX, bg="white")
-        self.canvas.pack(side=tk.LEFT, fill=tk.Y, expand=False) 
+        # 画布随窗口缩放；棋盘始终是正方形，边长取画布宽高中较小的那个
+        self.canvas = tk.Canvas(self.main_frame, width=WINDOW_PX, height=WINDOW_PX, bg="white", highlightthickness=0)
+        self.canvas.pack(side=tk.LEFT, fill=tk.BOTH, expand=True) 
         
         self.control_frame = tk.Frame(self.main_frame, width=MENU_WIDTH, bg='gray')
-        self.control_frame.pack(side=tk.RIGHT, fill=tk.BOTH, expand=True)
+        self.control_frame.pack(side=tk.RIGHT, fill=tk.Y, expand=False)
         self.control_frame.pack_propagate(False) 
         
-        self._load_board_image(board_image_name)
+        # 当前棋盘边长（像素）以及按边长缓存的图层：{边长: {"board": PhotoImage, "tokens": [PhotoImage]}}
+        self.board_px = WINDOW_PX
+        self._layers: "OrderedDict[int, Dict[str, object]]" = OrderedDict()
+        self._board_source: Optional[Image.Image] = None
+        """去背景后的棋子源图（TOKEN_SOURCE_PX 大小），各尺寸的棋子都从它缩放"""
+        self._token_sprites: List[Optional[Image.Image]] = [None] * len(self.players)
+        self._resize_after_id = None
+        self.canvas.bind("<Configure>", self._on_canvas_configure)
+
+        # 底图在后台线程解码，先画网格占位
         self._draw_board()
         self._setup_control_panel() 
 
-        # 4. 初始化棋子和骰子
+        # 4. 初始化棋子和骰子：先画占位的圆形棋子，图片在后台线程里预处理好再换上
+        self._sprites = default_cache() # 所有 GameUI 共享，重新开局不再重复处理像素
         self.player_tokens = [None] * len(self.players)
-        self._animal_image_refs = [None] * len(self.players)
-        self._animal_photo_refs = [None] * len(self.players)
         self._draw_all_players()
         
-        self._dice_size = 64  # 保持骰子显示大小不变
-        # 但在内部以更高分辨率生成，然后缩放到 64px 显示
-        self._dice_size_internal = 5120  # 内部生成时用 5120px 的超高分辨率（提高 10 倍）
-        self._dice_images = self._prepare_dice_images(self._dice_size_internal) 
-        
-        self._dice_sequence, self._dice_results_3d = self._load_dice_sequence() 
-        self._dice_photo_refs = [ImageTk.PhotoImage(img) for img in self._dice_images] 
+        self._dice_size = 64  # 骰子显示大小
+        self._dice_images: List[Image.Image] = []
+        self._dice_sequence: List[Image.Image] = []
+        self._dice_results_3d: Dict[int, Image.Image] = {}
+        # 每帧只上传一次到 Tk，动画过程中直接切换这些小图（预处理完成前为空，掷骰时跳过动画）
+        self._dice_sequence_photos = []
+        self._dice_result_photos = {}
+        """最近一次掷骰动画的帧统计：显示帧数、跳过帧数、每帧耗时（秒）"""
+        self.dice_frame_stats: Dict[str, object] = {}
         self._dice_canvas_item = None
+        self.assets_ready = False
+        self._start_asset_preprocessing()
         
         self.update_status()
 
+    # --- 后台预处理精灵图 ---
+    def _start_asset_preprocessing(self):
+        """把棋盘底图、棋子和骰子的解码、去背景、缩放交给后台线程，界面先用网格和占位图形显示"""
+        self.assets_started_at = time.perf_counter()
+        future = _asset_pool().submit(self._preprocess_assets)
+        # 不走 _schedule_animation：取消动画（例如重新开局）时不能把轮询也取消掉
+        self.root.after(ASSET_POLL_MS, lambda: self._poll_assets(future))
+
+    def _preprocess_assets(self):
+        """在后台线程里运行：只做 PIL / NumPy 计算，不碰任何 Tk 对象"""
+        board_img = self._load_board_image(self.board_image_name)
+        resample_mode = self._get_resample_mode('LANCZOS')
+        sprites = []
+        for i, p in enumerate(self.players):
+            # 电脑玩家用灰度图，灰度化也在缓存里完成
+            sprites.append(self._load_animal_image(i, TOKEN_SOURCE_PX, resample_mode, grayscale=p.is_bot))
+        self._dice_images = self._prepare_dice_images(self._dice_size)
+        sequence, results = self._load_dice_sequence()
+        return board_img, sprites, sequence, results
+
+    def _poll_assets(self, future):
+        """主线程轮询：后台完成后上传 PhotoImage 并把占位棋子换成图片"""
+        if not self.canvas.winfo_exists():
+            return
+        if not future.done():
+            self.root.after(ASSET_POLL_MS, lambda: self._poll_assets(future))
+            return
+        try:
+            board_img, sprites, self._dice_sequence, self._dice_results_3d = future.result()
+        except Exception:
+            return # 预处理失败就一直使用网格、占位棋子和无动画掷骰
+        self._board_source = board_img
+        self._token_sprites = sprites
+        self._layers.clear() # 旧图层里只有占位内容
+        self._draw_board()
+        self._dice_sequence_photos = [ImageTk.PhotoImage(img) for img in self._dice_sequence]
+        self._dice_result_photos = {n: ImageTk.PhotoImage(img) for n, img in self._dice_results_3d.items()}
+        self._draw_all_players()
+        self.assets_ready = True
+        self.assets_ready_after = time.perf_counter() - self.assets_started_at
+
+    # --- 缩放：防抖 + 按尺寸缓存的图层 ---
+    def _on_canvas_configure(self, event):
+        """拖动窗口时会连续触发；只在停下 RESIZE_DEBOUNCE_MS 之后按最终尺寸重画一次"""
+        px = max(MIN_BOARD_PX, min(event.width, event.height))
+        px -= px % self.board.size # 取格数的整数倍，格子中心与底图严格对齐
+        if self._resize_after_id is not None:
+            self.root.after_cancel(self._resize_after_id)
+        self._resize_after_id = self.root.after(RESIZE_DEBOUNCE_MS, lambda: self._apply_board_size(px))
+
+    def _apply_board_size(self, px: int):
+        self._resize_after_id = None
+        if px == self.board_px or not self.canvas.winfo_exists():
+            return
+        self.board_px = px
+        self._draw_board()
+        self._draw_all_players()
+
+    def _token_px(self, px: int) -> int:
+        """棋子图片的边长：格子的 1.2 倍，使角色更加逼真"""
+        return max(int(px // self.board.size * 1.2), self._token_radius(px) * 3)
+
+    def _token_radius(self, px: Optional[int] = None) -> int:
+        return max(4, round(PLAYER_RADIUS * (px or self.board_px) / WINDOW_PX))
+
+    def _layer(self, px: int) -> Dict[str, object]:
+        """边长为 px 时的底图和棋子 PhotoImage；最近用过的 LAYER_CACHE_SIZE 个尺寸留在缓存里"""
+        layer = self._layers.get(px)
+        if layer is not None:
+            self._layers.move_to_end(px)
+            return layer
+
+        resamp = self._get_resample_mode('LANCZOS')
+        board = None
+        if self._board_source is not None:
+            board = ImageTk.PhotoImage(self._board_source.resize((px, px), resamp))
+        tokens = []
+        size = self._token_px(px)
+        for sprite in self._token_sprites:
+            if sprite is None:
+                tokens.append(None)
+                continue
+            w, h = sprite.size; aspect = w / h if h != 0 else 1
+            if aspect >= 1: new_w = size; new_h = max(1, int(size / aspect))
+            else: new_h = size; new_w = max(1, int(size * aspect))
+            tokens.append(ImageTk.PhotoImage(sprite.resize((new_w, new_h), resamp)))
+
+        layer = self._layers[px] = {"board": board, "tokens": tokens}
+        if len(self._layers) > LAYER_CACHE_SIZE:
+            self._layers.popitem(last=False)
+        return layer
+
     # --- 核心修复 2: 动画调度与取消辅助方法 (解决 TclError 的关键) ---
-    def _schedule_animation(self, ms: int, callback):
-        """Schedules a callback and stores its ID for later cancellation."""
+    def _schedule_animation(self, ms: int, callback, group: str = "turn"):
+        """ms 毫秒后在帧时钟上执行 callback；返回的 id 可以交给 animator.cancel_tween"""
         if self.root.winfo_exists():
-            new_id = self.root.after(ms, callback)
-            self._pending_after_ids.append(new_id)
-            return new_id
+            return self.animator.call_later(ms, callback, group)
         return None
 
     def _cancel_all_pending_animations(self):
-        """Cancels all stored after() events. (解决 TclError 的关键)"""
-        for after_id in self._pending_after_ids:
-            try:
-                # after_cancel may raise an exception if the ID has already fired/is invalid
-                self.root.after_cancel(after_id)
-            except Exception:
-                pass 
-        self._pending_after_ids = []
+        """取消帧时钟上的全部动画和延时动作 (解决 TclError 的关键)"""
+        self.animator.cancel()
+        if self._choice_frame is not None:
+            self._choice_frame.destroy() # 等待人类选择的这一步也一起作废
+            self._choice_frame = None
 
     # --- UI 辅助方法 (与之前提供的完整代码一致) ---
     
@@ -211,16 +529,27 @@ class GameUI:
         except AttributeError:
             return getattr(Image, mode_name, Image.BICUBIC)
             
-    def _load_board_image(self, img_path):
+    def _load_board_image(self, img_path) -> Optional[Image.Image]:
+        """解码并缩放棋盘底图（在后台线程里运行，结果进精灵图缓存）"""
+        if not os.path.isabs(img_path) and not os.path.exists(img_path):
+            img_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), img_path)
+        if not os.path.exists(img_path):
+            return None
         resamp = self._get_resample_mode('LANCZOS')
-        if os.path.exists(img_path):
-            try:
-                pil_img = Image.open(img_path).resize((WINDOW_PX, WINDOW_PX), resamp)
-                self.board_tk = ImageTk.PhotoImage(pil_img)
-            except Exception:
-                self.board_tk = None
-        else:
-            self.board_tk = None
+
+        def build():
+            pil_img = Image.open(img_path)
+            # JPEG 在解码阶段直接按 1/2、1/4、1/8 缩小（不小于目标尺寸），省掉全分辨率解码
+            pil_img.draft(pil_img.mode, (BOARD_SOURCE_PX, BOARD_SOURCE_PX))
+            pil_img = pil_img.convert('RGB')
+            if pil_img.width > BOARD_SOURCE_PX:
+                pil_img = pil_img.resize((BOARD_SOURCE_PX, BOARD_SOURCE_PX), resamp)
+            return pil_img
+
+        try:
+            return self._sprites.get(self._sprites.key(img_path, BOARD_SOURCE_PX, None, False, "board", int(resamp)), build)
+        except Exception:
+            return None
 
     def _setup_control_panel(self):
         # 顶部菜单标题
@@ -303,6 +632,20 @@ class GameUI:
         )
         self.roll_button.pack(pady=(0, 10))
 
+        # 速度档位 + 快进到终局
+        speed_frame = tk.Frame(self.control_frame, bg='gray')
+        speed_frame.pack(pady=(0, 10))
+        tk.Label(speed_frame, text="Speed", bg='gray', fg='white').pack(side=tk.LEFT, padx=(0, 5))
+        self.speed_var = tk.StringVar(value=SPEED_LEVELS[0][0])
+        tk.OptionMenu(speed_frame, self.speed_var, *(label for label, _ in SPEED_LEVELS),
+                      command=self.set_speed).pack(side=tk.LEFT)
+        tk.Button(
+            self.control_frame,
+            text="Fast Forward",
+            width=15,
+            command=self.on_fast_forward
+        ).pack(pady=(0, 10))
+
         # ✅ Log 标题单独放在下面（不再挤在 status_frame 里）
         log_label = tk.Label(
             self.control_frame,
@@ -325,8 +668,8 @@ class GameUI:
         self.log_text.pack(fill=tk.BOTH, expand=True, padx=10, pady=(0, 10))
 
     def add_log(self, text: str):
-        """往右下角 Log 区追加一行文字。"""
-        if not hasattr(self, "log_text"):
+        """往右下角 Log 区追加文字（多行一次插入，极速和快进时不逐行刷新）。"""
+        if not hasattr(self, "log_text") or not text:
             return
         self.log_text.config(state="normal")
         self.log_text.insert(tk.END, text + "\n")
@@ -334,49 +677,28 @@ class GameUI:
         self.log_text.config(state="disabled")
 
     def _draw_board(self):
-        if getattr(self, 'board_tk', None):
-            self.canvas.create_image(0, 0, anchor=tk.NW, image=self.board_tk)
+        """按当前边长重画底图（没有底图时画网格和格号），并压到最下层"""
+        self.canvas.delete("board", "grid")
+        px = self.board_px
+        board_tk = self._layer(px)["board"]
+        if board_tk is not None:
+            self.canvas.create_image(0, 0, anchor=tk.NW, image=board_tk, tags="board")
+            self.canvas.tag_lower("board")
             return
-        cell = self.board.cell_px
-        for i in range(self.board.size + 1):
-            x = i * cell
-            self.canvas.create_line(x, 0, x, WINDOW_PX, fill="#aaa")
-            y = i * cell
-            self.canvas.create_line(0, y, WINDOW_PX, y, fill="#aaa")
-        for n, pt in self.board.square_coord.items():
-            self.canvas.create_text(pt.x - cell // 2 + 5, pt.y + cell // 2 - 5, text=str(n), anchor=tk.NW, font=("Arial", 8))
+        cell = px // self.board.size
+        rows, cols = self.board.rows, self.board.cols
+        for i in range(cols + 1):
+            self.canvas.create_line(i * cell, 0, i * cell, cell * rows, fill="#aaa", tags="grid")
+        for i in range(rows + 1):
+            self.canvas.create_line(0, i * cell, cell * cols, i * cell, fill="#aaa", tags="grid")
+        for n in range(1, self.board.final_square + 1):
+            x, y = self.board.square_center(n, px)
+            self.canvas.create_text(x - cell // 2 + 5, y + cell // 2 - 5, text=str(n), anchor=tk.NW, font=("Arial", 8), tags="grid")
+        self.canvas.tag_lower("grid")
 
     def _prepare_dice_images(self, size: int = 64):
-        """生成骰子图像。内部用高分辨率生成，然后缩放到最终显示大小。"""
-        imgs = []
-        def pip_positions(n, s):
-            gap = 0.22; center = (0.5, 0.5); left = (0.5 - gap, 0.5); right = (0.5 + gap, 0.5)
-            topleft = (0.5 - gap, 0.5 - gap); topright = (0.5 + gap, 0.5 - gap)
-            bottomleft = (0.5 - gap, 0.5 + gap); bottomright = (0.5 + gap, 0.5 + gap)
-            mapping = {
-                1: [center], 2: [topleft, bottomright], 3: [topleft, center, bottomright],
-                4: [topleft, topright, bottomleft, bottomright],
-                5: [topleft, topright, center, bottomleft, bottomright],
-                6: [topleft, left, topright, bottomleft, right, bottomright]
-            }
-            pts = mapping.get(n, [center])
-            return [(int(x * s), int(y * s)) for (x, y) in pts]
-            
-        for n in range(1, 7):
-            img = Image.new('RGBA', (size, size), (240, 240, 240, 255))
-            draw = ImageDraw.Draw(img); pad = int(size * 0.06)
-            draw.rounded_rectangle([(pad, pad), (size - pad - 1, size - pad - 1)], radius=max(8, size // 32), fill=(255, 255, 255), outline=(30, 30, 30), width=max(2, size // 128))
-            pip_r = max(4, size // 12)
-            for (px, py) in pip_positions(n, size):
-                draw.ellipse([(px - pip_r, py - pip_r), (px + pip_r, py + pip_r)], fill=(20, 20, 20))
-            
-            # 如果内部大小大于显示大小，则缩放到显示大小
-            if size > self._dice_size:
-                resamp = self._get_resample_mode('LANCZOS')
-                img = img.resize((self._dice_size, self._dice_size), resamp)
-            
-            imgs.append(img)
-        return imgs
+        """生成骰子图像（4 倍超采样抗锯齿，同一尺寸在进程里只画一次）"""
+        return list(dice_renderer.get_atlas(size, DICE_3D_FRAMES_COUNT).faces)
 
     def _load_dice_sequence(self) -> Tuple[List[Image.Image], Dict[int, Image.Image]]:
         sequence = []
@@ -384,159 +706,124 @@ class GameUI:
         path_dir = os.path.dirname(os.path.abspath(__file__))
         resamp = self._get_resample_mode('LANCZOS')
         
+        def build(path):
+            img = Image.open(path).convert('RGBA')
+            # 【新增】对骰子图片去除背景
+            img = self._remove_background(img, tolerance=50)
+            return img.resize((self._dice_size, self._dice_size), resamp)
+
+        def cached(path):
+            if not os.path.exists(path):
+                raise FileNotFoundError(path)
+            key = self._sprites.key(path, self._dice_size, 50, False, int(resamp))
+            return self._sprites.get(key, lambda: build(path))
+
         try:
             for n in range(1, 7):
                 fname = f"{DICE_3D_RESULT_BASE_NAME}{n}.png"
-                path = os.path.join(path_dir, fname)
-                img = Image.open(path).convert('RGBA')
-                # 【新增】对骰子结果图片去除背景
-                img = self._remove_background(img, tolerance=50)
-                img = img.resize((self._dice_size, self._dice_size), resamp)
-                results[n] = img
+                results[n] = cached(os.path.join(path_dir, fname))
         except Exception:
-            size = self._dice_size
             for n in range(1, 7):
-                img_2d = self._prepare_dice_images(size)[n-1]
-                results[n] = img_2d
+                results[n] = self._dice_images[n-1]
         
         try:
             for i in range(DICE_3D_FRAMES_COUNT):
                 frame_num = str(i + 1).zfill(0)
                 fname = f"{DICE_3D_THROW_BASE_NAME}{frame_num}.png"
-                path = os.path.join(path_dir, fname)
-                img = Image.open(path).convert('RGBA')
-                # 【新增】对骰子动画帧去除背景
-                img = self._remove_background(img, tolerance=50)
-                img = img.resize((self._dice_size, self._dice_size), resamp)
-                sequence.append(img)
+                sequence.append(cached(os.path.join(path_dir, fname)))
         except Exception:
-            sequence = [img.copy() for img in self._dice_images] * (DICE_3D_FRAMES_COUNT // 6 + 1)
-            sequence = sequence[:DICE_3D_FRAMES_COUNT] 
+            # 没有 3D 骰子图片时使用图集里程序画的翻滚帧
+            sequence = list(dice_renderer.get_atlas(self._dice_size, DICE_3D_FRAMES_COUNT).frames)
 
         return sequence, results
 
     # 核心修复 3: 使用 _schedule_animation
-    def _animate_dice_throw(self, on_complete):
+    def _animate_dice_throw(self, roll: int, on_complete):
+        """
+        掷骰动画（最后停在 roll 这一面）：骰子是画布上的一个小图片项，每帧只用 coords 移动它、必要时换一张
+        预先上传好的 PhotoImage，不再每帧合成整张画布大小的图片。
+        帧号由真实时间决定，机器慢时直接跳到该显示的那一帧，总时长保持不变。
+        """
         start_x, start_y = 60, 60
-        end_x = WINDOW_PX // 2
-        end_y = WINDOW_PX // 2 
+        end_x = self.board_px // 2
+        end_y = self.board_px // 2 
         arc_height = 150
         
-        sequence = self._dice_sequence
-        total_frames = len(sequence) 
+        photos = self._dice_sequence_photos
+        total_frames = len(photos) 
         
         if total_frames == 0:
-            roll = self.game.dice.roll()
             on_complete(roll)
             return
 
-        def frame(i):
-            if not self.canvas.winfo_exists():
-                return
-            
-            t = i / (total_frames - 1)
+        stats = self.dice_frame_stats = {"frames": 0, "skipped": 0, "cost": []}
+        shown = [-1]
+
+        def frame(t):
+            # 帧号由进度决定，tick 来晚了就跳过中间的帧
+            started = time.perf_counter()
+            i = min(int(t * total_frames), total_frames - 1)
             x = int(start_x + (end_x - start_x) * t)
             y = int(start_y + (end_y - start_y) * t - arc_height * (4 * t * (1 - t)))
-            
-            current_image = sequence[i % len(sequence)]
-            
-            try: 
-                final_canvas = Image.new('RGBA', (WINDOW_PX, WINDOW_PX), (0, 0, 0, 0))
-                paste_x = x - current_image.width // 2
-                paste_y = y - current_image.height // 2
-                final_canvas.paste(current_image, (paste_x, paste_y), current_image)
-                
-                photo = ImageTk.PhotoImage(final_canvas)
-                self._current_dice_photo = photo 
-                
-                if self._dice_canvas_item is None:
-                    self._dice_canvas_item = self.canvas.create_image(0, 0, image=photo, anchor=tk.NW)
-                else:
-                    self.canvas.itemconfig(self._dice_canvas_item, image=photo)
-            except tk.TclError:
-                return
-                
-            if i + 1 < total_frames:
-                self._schedule_animation(40, lambda: frame(i + 1)) 
+            if self._dice_canvas_item is None:
+                self._dice_canvas_item = self.canvas.create_image(x, y, image=photos[i], anchor=tk.CENTER)
             else:
-                roll = self.game.dice.roll()
-                
-                if not self.canvas.winfo_exists():
-                    on_complete(roll) 
-                    return
+                self.canvas.coords(self._dice_canvas_item, x, y)
+                if i != shown[0]:
+                    self.canvas.itemconfig(self._dice_canvas_item, image=photos[i])
+                self.canvas.tag_raise(self._dice_canvas_item)
+            if i != shown[0]:
+                stats["skipped"] += max(0, i - shown[0] - 1)
+                stats["frames"] += 1
+                shown[0] = i
+            stats["cost"].append(time.perf_counter() - started)
+
+        def land():
+            if not self.canvas.winfo_exists():
+                on_complete(roll)
+                return
+            try:
+                self.canvas.itemconfig(self._dice_canvas_item, image=self._dice_result_photos[roll])
+            except (tk.TclError, KeyError):
+                on_complete(roll)
+                return
+            # 落地后弹两下，越弹越低
+            self.animator.animate(DICE_BOUNCE_MS, lambda t: self.canvas.coords(
+                self._dice_canvas_item, end_x, end_y - 10 * abs(math.sin(t * math.pi * 2)) * (1 - t)),
+                                  group="dice", on_done=settled)
 
-                try:
-                    final_base = self._dice_results_3d[roll] 
-                    final_img = Image.new('RGBA', (WINDOW_PX, WINDOW_PX), (0, 0, 0, 0))
-                    final_img.paste(
-                        final_base, 
-                        (end_x - final_base.width // 2, end_y - final_base.height // 2), 
-                        final_base
-                    )
-                    
-                    photo_final = ImageTk.PhotoImage(final_img)
-                    self._current_dice_photo = photo_final
-                    self.canvas.itemconfig(self._dice_canvas_item, image=photo_final)
-                except tk.TclError:
-                    on_complete(roll)
-                    return
-                
-                def bounce(j):
-                    if not self.canvas.winfo_exists():
-                        return
-                        
-                    if j >= 4:
-                        self.dice_label.config(text=f"Dice: {roll}")
-                        on_complete(roll)
-                        return
-                    
-                    try:
-                        offset = -8 if j % 2 == 0 else 5
-                        self.canvas.move(self._dice_canvas_item, 0, offset)
-                    except tk.TclError:
-                        return 
-                        
-                    self._schedule_animation(80, lambda: bounce(j + 1))
-                bounce(0)
-
-        frame(0)
+        def settled():
+            on_complete(roll)
+
+        self.animator.animate(total_frames * DICE_FRAME_MS, frame, group="dice", on_done=land)
 
     def _coords_for_square(self, square: int, player_index: int = 0):
-        if square <= 0:
-            x = 10 + player_index * (PLAYER_RADIUS * 2 + 4)
-            y = WINDOW_PX - 10
+        r = self._token_radius()
+        if square <= 0 or square > self.board.final_square:
+            x = 10 + player_index * (r * 2 + 4)
+            y = self.board_px - 10
             return x, y
             
-        pt = self.board.square_coord.get(square)
-        if not pt:
-            return 10 + player_index * (PLAYER_RADIUS * 2 + 4), WINDOW_PX - 10
-        offset_x = (player_index % 2) * PLAYER_RADIUS * 1.6
-        offset_y = (player_index // 2) * PLAYER_RADIUS * 1.6
-        return pt.x + offset_x, pt.y + offset_y
+        x, y = self.board.square_center(square, self.board_px)
+        offset_x = (player_index % 2) * r * 1.6
+        offset_y = (player_index // 2) * r * 1.6
+        return x + offset_x, y + offset_y
 
     def _draw_all_players(self):
-        resample_mode = self._get_resample_mode('LANCZOS')
+        """按当前位置重画所有棋子；精灵图还没准备好的玩家先画成带 emoji 的圆"""
+        for token in self.player_tokens:
+            if token is not None:
+                for item in token:
+                    if item is not None:
+                        self.canvas.delete(item)
             
+        photos = self._layer(self.board_px)["tokens"]
+        r = self._token_radius()
         for i, p in enumerate(self.players):
             x, y = self._coords_for_square(p.position, i)
-            r = PLAYER_RADIUS
-            # 增加动物图片大小到棋盘单元格的 1.2 倍，使角色更加逼真
-            desired_size = int(self.board.cell_px * 1.2); desired_size = max(desired_size, r * 3)
-            img = self._load_animal_image(i, desired_size, resample_mode)
-
-            if p.is_bot and img is not None:
-                 img_data = img.getdata()
-                 new_data = []
-                 for item in img_data:
-                     avg_color = int(sum(item[:3]) / 3) 
-                     new_data.append(tuple([avg_color] * 3 + [item[3]]))
-                 new_img = Image.new('RGBA', img.size)
-                 new_img.putdata(new_data)
-                 img = new_img
+            photo = photos[i] if i < len(photos) else None
                  
-            if img is not None:
-                photo = ImageTk.PhotoImage(img)
-                self._animal_photo_refs[i] = photo
+            if photo is not None:
                 # 图像锚点设为 S (底部中心)
                 iid = self.canvas.create_image(x, y, image=photo, anchor=tk.S) 
                 self.player_tokens[i] = (iid, None)
@@ -544,136 +831,87 @@ class GameUI:
                 # 几何图形锚点设为中心
                 oid = self.canvas.create_oval(x - r, y - r, x + r, y + r, fill=p.color, outline="black")
                 emoji = ANIMAL_EMOJI[i % len(ANIMAL_EMOJI)]
-                txt_id = self.canvas.create_text(x, y, text=emoji, font=("Arial", int(self.board.cell_px * 0.4)))
+                txt_id = self.canvas.create_text(x, y, text=emoji, font=("Arial", int(self.board_px // self.board.size * 0.4)))
                 self.player_tokens[i] = (oid, txt_id)
 
-    def _remove_background(self, img: Image.Image, tolerance: int = 50) -> Image.Image:
+    def _to_grayscale(self, img: Image.Image) -> Image.Image:
+        """RGB 取平均变成灰度，保留 alpha（电脑玩家的棋子）"""
+        return image_ops.to_grayscale(img)
+
+    def _remove_background(self, img: Image.Image, tolerance: int = 50, feather: float = 0) -> Image.Image:
         """
         移除图片背景（基于背景颜色的相似性检测）。
-        尝试识别背景颜色并将其转为透明。
+        以四个角的平均色为背景色，把相近的像素转为透明（向量化实现见 image_ops.py）。
         
         :param img: PIL Image 对象（应该是 RGBA 格式）
         :param tolerance: 颜色相似度容差（0-255，较小值为更严格）
+        :param feather: 边缘羽化宽度（0 表示不羽化）
         :return: 去除背景后的 Image
         """
-        if img.mode != 'RGBA':
-            img = img.convert('RGBA')
-        
-        data = img.getdata()
-        new_data = []
-        
-        # 获取四个角落的颜色，认为这些是背景色
-        width, height = img.size
-        corner_colors = [
-            img.getpixel((0, 0)),  # 左上
-            img.getpixel((width - 1, 0)),  # 右上
-            img.getpixel((0, height - 1)),  # 左下
-            img.getpixel((width - 1, height - 1))  # 右下
-        ]
-        
-        # 计算背景色的平均值
-        avg_r = sum(c[0] for c in corner_colors) // len(corner_colors)
-        avg_g = sum(c[1] for c in corner_colors) // len(corner_colors)
-        avg_b = sum(c[2] for c in corner_colors) // len(corner_colors)
-        bg_color = (avg_r, avg_g, avg_b)
-        
-        # 遍历每个像素，如果与背景色相似，则设为透明
-        for item in data:
-            if len(item) == 4:
-                r, g, b, a = item
-                # 计算与背景色的欧氏距离
-                dist = ((r - bg_color[0]) ** 2 + (g - bg_color[1]) ** 2 + (b - bg_color[2]) ** 2) ** 0.5
-                if dist < tolerance:
-                    # 设为透明
-                    new_data.append((r, g, b, 0))
-                else:
-                    new_data.append(item)
-            else:
-                new_data.append(item)
-        
-        new_img = Image.new('RGBA', img.size)
-        new_img.putdata(new_data)
-        return new_img
+        return image_ops.remove_background(img, tolerance, feather)
 
-    def _load_animal_image(self, index: int, size: int, resample_mode):
+    def _load_animal_image(self, index: int, size: int, resample_mode, grayscale: bool = False):
         fname = ANIMAL_IMAGE_FILES[index % len(ANIMAL_IMAGE_FILES)]
         path = os.path.join(os.path.dirname(os.path.abspath(__file__)), fname)
         
         if not os.path.exists(path):
             return None
         
-        try:
+        # 【新增】自动移除背景，根据图片类型调整容差值
+        # 不同的图片可能需要不同的容差
+        tolerance = 50  # 默认容差
+
+        def build():
             img = Image.open(path).convert('RGBA')
-            
-            # 【新增】自动移除背景，根据图片类型调整容差值
-            # 不同的图片可能需要不同的容差
-            tolerance = 50  # 默认容差
-            
             img = self._remove_background(img, tolerance=tolerance)
             
             w, h = img.size; aspect = w / h if h != 0 else 1
             if aspect >= 1: new_w = size; new_h = max(1, int(size / aspect))
             else: new_h = size; new_w = max(1, int(size * aspect))
             img = img.resize((new_w, new_h), resample_mode)
-            return img
+            return self._to_grayscale(img) if grayscale else img
+
+        try:
+            # 缓存键包含源文件内容哈希，命中时完全跳过解码和像素处理
+            key = self._sprites.key(path, size, tolerance, grayscale, int(resample_mode))
+            return self._sprites.get(key, build)
         except Exception:
             return None
 
     # 核心修复: 确保 Tcl 操作在 try/except 块中
     def _move_token_canvas(self, player_index: int, square: int):
+        """棋子跳到目标格：一段带弧线的补间，上一段还没播完就先让它落到终点"""
         if not self.canvas.winfo_exists():
             return
+        group = f"token{player_index}"
+        self.animator.cancel(group, finish=True)
 
         x, y = self._coords_for_square(square, player_index)
         oid, txt_id = self.player_tokens[player_index]
-
         try:
             coords = self.canvas.coords(oid)
-            cur_x, cur_y = x, y
-
-            if coords:
-                if len(coords) == 2:  # 对于图片 (anchor = S)
-                    cur_x, cur_y = coords[0], coords[1]
-                elif len(coords) >= 4:  # 对于圆形棋子
-                    cur_x, cur_y = (coords[0] + coords[2]) / 2, (coords[1] + coords[3]) / 2
-
-            # 计算移动距离
-            dx = x - cur_x
-            dy = y - cur_y
-
-            # 先把棋子移动到目标格
-            self.canvas.move(oid, dx, dy)
-            if txt_id is not None:
-                self.canvas.move(txt_id, dx, dy)
-            self.canvas.update()
-
-            # ⭐ 只有猴子(0)和大象(1)做“弹跳”动画
-            if True:
-                self._bounce_token(oid, txt_id, step=0)
-
         except tk.TclError:
             return
-    def _bounce_token(self, oid, txt_id, step=0, max_steps=4, distance=6):
-        """让棋子上下弹跳几下，增加“走路”的感觉。"""
-        if not self.canvas.winfo_exists():
-            return
-        if step >= max_steps:
+        if len(coords) == 2:  # 对于图片 (anchor = S)
+            from_x, from_y = coords
+            half = None
+        elif len(coords) >= 4:  # 对于圆形棋子
+            from_x, from_y = (coords[0] + coords[2]) / 2, (coords[1] + coords[3]) / 2
+            half = (coords[2] - coords[0]) / 2
+        else:
             return
 
-        try:
-            # 偶数帧向上，奇数帧向下
-            offset = -distance if step % 2 == 0 else distance
-            self.canvas.move(oid, 0, offset)
+        def place(t):
+            cx = from_x + (x - from_x) * t
+            cy = from_y + (y - from_y) * t - TOKEN_HOP_PX * 4 * t * (1 - t)
+            if half is None:
+                self.canvas.coords(oid, cx, cy)
+            else:
+                self.canvas.coords(oid, cx - half, cy - half, cx + half, cy + half)
             if txt_id is not None:
-                self.canvas.move(txt_id, 0, offset)
-        except tk.TclError:
-            return
+                self.canvas.coords(txt_id, cx, cy)
 
-        # 40ms 后继续下一帧
-        self._schedule_animation(
-            40,
-            lambda: self._bounce_token(oid, txt_id, step + 1, max_steps, distance)
-        )
+        self.animator.animate(ANIMATION_STEP_MS, place, group=group, easing=ease_in_out_cubic)
 
     def update_status(self):
         if not self.root.winfo_exists() or not self.main_frame.winfo_exists():
@@ -691,8 +929,11 @@ class GameUI:
             can_roll = (self.game.state == GameState.WAITING_ROLL)
             self.roll_button.config(state=(tk.NORMAL if can_roll and not cp.is_bot else tk.DISABLED))
 
-            if cp.is_bot and can_roll:
-                self._schedule_animation(1000, self.on_roll)
+            if can_roll and self._fast_forward_pending:
+                self._schedule_animation(0, self.on_fast_forward, group="bot")
+            elif cp.is_bot and can_roll:
+                # 极速模式下下一帧就接着结算
+                self._schedule_animation(BOT_DELAY_MS if self.speed else 0, self.on_roll, group="bot")
 
     # 【核心修正】: 切换游戏时，触发完全的清理和角色选择流程
     def start_new_game(self):
@@ -700,6 +941,8 @@ class GameUI:
         # 取消所有待处理的动画
         self._cancel_all_pending_animations()
         
+        self._fast_forward_pending = False
+        
         # 延迟执行，确保按钮事件处理完成
         def restart():
             # 重置所有玩家位置到起点
@@ -728,11 +971,30 @@ class GameUI:
         self.root.after(50, restart)
         
     def on_save(self):
+        """界面线程里只把局面编码好，写库（含提交事务）在后台线程进行，写完后由 _poll_save 提示"""
+        if self._saving:
+            return # 上一次还没写完；第一次保存时还没有槽位，连点会多建出槽位
         try:
-            self.game.save_game(SAVE_PATH)
-            messagebox.showinfo("Save Game", f"Game saved successfully to {os.path.basename(SAVE_PATH)}")
+            record = SaveStore.record(self.game)
         except Exception as e:
             messagebox.showerror("Save Failed", f"Could not save the game: {e}")
+            return
+        self._saving = True
+        future = _store_pool().submit(_save_record, record, self.save_slot)
+        self.root.after(SAVE_POLL_MS, lambda: self._poll_save(future))
+
+    def _poll_save(self, future):
+        """主线程轮询后台保存的结果"""
+        if not future.done():
+            self.root.after(SAVE_POLL_MS, lambda: self._poll_save(future))
+            return
+        self._saving = False
+        try:
+            self.save_slot = future.result()
+        except Exception as e:
+            messagebox.showerror("Save Failed", f"Could not save the game: {e}")
+        else:
+            messagebox.showinfo("Save Game", f"Game saved successfully to slot {self.save_slot}")
 
     # 【核心修正】: 切换游戏时，触发完全的清理和加载流程
     def on_load(self):
@@ -749,63 +1011,185 @@ class GameUI:
         # 延迟执行，确保按钮事件处理完成
         self.root.after(50, load_dialog) 
 
+    def set_speed(self, label: str):
+        """切换速度档位；正在播放的动画按原速播完，之后的按新速度"""
+        self.speed = dict(SPEED_LEVELS)[label]
+        self.animator.speed = self.speed or 1
+        # 让已经排好的电脑出手按新速度重新排
+        if self.animator.active("bot"):
+            self.animator.cancel("bot")
+            self.update_status()
+
+    def _resolve_turns(self, stop, max_turns: int) -> int:
+        """
+        按 Game.take_turn 的流程直接结算回合（写日志、换人都由核心完成），不播放动画。
+        每回合之后 stop() 返回 True 或结束时停下；返回结算了多少回合。
+        人类玩家这一把有多个选项时不替他选：停在这一步交给 _ask_human，状态留在 ROLLING_DICE。
+        """
+        game = self.game
+        lines = []
+        count = 0
+        choice = None
+        while count < max_turns and game.state == GameState.WAITING_ROLL:
+            cp = game.current_player()
+            index = game.current_index
+            game.begin_roll()
+            rolls = game.roll()
+            options = game.rules.options(rolls)
+            if len(options) > 1 and not cp.is_bot:
+                choice = (cp, index, rolls, options)
+                break
+            steps = game.choose(rolls)
+            pre = game.move_current(rolls, steps)
+            lines.append(self._describe_roll(cp, rolls, steps))
+            game.end_move()
+            game.record_move(index, steps, pre, GameState.WAITING_ROLL)
+            count += 1
+            if stop():
+                break
+        if count:
+            self.add_log("\n".join(lines))
+            self.dice_label.config(text="Dice: " + " / ".join(map(str, game.last_rolls)))
+            self._draw_all_players() # 每帧只画最终位置
+            self.autosaver.submit(game)
+        if choice:
+            self._ask_human(*choice)
+        return count
+
+    def _ask_human(self, cp: Player, index: int, rolls: Tuple[int, ...], options: Tuple[int, ...]):
+        """批量结算停在了人类玩家要做选择的一步：和动画模式一样在面板上问，选完由 _finish_move 收尾"""
+        self.game.state = GameState.ROLLING_DICE
+        self.update_status()
+        self.dice_label.config(text="Dice: " + " / ".join(map(str, rolls)))
+
+        def chosen(steps):
+            pre = self.game.move_current(rolls, steps)
+            self.add_log(self._describe_roll(cp, rolls, steps))
+            self._draw_all_players()
+            self._finish_move(index, steps, pre)
+
+        self._ask_steps(options, chosen)
+
+    def _play_instant(self):
+        """极速模式：结算到轮到人类玩家、分出胜负或用完这一帧的时间预算"""
+        deadline = time.perf_counter() + INSTANT_FRAME_BUDGET
+        self._resolve_turns(lambda: not self.game.current_player().is_bot or time.perf_counter() > deadline,
+                            FAST_FORWARD_MAX_TURNS)
+        self._after_turns()
+
+    def on_fast_forward(self):
+        """把剩下的对局（包括人类玩家）直接算完，界面跳到终局；人类玩家有选择时停下来问，选完接着快进"""
+        if self.game.state == GameState.GAME_OVER:
+            return
+        if self.game.state != GameState.WAITING_ROLL:
+            # 正在播放的这一步走完后（update_status 里）再快进，保证位置和日志一致
+            self._fast_forward_pending = True
+            return
+        self._fast_forward_pending = False
+        self.animator.cancel()
+        turns = self._resolve_turns(lambda: False, FAST_FORWARD_MAX_TURNS)
+        self.add_log(f"Fast-forwarded {turns} moves.")
+        if self.game.state == GameState.ROLLING_DICE:
+            self._fast_forward_pending = True # 人类玩家选完、这一步走完后（update_status 里）继续
+        self._after_turns()
+
+    def _after_turns(self):
+        if self.game.state == GameState.GAME_OVER:
+            self._announce_winner()
+        else:
+            self.update_status()
+
+    def _announce_winner(self):
+        self.update_status()
+        messagebox.showinfo("Game Over", f"{self.game.winner.name} wins in turn {self.game.turn}!")
+        self._cancel_all_pending_animations()
+
     def on_roll(self):
         if self.game.state != GameState.WAITING_ROLL:
             return
+        if not self.speed:
+            self._play_instant()
+            return
 
         self.game.state = GameState.ROLLING_DICE
         self.roll_button.config(state=tk.DISABLED)
         cp = self.game.current_player()
-        
-        if self.game.current_index == 0:
-             self.game.turn += 1
+        index = self.game.current_index
+        self.game.begin_roll()
+        rolls = self.game.roll()
 
-        def after_roll(roll):
+        def after_roll(_):
             if not self.canvas.winfo_exists():
                 return
-                
-            self.dice_label.config(text=f"Dice: {roll}")
-            steps = roll
-            final_square = self.board.size * self.board.size
-            self.add_log(f"{cp.name} rolls {roll}.")
-
-            def step_move(step_left):
+            self.dice_label.config(text="Dice: " + " / ".join(map(str, rolls)))
+            options = self.game.rules.options(rolls)
+            if len(options) == 1 or cp.is_bot:
+                start_move(self.game.choose(rolls))
+            else:
+                self._ask_steps(options, start_move)
+
+        def start_move(steps):
+            # 结果由 Game 按规则一次算好（与 take_turn 相同），这里只按路径播放动画
+            start = cp.position
+            path = self.board.walk(start, steps, self.game.rules.overshoot)
+            pre = self.game.move_current(rolls, steps)
+            if self.game.forfeited:
+                path = [] # 这一步作废：直接退回这一轮的起点
+            self.add_log(self._describe_roll(cp, rolls, steps))
+
+            def step_move(i):
                 if not self.canvas.winfo_exists():
                     return
-                    
-                if step_left <= 0:
-                    dest = self.board.get_destination(cp.position)
-                    if dest != cp.position:
-                        cp.move_to(dest)
-                        self._move_token_canvas(self.game.current_index, dest)
-                        # 使用 _schedule_animation
-                        self._schedule_animation(ANIMATION_STEP_MS, lambda: self._check_win_and_next_player(final_square, cp))
-                        return
-                    else:
-                        self._check_win_and_next_player(final_square, cp)
-                        return
-                
-                cp.move_by(1)
-                self._move_token_canvas(self.game.current_index, cp.position)
-                # 使用 _schedule_animation
-                self._schedule_animation(ANIMATION_STEP_MS, lambda: step_move(step_left - 1))
-
-            step_move(steps)
-
-        self._animate_dice_throw(after_roll)
-
-    def _check_win_and_next_player(self, final_square, current_player):
+                if i < len(path):
+                    self._move_token_canvas(index, path[i])
+                    self._schedule_animation(ANIMATION_STEP_MS, lambda: step_move(i + 1))
+                elif cp.position != (path[-1] if path else start):
+                    # 蛇、梯子或作废退回：再跳一次到最终位置
+                    self._move_token_canvas(index, cp.position)
+                    self._schedule_animation(ANIMATION_STEP_MS, lambda: self._finish_move(index, steps, pre))
+                else:
+                    self._finish_move(index, steps, pre)
+
+            step_move(0)
+
+        self._animate_dice_throw(rolls[0], after_roll)
+
+    def _describe_roll(self, player: Player, rolls: Tuple[int, ...], steps: int) -> str:
+        """日志里的一行（在 move_current 之后调用）；经典规则下与原来一样是 “X rolls n.”"""
+        if not self.game.rules.has_choices:
+            line = f"{player.name} rolls {steps}."
+        else:
+            dice = " and ".join(map(str, rolls))
+            line = f"{player.name} rolls {dice}, " + ("stays." if steps == 0 else f"moves {steps}.")
+        if self.game.forfeited:
+            return line + f" Too many in a row: back to {player.position}."
+        if self.game.streak and player.position != self.board.final_square:
+            return line + " Rolls again!"
+        return line
+
+    def _ask_steps(self, options: Tuple[int, ...], on_choice):
+        """人类玩家有选择时，在控制面板上临时放一排按钮（不弹模态窗口，动画时钟照常走）"""
+        frame = self._choice_frame = tk.Frame(self.control_frame, bg='gray')
+        frame.pack(before=self.roll_button, pady=(0, 5))
+
+        def pick(steps):
+            frame.destroy()
+            on_choice(steps)
+
+        for steps in options:
+            text = "Stay" if steps == 0 else f"Move {steps}"
+            tk.Button(frame, text=text, width=7, command=lambda s=steps: pick(s)).pack(side=tk.LEFT, padx=2)
+
+    def _finish_move(self, index: int, steps: int, pre: int):
+        """动画播完以后：由 Game.end_move 判断胜负、再掷一次还是换人，然后写日志、自动存档"""
         if not self.canvas.winfo_exists():
             return
-            
-        if current_player.position == final_square:
-            self.game.state = GameState.GAME_OVER
-            self.game.winner = current_player
-            self.update_status()
-            messagebox.showinfo("Game Over", f"{current_player.name} wins in turn {self.game.turn}!")
-            self._cancel_all_pending_animations()
-            return
-        else:
-            self.game.next_player()
+        self.game.end_move()
+        if self.game.state != GameState.GAME_OVER:
             self.game.state = GameState.WAITING_ROLL
+        self.game.record_move(index, steps, pre, GameState.WAITING_ROLL)
+        self.autosaver.submit(self.game)
+        if self.game.state == GameState.GAME_OVER:
+            self._announce_winner()
+        else:
             self.update_status()
\ No newline at end of file
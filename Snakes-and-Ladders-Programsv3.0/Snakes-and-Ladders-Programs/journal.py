@@ -0,0 +1,213 @@
+"""Journal：逐步记录的对局日志（事件溯源），可以审计、回放和跳转到任意一步"""
+"""
+每走一步追加一条定长事件：玩家下标 | 点数 | 跳转前格子 | 跳转后格子 | 状态变化(前<<4 | 后)。
+“后”的最高位 AGAIN 表示这一步掷出了最大点数、同一名玩家再掷一次（见 GameRules.extra_roll）。
+每 K 步写一次完整检查点（snapshot 二进制快照），所以跳到第 n 步只需要
+从最近的检查点开始重放不超过 K 条事件（再加上一串没结束的再掷一次），而不是从第 0 步开始。
+检查点只写在两轮之间，从检查点恢复时正好是新的一轮，连续次数由之后的事件重新累计。
+
+这里的“步”指一名玩家掷一次骰子；Game.turn 记录的是所有人都走过一次的回合数。
+
+文件结构（小端，只追加）：
+    头部: magic b"SLJN" | version u8 | 检查点间隔 K u16 | 行数 u32 | 列数 u32 | 编号方式 u8
+          （版本 1 没有棋盘形状，按默认的 10×10 棋盘回放）
+    记录: b"E" + 事件 (u8 u8 u32 u32 u8)
+          b"C" + 快照长度 u32 + snapshot.encode_game() 的字节
+"""
+
+import bisect
+import struct
+from typing import Iterator, List, Optional, Tuple
+
+import snapshot
+from board import Board, BOARD_SIZE, NUMBERINGS
+from game_core import Game
+from game_state import GameState
+
+MAGIC = b"SLJN"
+VERSION = 2
+EXTENSION = ".sljn"
+CHECKPOINT_EVERY = 32
+
+_HEADER = struct.Struct("<4sBHIIB")
+_HEADER_V1 = struct.Struct("<4sBH")
+_EVENT = struct.Struct("<BBIIB")
+_LENGTH = struct.Struct("<I")
+_TAG_EVENT = b"E"
+_TAG_CHECKPOINT = b"C"
+_STATES = list(GameState)
+_STATE_MASK = 0x07
+_AGAIN = 0x08
+
+# (玩家下标, 点数, 跳转前格子, 跳转后格子, 状态变化)
+Event = Tuple[int, int, int, int, int]
+
+
+class JournalError(ValueError):
+    """日志文件损坏或版本不支持"""
+
+
+class Journal:
+    def __init__(self, path: Optional[str] = None, checkpoint_every: int = CHECKPOINT_EVERY):
+        if not 0 < checkpoint_every <= 0xFFFF:
+            raise ValueError("checkpoint_every must be in 1..65535")
+        self.path = path
+        self.checkpoint_every = checkpoint_every
+        """棋盘形状 (行数, 列数, 编号方式)；seek 没给棋盘时按它新建一块"""
+        self.shape: Tuple[int, int, str] = (BOARD_SIZE, BOARD_SIZE, "ltr")
+        self.events: List[Event] = []
+        """检查点: (它之前已有的事件数, 快照字节)，按事件数递增"""
+        self.checkpoints: List[Tuple[int, bytes]] = []
+        self._marks: List[int] = []
+        self._file = None
+
+    # --- 写入 ---
+
+    def begin(self, game):
+        """从 game 的当前状态开始一份新日志（文件会被清空），并写入第 0 个检查点"""
+        self.events = []
+        self.checkpoints = []
+        self._marks = []
+        board = game.board
+        self.shape = (board.rows, board.cols, board.numbering)
+        if self.path:
+            self.close()
+            self._file = open(self.path, "wb")
+            self._file.write(_HEADER.pack(MAGIC, VERSION, self.checkpoint_every,
+                                          board.rows, board.cols, NUMBERINGS.index(board.numbering)))
+        self.checkpoint(game)
+
+    def checkpoint(self, game):
+        data = snapshot.encode_game(game)
+        self.checkpoints.append((len(self.events), data))
+        self._marks.append(len(self.events))
+        if self._file:
+            self._file.write(_TAG_CHECKPOINT + _LENGTH.pack(len(data)) + data)
+            self._file.flush()
+
+    def record(self, game, index: int, roll: int, pre: int, post: int, before: GameState):
+        """
+        记录刚走完的一步。调用时 game 必须已经是这一步之后的状态
+        （位置、current_index、state 都已更新），这样检查点才和事件对得上。
+        """
+        again = _AGAIN if game.streak and game.state != GameState.GAME_OVER else 0
+        event = (index, roll, pre, post, before.value << 4 | game.state.value | again)
+        self.events.append(event)
+        if self._file:
+            self._file.write(_TAG_EVENT + _EVENT.pack(*event))
+        if len(self.events) - self._marks[-1] >= self.checkpoint_every and not again:
+            self.checkpoint(game) # 内部会 flush
+        elif self._file:
+            self._file.flush()
+
+    def close(self):
+        if self._file:
+            self._file.close()
+            self._file = None
+
+    # --- 读取 ---
+
+    @classmethod
+    def load(cls, path: str) -> "Journal":
+        """读入一个日志文件（末尾被截断的半条记录会被忽略）"""
+        with open(path, "rb") as f:
+            data = f.read()
+        if len(data) < _HEADER_V1.size:
+            raise JournalError("journal file too short")
+        magic, version, every = _HEADER_V1.unpack_from(data)
+        if magic != MAGIC or not 0 < version <= VERSION or not every:
+            raise JournalError("not a journal file or unsupported version")
+
+        journal = cls(checkpoint_every=every)
+        offset, end = _HEADER_V1.size, len(data)
+        if version >= 2:
+            if end < _HEADER.size:
+                raise JournalError("journal file too short")
+            _, _, _, rows, cols, numbering = _HEADER.unpack_from(data)
+            if numbering >= len(NUMBERINGS):
+                raise JournalError(f"unknown board numbering {numbering}")
+            journal.shape = (rows, cols, NUMBERINGS[numbering])
+            offset = _HEADER.size
+        while offset < end:
+            tag = data[offset:offset + 1]
+            offset += 1
+            if tag == _TAG_EVENT:
+                if offset + _EVENT.size > end:
+                    break
+                journal.events.append(_EVENT.unpack_from(data, offset))
+                offset += _EVENT.size
+            elif tag == _TAG_CHECKPOINT:
+                if offset + _LENGTH.size > end:
+                    break
+                (length,) = _LENGTH.unpack_from(data, offset)
+                offset += _LENGTH.size
+                if offset + length > end:
+                    break
+                journal.checkpoints.append((len(journal.events), data[offset:offset + length]))
+                journal._marks.append(len(journal.events))
+                offset += length
+            else:
+                raise JournalError(f"unknown record tag {tag!r} at byte {offset - 1}")
+        if not journal.checkpoints or journal.checkpoints[0][0] != 0:
+            raise JournalError("journal does not start with a checkpoint")
+        return journal
+
+    def __len__(self):
+        return len(self.events)
+
+    @staticmethod
+    def _apply(game, event: Event):
+        """把一条事件作用到 game 上（与 Game.take_turn 的结果相同，只是点数取自日志）"""
+        index, _, _, post, states = event
+        player = game.players[index]
+        if not game.streak:
+            # 新的一轮：与 Game.begin_roll 相同，记下起点（连续掷出太多次最大点数时退回这里）
+            game.turn_start = player.position
+            if index == 0:
+                game.turn += 1
+        player.move_to(post)
+        game.state = _STATES[states & _STATE_MASK]
+        if game.state == GameState.GAME_OVER:
+            game.winner = player
+            game.streak = 0
+        elif states & _AGAIN:
+            game.streak += 1 # 同一名玩家再掷一次
+            game.current_index = index
+        else:
+            game.streak = 0
+            game.current_index = (index + 1) % len(game.players)
+
+    def seek(self, step: int, board: Optional[Board] = None) -> Game:
+        """
+        返回第 step 步之后的 Game（0 表示日志开始时的状态）。
+        从不晚于 step 的最近检查点出发，最多重放 checkpoint_every 条事件（加上一串再掷一次）。
+        """
+        if not 0 <= step <= len(self.events):
+            raise IndexError(f"step {step} out of range 0..{len(self.events)}")
+        start, data = self.checkpoints[bisect.bisect_right(self._marks, step) - 1]
+        if board is None:
+            rows, cols, numbering = self.shape
+            board = Board(rows=rows, cols=cols, numbering=numbering)
+        game = Game(board, [])
+        try:
+            restored = snapshot.restore_game(game, data)
+        except ValueError as e:
+            raise JournalError(f"checkpoint at step {start} does not fit the board: {e}")
+        if restored is None:
+            raise JournalError(f"corrupted checkpoint at step {start}")
+        for event in self.events[start:step]:
+            self._apply(game, event)
+        return game
+
+    def replay(self, board: Optional[Board] = None) -> Iterator[Tuple[Event, Game]]:
+        """无界面全速回放：依次产出 (事件, 这一步之后的 Game)，Game 对象是同一个"""
+        game = self.seek(0, board)
+        for event in self.events:
+            self._apply(game, event)
+            yield event, game
+
+    def to_save(self, path: str, step: Optional[int] = None, binary: Optional[bool] = None) -> Game:
+        """把第 step 步（默认最后一步）的局面写成普通存档，可被 Game.load_game 读取"""
+        game = self.seek(len(self.events) if step is None else step)
+        game.save_game(path, binary)
+        return game
@@ -1,5 +1,7 @@
 class Ladder:
     """类似于C++中的构造函数"""
+    __slots__ = ("bottom", "top")
+
     def __init__(self,bottom:int,top:int):
         self.bottom=bottom
         self.top=top
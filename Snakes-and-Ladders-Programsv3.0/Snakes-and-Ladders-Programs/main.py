@@ -1,17 +1,33 @@
 import tkinter as tk
 from tkinter import simpledialog, messagebox
 import os
-from typing import List, Optional
+import threading
+from typing import List, Optional, TYPE_CHECKING
 
 # --- 导入核心组件 ---
-try:
-    from game_ui import GameUI, SetupDialog  # 假设 SetupDialog 也移到了 game_ui.py
-    from player import Player
-    from PIL import Image 
-except ImportError as e:
-    print(f"Error importing dependencies: {e}")
-    print("Please ensure GameUI, SetupDialog, Player, and PIL are correctly set up and imported.")
-    
+# game_ui 会带进 PIL 和 NumPy，导入要一百多毫秒：主菜单只需要 tkinter，
+# 所以 game_ui 推迟到真正开局时才导入，并在菜单显示后于后台线程里预先导入。
+from player import Player
+
+if TYPE_CHECKING:
+    from game_ui import GameUI
+
+def _game_ui():
+    """按需导入 game_ui（第二次起直接从 sys.modules 取）"""
+    try:
+        import game_ui
+    except ImportError as e:
+        print(f"Error importing dependencies: {e}")
+        print("Please ensure GameUI, SetupDialog, Player, and PIL are correctly set up and imported.")
+        raise
+    return game_ui
+
+def _warm_imports():
+    try:
+        import game_ui # noqa: F401  只为提前完成导入
+    except ImportError:
+        pass # 真正用到时 _game_ui() 会报告错误
+
 # --- 常量定义（与应用启动相关的部分） ---
 ANIMAL_IMAGE_FILES = ["monkey.png", "elephant.png", "giraffe.png", "panda.png"]
 MAIN_MENU_WIDTH = 800
@@ -42,8 +58,10 @@ class GameApp(tk.Tk):
         super().__init__()
         self.title("Snakes and Ladders")
         # 初始化时显示主菜单
-        self.game_ui: Optional[GameUI] = None 
+        self.game_ui: Optional["GameUI"] = None 
         self.show_main_menu()
+        # 菜单画出来之后再在后台导入 game_ui，用户点按钮时通常已经导入完毕
+        self.after_idle(lambda: threading.Thread(target=_warm_imports, daemon=True).start())
 
     def clear_window(self):
         """销毁窗口中的所有子控件，并取消旧的 after 任务。"""
@@ -51,6 +69,8 @@ class GameApp(tk.Tk):
         if self.game_ui:
              if hasattr(self.game_ui, '_cancel_all_pending_animations'):
                  self.game_ui._cancel_all_pending_animations()
+             if hasattr(self.game_ui, 'autosaver'):
+                 self.game_ui.autosaver.close() # 后台线程会写完最后一次自动存档
                  
         for widget in self.winfo_children():
             widget.destroy()
@@ -68,7 +88,7 @@ class GameApp(tk.Tk):
         self.game_ui = None 
         MainMenu(self, self)
 
-    def start_setup(self, load_only: bool = False, current_game_ui: Optional[GameUI] = None):
+    def start_setup(self, load_only: bool = False, current_game_ui: Optional["GameUI"] = None):
         """
         启动配置/加载对话框，并处理结果。
         
@@ -83,28 +103,30 @@ class GameApp(tk.Tk):
                 pass
         
         # 2. 启动设置对话框（对话框在主线程阻塞直到完成）
-        dialog = SetupDialog(self, load_only=load_only)
+        dialog = _game_ui().SetupDialog(self, load_only=load_only)
         
         players_config: Optional[List[Player]] = dialog.result
         
         # 3. 处理结果
         if players_config:
             # 成功配置新游戏或加载成功，启动新游戏 UI
-            self.show_game(players_config)
+            self.show_game(players_config, dialog.rules, dialog.loaded)
             
         else: 
             # 用户在对话框中取消，返回主菜单
             self.show_main_menu()
             
-    def show_game(self, players: List[Player]):
+    def show_game(self, players: List[Player], rules=None, loaded=None):
         """
         根据玩家配置列表创建并显示 GameUI。
+        rules 是 SetupDialog 里选的 GameRules，读档时是存档里的规则；
+        loaded 是读档时读进来的 Game（轮到谁、连续掷出最大点数的进度从它恢复），新游戏为 None。
         """
         # 确保窗口是空的
         self.clear_window() 
         # GameUI 内部会处理窗口大小调整
         self.resizable(True, False) 
-        self.game_ui = GameUI(self, players)
+        self.game_ui = _game_ui().GameUI(self, players, rules=rules, loaded=loaded)
 
     def restart_game_with_dialog(self):
         """
@@ -0,0 +1,218 @@
+"""精确分析器：把棋盘看成吸收马尔可夫链，不用真的下棋就能算出游戏会持续多久"""
+"""
+状态是玩家一轮结束后停留的格子 0..终点-1，终点是吸收态；矩阵全部使用稀疏存储。
+经典规则下一轮就是掷一次骰子；越界规则编译进落点表（与 Board.roll_table 相同），
+“掷出最大点数再掷一次 / 连续太多次作废”则把一轮里的若干次掷骰合成一个转移矩阵。
+"""
+
+import numpy as np
+import scipy.sparse as sp
+from scipy.sparse import csgraph
+from scipy.sparse.linalg import splu
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+from board import Board
+from dice import Dice
+from rules import GameRules
+
+# 按棋盘配置缓存分析结果，最多保留这么多份
+CACHE_SIZE = 64
+_cache: "OrderedDict[tuple, BoardAnalysis]" = OrderedDict()
+
+
+class BoardAnalysis:
+    def __init__(self, dest: np.ndarray, roll_probs: np.ndarray, rules: GameRules = None):
+        rules = rules if rules else GameRules()
+        if rules.has_choices:
+            raise ValueError("exact analysis does not support rules with choices (choose_die / allow_skip)")
+        self.final_square = len(dest) - 1
+        """roll_probs[k] = 一次移动 k 格的概率（来自 Dice.distribution）"""
+        self.roll_probs = roll_probs
+        landing = self._landing(dest, np.flatnonzero(roll_probs), rules.overshoot)
+        if rules.extra_roll:
+            self.transition = self._build_turn_transition(landing, roll_probs, rules.penalty_streak)
+        else:
+            self.transition = self._build_transition(landing, roll_probs)
+        self._check_absorbing()
+
+        """Q: 非终点格子之间的转移；r: 一步到达终点的概率"""
+        final = self.final_square
+        self._q = self.transition[:final, :final].tocsc()
+        self._r = np.asarray(self.transition[:final, final].todense()).ravel()
+        self._lu = None
+        self._expected: Optional[np.ndarray] = None
+        self._visits: Optional[np.ndarray] = None
+        self._pmf: Optional[np.ndarray] = None
+
+    @staticmethod
+    def _landing(dest: np.ndarray, rolls: np.ndarray, overshoot: str) -> np.ndarray:
+        """landing[格子, i] = 从格子掷出 rolls[i] 后的落点，与 Board.roll_table 的规则相同（向量化）"""
+        final = len(dest) - 1
+        squares = np.arange(final)[:, None]
+        target = squares + rolls[None, :]
+        if overshoot == "clamp":
+            return dest[np.minimum(target, final)]
+        if overshoot == "bounce":
+            return dest[np.where(target > final, np.maximum(0, 2 * final - target), target)]
+        # stay：多了就不走，也不再触发脚下的蛇梯
+        return np.where(target > final, squares, dest[np.minimum(target, final)])
+
+    @staticmethod
+    def _roll_matrix(landing: np.ndarray, probs: np.ndarray) -> sp.csr_matrix:
+        """一次掷骰的转移（只含非终点行），按 (格子, 点数) 写出 COO 三元组，重复的 (行, 列) 由 tocsr 自动求和"""
+        final, n = landing.shape
+        rows = np.repeat(np.arange(final), n)
+        return sp.coo_matrix((np.tile(probs, final), (rows, landing.ravel())),
+                             shape=(final + 1, final + 1)).tocsr()
+
+    @staticmethod
+    def _absorb(matrix: sp.spmatrix) -> sp.csr_matrix:
+        """最后补一个终点自环，让终点成为吸收态"""
+        final = matrix.shape[0] - 1
+        return (matrix + sp.coo_matrix(([1.0], ([final], [final])), shape=matrix.shape)).tocsr()
+
+    @classmethod
+    def _build_transition(cls, landing: np.ndarray, roll_probs: np.ndarray) -> sp.csr_matrix:
+        return cls._absorb(cls._roll_matrix(landing, roll_probs[np.flatnonzero(roll_probs)]))
+
+    @classmethod
+    def _build_turn_transition(cls, landing: np.ndarray, roll_probs: np.ndarray, limit: int,
+                               tol: float = 1e-15) -> sp.csr_matrix:
+        """
+        一轮的转移：S 是掷出最大点数的那一列（到终点的部分 S_win 直接结束，其余 S_c 接着再掷），
+        N 是其他点数。没有作废规则时 M = Σ S_c^k (N + S_win)，截断到剩余概率小于 tol；
+        连续第 limit 次作废时 M = Σ_{k<limit-1} S_c^k (N + S_win) + S_c^(limit-1) N + diag(p_top · 剩余概率)。
+        S_c 每行最多一个非零元，所以 S_c^k 一直很稀疏。
+        """
+        final = landing.shape[0]
+        rolls = np.flatnonzero(roll_probs)
+        # 与 GameRules.bonus 相同，只有骰子的最大点数 (roll_probs 的最后一个下标) 才再掷一次；
+        # 灌铅骰子的最大点数概率为 0 时永远不会再掷，一轮就是一次掷骰
+        if rolls[-1] != len(roll_probs) - 1:
+            return cls._build_transition(landing, roll_probs)
+        probs = roll_probs[rolls]
+        top = rolls.size - 1 # 最大点数在最后一列
+        other = cls._roll_matrix(landing[:, :top], probs[:top])
+        sixes = cls._roll_matrix(landing[:, top:], probs[top:]).tolil()
+        win = sp.lil_matrix(sixes.shape)
+        win[:, final] = sixes[:, final]
+        sixes[:, final] = 0
+        chain, win = sixes.tocsr(), win.tocsr()
+        ends = other + win
+
+        power = sp.diags(np.append(np.ones(final), 0.0), format="csr") # S_c^k，终点行留给 _absorb
+        total = sp.csr_matrix((final + 1, final + 1))
+        k = 0
+        while True:
+            if limit and k == limit - 1:
+                stuck = np.asarray(power.sum(axis=1)).ravel() * probs[top]
+                total = total + power @ other + sp.diags(stuck)
+                break
+            total = total + power @ ends
+            power = power @ chain
+            k += 1
+            if power.nnz == 0 or power.sum(axis=1).max() < tol:
+                break
+        return cls._absorb(total)
+
+    def _check_absorbing(self):
+        """从起点能走到、却永远到不了终点的格子会让 I-Q 奇异，提前报错"""
+        final = self.final_square
+        reachable = csgraph.breadth_first_order(self.transition, 0, return_predecessors=False)
+        can_finish = csgraph.breadth_first_order(self.transition.T.tocsr(), final, return_predecessors=False)
+        trapped = np.setdiff1d(reachable, can_finish)
+        if trapped.size:
+            raise ValueError(f"the game can never end from square {int(trapped[0])}")
+
+    def _factor(self):
+        """对 I-Q 做一次稀疏 LU 分解（COLAMD 列排序控制填充），期望值和访问次数共用"""
+        if self._lu is None:
+            final = self.final_square
+            system = (sp.identity(final, format="csc") - self._q).tocsc()
+            self._lu = splu(system, permc_spec="COLAMD")
+        return self._lu
+
+    @property
+    def expected_turns_from(self) -> np.ndarray:
+        """每个格子到终点的期望轮数（经典规则下就是掷骰次数），解 (I-Q) t = 1"""
+        if self._expected is None:
+            self._expected = np.append(self._factor().solve(np.ones(self.final_square)), 0.0)
+        return self._expected
+
+    @property
+    def expected_turns(self) -> float:
+        """从起点（0 号格）出发的期望轮数"""
+        return float(self.expected_turns_from[0])
+
+    @property
+    def visits(self) -> np.ndarray:
+        """从起点出发，每个格子上期望停留的次数，解 (I-Q)^T v = e0"""
+        if self._visits is None:
+            start = np.zeros(self.final_square)
+            start[0] = 1.0
+            self._visits = np.append(self._factor().solve(start, trans="T"), 0.0)
+        return self._visits
+
+    def turn_distribution(self, max_turns: int = 100000, tol: float = 1e-12) -> np.ndarray:
+        """
+        单个玩家到达终点所需轮数（经典规则下即掷骰次数）的精确分布：pmf[k] = P(T = k)。
+        逐步推进状态向量，直到剩余概率小于 tol（或达到 max_turns）。
+        """
+        if self._pmf is not None and (self._pmf.size > max_turns or 1.0 - self._pmf.sum() < tol):
+            return self._pmf[:max_turns + 1]
+        step = self._q.T.tocsr()
+        state = np.zeros(self.final_square)
+        state[0] = 1.0
+        pmf = [0.0]
+        remaining = 1.0
+        while len(pmf) <= max_turns and remaining >= tol:
+            pmf.append(float(state @ self._r))
+            state = step @ state
+            remaining = float(state.sum())
+        self._pmf = np.array(pmf)
+        return self._pmf
+
+    def game_length_distribution(self, num_players: int, max_turns: int = 100000, tol: float = 1e-12) -> np.ndarray:
+        """
+        num_players 名玩家时游戏回合数（即 Game.turn）的分布。
+        各玩家互不影响，所以 P(回合数 > k) = P(T > k) ** num_players。
+        """
+        survival = 1.0 - np.cumsum(self.turn_distribution(max_turns, tol))
+        survival = np.clip(survival, 0.0, 1.0) ** num_players
+        return -np.diff(np.concatenate(([1.0], survival)))
+
+    def __repr__(self):
+        return f"BoardAnalysis(final={self.final_square}, max_roll={self.roll_probs.size - 1}, expected_turns={self.expected_turns:.3f})"
+
+
+def _cache_key(dest: np.ndarray, roll_probs: np.ndarray, rules: GameRules) -> Tuple:
+    jumps = np.flatnonzero(dest != np.arange(len(dest)))
+    return len(dest) - 1, roll_probs.tobytes(), jumps.tobytes(), dest[jumps].tobytes(), rules.key()
+
+
+def analyze_dest(dest, dice: Dice = None, rules: GameRules = None) -> BoardAnalysis:
+    """
+    直接从 dest 跳转表分析（用于超大棋盘，不需要构造 Board 对象）。
+    蛇回起点规则要事先体现在 dest 里（Board.dest_table(True)），其余规则在这里生效。
+    """
+    dice = dice if dice else Dice()
+    rules = rules if rules else GameRules()
+    dest = np.asarray(dest, dtype=np.int64)
+    roll_probs = np.array(dice.distribution())
+    key = _cache_key(dest, roll_probs, rules)
+    analysis = _cache.get(key)
+    if analysis is None:
+        analysis = BoardAnalysis(dest, roll_probs, rules)
+        _cache[key] = analysis
+        if len(_cache) > CACHE_SIZE:
+            _cache.popitem(last=False)
+    else:
+        _cache.move_to_end(key)
+    return analysis
+
+
+def analyze(board: Board, dice: Dice = None, rules: GameRules = None) -> BoardAnalysis:
+    """分析一个棋盘；同样的蛇梯配置、骰子分布和规则会直接命中缓存"""
+    rules = rules if rules else GameRules()
+    return analyze_dest(board.dest_table(rules.snakes_to_start), dice, rules)
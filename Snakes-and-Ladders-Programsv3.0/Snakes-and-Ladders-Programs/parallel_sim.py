@@ -0,0 +1,106 @@
+"""多进程蒙特卡洛模拟：把 N 局分片交给进程池，结果直接写进共享内存"""
+"""分片大小固定、每片有自己的随机数流，所以同一个 seed 不论用几个进程结果都完全一样"""
+
+import os
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import Optional
+
+from board import Board
+from dice import Dice
+from batch_sim import BatchSimulator
+from rules import GameRules
+
+SHARD_SIZE = 100000
+
+
+class SimulationSummary:
+    """多进程模拟的汇总结果"""
+    def __init__(self, histogram: np.ndarray, winner_counts: np.ndarray, unfinished: int):
+        # histogram[k] = 恰好在第 k 回合结束的对局数
+        self.histogram = histogram
+        # winner_counts[p] = 第 p 名玩家获胜的对局数
+        self.winner_counts = winner_counts
+        # 达到 max_turns 仍未结束的对局数
+        self.unfinished = unfinished
+
+    @property
+    def games(self) -> int:
+        return int(self.histogram.sum()) + self.unfinished
+
+    @property
+    def mean_turns(self) -> float:
+        finished = self.histogram.sum()
+        return float((np.arange(self.histogram.size) * self.histogram).sum() / finished) if finished else 0.0
+
+    def __repr__(self):
+        return f"SimulationSummary(games={self.games}, mean_turns={self.mean_turns:.3f}, winners={self.winner_counts.tolist()})"
+
+
+def _run_shard(shm_name: str, row: int, width: int, board: Board, dice: Dice,
+               num_players: int, num_games: int, seed: np.random.SeedSequence, max_turns: int,
+               rules: Optional[GameRules] = None):
+    """
+    子进程里运行一个分片。只把计数写进共享内存中属于自己的那一行，
+    不需要加锁，也不需要把逐局结果 pickle 回主进程。
+    """
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        counts = np.ndarray((width,), dtype=np.int64, buffer=shm.buf, offset=row * width * 8)
+        result = BatchSimulator(board, num_players, dice, seed=seed, max_turns=max_turns, rules=rules).run(num_games)
+        finished = result.winners >= 0
+        counts[:max_turns + 1] = np.bincount(result.turns[finished], minlength=max_turns + 1)
+        counts[max_turns + 1:max_turns + 1 + num_players] = np.bincount(result.winners[finished], minlength=num_players)
+        counts[-1] = num_games - int(np.count_nonzero(finished))
+        del counts  # 先释放对共享缓冲区的引用，否则 close() 会失败
+    finally:
+        shm.close()
+
+
+def run_parallel(board: Board,
+                 num_games: int,
+                 num_players: int = 2,
+                 dice: Dice = None,
+                 seed: Optional[int] = None,
+                 workers: Optional[int] = None,
+                 max_turns: int = 1000,
+                 shard_size: int = SHARD_SIZE,
+                 rules: Optional[GameRules] = None) -> SimulationSummary:
+    """把 num_games 局按 shard_size 分片，用 workers 个进程并行模拟"""
+    dice = dice if dice else Dice()
+    workers = workers or os.cpu_count() or 1
+    n_shards = max(1, -(-num_games // shard_size))
+    # 每个分片从同一个根 SeedSequence 派生出独立的随机数流
+    seeds = np.random.SeedSequence(seed).spawn(n_shards)
+    # 每行布局：[回合直方图 0..max_turns | 各玩家胜场 | 未结束局数]
+    width = max_turns + 1 + num_players + 1
+
+    shm = shared_memory.SharedMemory(create=True, size=n_shards * width * 8)
+    try:
+        table = np.ndarray((n_shards, width), dtype=np.int64, buffer=shm.buf)
+        table[:] = 0
+        jobs = []
+        for i in range(n_shards):
+            games = min(shard_size, num_games - i * shard_size)
+            jobs.append((shm.name, i, width, board, dice, num_players, games, seeds[i], max_turns, rules))
+
+        if workers == 1:
+            for job in jobs:
+                _run_shard(*job)
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                for future in [pool.submit(_run_shard, *job) for job in jobs]:
+                    future.result()  # 子进程里的异常在这里重新抛出
+
+        totals = table.sum(axis=0)
+        del table
+    finally:
+        shm.close()
+        shm.unlink()
+
+    return SimulationSummary(
+        histogram=totals[:max_turns + 1],
+        winner_counts=totals[max_turns + 1:max_turns + 1 + num_players],
+        unfinished=int(totals[-1])
+    )
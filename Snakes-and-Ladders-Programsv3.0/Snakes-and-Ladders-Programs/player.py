@@ -1,20 +1,26 @@
 """This is a player class"""
 class Player:
+    # 固定属性，省掉每个对象的 __dict__
+    __slots__ = ("name", "color", "number", "position", "is_bot", "strategy")
+
     # 核心修复：添加 is_bot 参数，并设置默认值为 False
-    def __init__(self,name:str,color:str,number:int,is_bot:bool=False): 
+    def __init__(self,name:str,color:str,number:int,is_bot:bool=False,strategy=None): 
         self.name = name
         self.color = color
         self.number=number
         """0意味着不在棋盘中"""
         self.position:int = 0
         self.is_bot = is_bot # 核心修复：将 is_bot 赋值为对象属性
+        """规则允许选择时由谁来选（strategies.Strategy）；None 表示走默认的贪心选择"""
+        self.strategy = strategy
 
-    def move_by(self, steps:int):
+    def move_by(self, steps:int, final_square:int=100):
         # 移动棋子
         #调用player.move_by(6)就是指在原来的基础上移动了6个格子"""
+        # 超过终点时停在终点（经典规则）；终点由棋盘决定，其他越界规则见 GameRules.overshoot
         self.position+=steps
-        if self.position>100:
-            self.position=100
+        if self.position>final_square:
+            self.position=final_square
 
 
     def move_to(self,square:int):
@@ -1,5 +1,7 @@
 class Point:
     """类似C++里面的构造函数"""
+    __slots__ = ("x", "y")
+
     def __init__(self,x:int,y:int):
         self.x=x
         self.y=y
@@ -0,0 +1,111 @@
+"""GameRules：可选规则和常见的家庭规则，全部是声明式的开关"""
+"""
+会让玩家真正做选择的规则：
+- choose_die：每回合掷两颗骰子，只按其中一颗走（两颗点数相同时就没得选）
+- allow_skip：可以放弃这一步，留在原地（例如前面是蛇头时）
+只改变落点的规则（编译进 Board.roll_table 同一种查找表，模拟和分析直接使用）：
+- overshoot："clamp" 超过终点停在终点（经典）；"bounce" 必须正好走到终点，多出的步数往回退；
+  "stay" 多了就不走
+- snakes_to_start：被任何蛇咬到都回到起点
+改变轮次的规则（由 Game 的 begin_roll / move_current / end_move 执行）：
+- extra_roll：掷出最大点数（一颗骰子就是 6）可以再掷一次
+- penalty_streak：连续第 N 次掷出最大点数时这一步作废，退回这一轮开始时的格子并交给下家（0 表示不限）
+全部关闭就是经典规则：掷一次、按点数走，没有任何选择。
+选项用“走几步”表示，0 就是原地不动；Board.roll_table 的第 0 列正好是原地。
+"""
+
+from typing import Dict, List, Sequence, Tuple
+
+from board import Board, OVERSHOOTS
+from dice import Dice
+
+
+class GameRules:
+    __slots__ = ("choose_die", "allow_skip", "overshoot", "snakes_to_start", "extra_roll", "penalty_streak")
+
+    def __init__(self, choose_die: bool = False, allow_skip: bool = False, overshoot: str = "clamp",
+                 snakes_to_start: bool = False, extra_roll: bool = False, penalty_streak: int = 0):
+        if overshoot not in OVERSHOOTS:
+            raise ValueError(f"overshoot must be one of {OVERSHOOTS}, got {overshoot!r}")
+        if penalty_streak < 0 or (penalty_streak and not extra_roll):
+            raise ValueError("penalty_streak needs extra_roll and must not be negative")
+        self.choose_die = choose_die
+        self.allow_skip = allow_skip
+        self.overshoot = overshoot
+        self.snakes_to_start = snakes_to_start
+        self.extra_roll = extra_roll
+        self.penalty_streak = penalty_streak
+
+    @property
+    def dice_per_turn(self) -> int:
+        return 2 if self.choose_die else 1
+
+    @property
+    def has_choices(self) -> bool:
+        return self.choose_die or self.allow_skip
+
+    def key(self) -> tuple:
+        """可哈希的规则标识（用于缓存）；GameRules(*key) 可以还原"""
+        return (self.choose_die, self.allow_skip, self.overshoot, self.snakes_to_start,
+                self.extra_roll, self.penalty_streak)
+
+    # --- 落点：编译成查找表 ---
+    def table(self, board: Board, max_roll: int) -> List[List[int]]:
+        """按本规则编译的 after_roll[格子][步数] 表（棋盘按规则缓存，经典规则就是原来那张）"""
+        return board.roll_table(max_roll, self.overshoot, self.snakes_to_start)
+
+    def land(self, board: Board, square: int, steps: int) -> int:
+        """单步落点，与 table()[square][steps] 相同但不需要整张表"""
+        return board.land(square, steps, self.overshoot, self.snakes_to_start)
+
+    def move(self, board: Board, square: int, steps: int) -> Tuple[int, int]:
+        """(结算蛇梯之前的格子, 最终格子)；前者只用于写日志"""
+        return board.move(square, steps, self.overshoot, self.snakes_to_start)
+
+    # --- 轮次 ---
+    def bonus(self, rolls: Sequence[int], max_roll: int) -> bool:
+        """这一把是否掷出了最大点数（再掷一次 / 计入连续次数）"""
+        return self.extra_roll and max_roll in rolls
+
+    def roll(self, dice: Dice) -> Tuple[int, ...]:
+        """按规则掷这一回合的骰子"""
+        return tuple(dice.roll() for _ in range(self.dice_per_turn))
+
+    def options(self, rolls: Sequence[int]) -> Tuple[int, ...]:
+        """这一把点数下可走的步数，从大到小、不重复；可以跳过时最后是 0"""
+        steps = tuple(sorted(set(rolls), reverse=True))
+        return steps + (0,) if self.allow_skip else steps
+
+    def outcomes(self, dice: Dice) -> List[Tuple[float, Tuple[int, ...]]]:
+        """
+        一回合所有可能的 (概率, 可选步数)；选项相同的结果合并成一项。
+        搜索（expectimax）的机会节点就在这张表上展开。
+        """
+        probs = dice.distribution()
+        merged: Dict[Tuple[int, ...], float] = {}
+        faces = [(roll, p) for roll, p in enumerate(probs) if p > 0]
+        if self.choose_die:
+            pairs = [((a, b), pa * pb) for a, pa in faces for b, pb in faces]
+        else:
+            pairs = [((a,), pa) for a, pa in faces]
+        for rolls, p in pairs:
+            options = self.options(rolls)
+            merged[options] = merged.get(options, 0.0) + p
+        return [(p, options) for options, p in merged.items()]
+
+    def __eq__(self, other):
+        return isinstance(other, GameRules) and self.key() == other.key()
+
+    def __hash__(self):
+        return hash(self.key())
+
+    def __repr__(self):
+        extra = "".join(f", {name}={getattr(self, name)!r}" for name, default in _HOUSE_DEFAULTS
+                        if getattr(self, name) != default)
+        return f"GameRules(choose_die={self.choose_die}, allow_skip={self.allow_skip}{extra})"
+
+
+_HOUSE_DEFAULTS = (("overshoot", "clamp"), ("snakes_to_start", False), ("extra_roll", False), ("penalty_streak", 0))
+
+
+CLASSIC = GameRules()
@@ -0,0 +1,229 @@
+"""SaveStore：基于 SQLite 的多槽位存档库（取代单一的 savegame.json）"""
+"""
+每个存档一行，游戏状态用 snapshot 的二进制快照保存；列表需要的字段（名字、玩家、
+回合、是否结束、修改时间）单独成列并建索引，所以列存档时不需要解码任何快照。
+- WAL 模式：读和写互不阻塞
+- 批量写：save_many() 或 with store.batch(): 把多次保存合并成一个事务
+- 分页：按 (modified, id) 做键集分页，翻到多深都只走索引，10^6 条存档也是毫秒级
+- 计数：已结束 / 未结束的数量由触发器维护在 save_counts 表里
+"""
+
+import os
+import sqlite3
+import time
+from contextlib import contextmanager
+from typing import Iterable, List, Optional, Tuple
+
+import snapshot
+from player import Player
+
+DB_NAME = "saves.db"
+PAGE_SIZE = 20
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS saves (
+    id       INTEGER PRIMARY KEY,
+    name     TEXT    NOT NULL,
+    players  TEXT    NOT NULL,
+    turn     INTEGER NOT NULL,
+    finished INTEGER NOT NULL,
+    modified REAL    NOT NULL,
+    data     BLOB    NOT NULL
+);
+CREATE INDEX IF NOT EXISTS saves_by_modified ON saves (modified, id);
+CREATE INDEX IF NOT EXISTS saves_by_finished ON saves (finished, modified, id);
+CREATE TABLE IF NOT EXISTS save_players (
+    player   TEXT    NOT NULL,
+    modified REAL    NOT NULL,
+    save_id  INTEGER NOT NULL REFERENCES saves (id) ON DELETE CASCADE,
+    PRIMARY KEY (player, modified, save_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS save_players_by_save ON save_players (save_id);
+CREATE TABLE IF NOT EXISTS save_counts (
+    finished INTEGER PRIMARY KEY,
+    n        INTEGER NOT NULL
+);
+INSERT OR IGNORE INTO save_counts VALUES (0, 0), (1, 0);
+CREATE TRIGGER IF NOT EXISTS save_counts_insert AFTER INSERT ON saves BEGIN
+    UPDATE save_counts SET n = n + 1 WHERE finished = NEW.finished;
+END;
+CREATE TRIGGER IF NOT EXISTS save_counts_delete AFTER DELETE ON saves BEGIN
+    UPDATE save_counts SET n = n - 1 WHERE finished = OLD.finished;
+END;
+CREATE TRIGGER IF NOT EXISTS save_counts_update AFTER UPDATE OF finished ON saves
+WHEN NEW.finished != OLD.finished BEGIN
+    UPDATE save_counts SET n = n - 1 WHERE finished = OLD.finished;
+    UPDATE save_counts SET n = n + 1 WHERE finished = NEW.finished;
+END;
+"""
+
+_COLUMNS = "id, name, players, turn, finished, modified"
+
+
+class SaveSlot:
+    """列表里的一行（不含快照数据）"""
+    __slots__ = ("id", "name", "players", "turn", "finished", "modified")
+
+    def __init__(self, id: int, name: str, players: str, turn: int, finished: int, modified: float):
+        self.id = id
+        self.name = name
+        self.players = players
+        self.turn = turn
+        self.finished = bool(finished)
+        self.modified = modified
+
+    def label(self) -> str:
+        """Load 对话框里显示的一行文字"""
+        stamp = time.strftime("%Y-%m-%d %H:%M", time.localtime(self.modified))
+        status = "finished" if self.finished else f"turn {self.turn}"
+        return f"{stamp}  {self.name}  [{self.players}]  {status}"
+
+    def __repr__(self):
+        return f"SaveSlot({self.id}, {self.name!r}, turn={self.turn}, finished={self.finished})"
+
+
+class SaveStore:
+    def __init__(self, path: str):
+        self.path = path
+        self.conn = sqlite3.connect(path, isolation_level=None) # 事务由 batch() 手动控制
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL") # WAL 下只在检查点时 fsync
+        self.conn.execute("PRAGMA foreign_keys=ON")
+        self.conn.executescript(_SCHEMA)
+        self._depth = 0
+
+    def close(self):
+        self.conn.close()
+
+    # --- 事务 ---
+
+    @contextmanager
+    def batch(self):
+        """把块内的所有写操作合并成一个事务（可以嵌套，只有最外层提交）"""
+        if self._depth == 0:
+            self.conn.execute("BEGIN IMMEDIATE")
+        self._depth += 1
+        try:
+            yield self
+        except BaseException:
+            self._depth -= 1
+            if self._depth == 0:
+                self.conn.execute("ROLLBACK")
+            raise
+        self._depth -= 1
+        if self._depth == 0:
+            self.conn.execute("COMMIT")
+
+    # --- 写入 ---
+
+    @staticmethod
+    def record(game) -> tuple:
+        """
+        保存一局要写进库里的全部内容 (快照, 玩家名, 回合, 是否结束)。
+        在操作 game 的线程里调用（只是编码，很快），结果可以交给别的线程用 save_record 写库。
+        """
+        return snapshot.encode_game(game), [p.name for p in game.players], game.turn, int(game.winner is not None)
+
+    def _write(self, record: tuple, slot_id: Optional[int], name: Optional[str], modified: float) -> int:
+        data, names, turn, finished = record
+        if name is None:
+            name = " vs ".join(names) if names else "empty"
+        cur = self.conn.cursor()
+        if slot_id is None:
+            cur.execute("INSERT INTO saves (name, players, turn, finished, modified, data) VALUES (?, ?, ?, ?, ?, ?)",
+                        (name, ", ".join(names), turn, finished, modified, data))
+            slot_id = cur.lastrowid
+        else:
+            cur.execute("UPDATE saves SET name = ?, players = ?, turn = ?, finished = ?, modified = ?, data = ? "
+                        "WHERE id = ?", (name, ", ".join(names), turn, finished, modified, data, slot_id))
+            if not cur.rowcount:
+                raise KeyError(f"save slot {slot_id} does not exist")
+            cur.execute("DELETE FROM save_players WHERE save_id = ?", (slot_id,))
+        cur.executemany("INSERT OR IGNORE INTO save_players (player, modified, save_id) VALUES (?, ?, ?)",
+                        [(n, modified, slot_id) for n in names])
+        return slot_id
+
+    def save(self, game, slot_id: Optional[int] = None, name: Optional[str] = None) -> int:
+        """保存一局；slot_id 为 None 时新建槽位，否则覆盖该槽位。返回槽位编号。"""
+        return self.save_record(self.record(game), slot_id, name)
+
+    def save_record(self, record: tuple, slot_id: Optional[int] = None, name: Optional[str] = None) -> int:
+        """与 save 相同，只是内容来自 record()"""
+        with self.batch():
+            return self._write(record, slot_id, name, time.time())
+
+    def save_many(self, games: Iterable) -> List[int]:
+        """在一个事务里新建多个槽位"""
+        with self.batch():
+            now = time.time()
+            return [self._write(self.record(game), None, None, now) for game in games]
+
+    def delete(self, slot_id: int):
+        with self.batch():
+            self.conn.execute("DELETE FROM saves WHERE id = ?", (slot_id,))
+
+    def import_file(self, path: str, game) -> Optional[int]:
+        """把旧的单文件存档（JSON 或快照）导入为一个新槽位；读不出来时返回 None"""
+        if game.load_game(path) is None:
+            return None
+        return self.save(game, name=os.path.splitext(os.path.basename(path))[0])
+
+    # --- 读取 ---
+
+    def load(self, slot_id: int, game) -> Optional[List[Player]]:
+        """把槽位恢复进 game（与 Game.load_game 的返回值相同）；槽位不存在或损坏时返回 None"""
+        row = self.conn.execute("SELECT data FROM saves WHERE id = ?", (slot_id,)).fetchone()
+        if row is None:
+            return None
+        try:
+            return snapshot.restore_game(game, row[0])
+        except ValueError:
+            return None # 蛇梯配置冲突或成环
+
+    def get(self, slot_id: int) -> Optional[SaveSlot]:
+        row = self.conn.execute(f"SELECT {_COLUMNS} FROM saves WHERE id = ?", (slot_id,)).fetchone()
+        return SaveSlot(*row) if row else None
+
+    def count(self, finished: Optional[bool] = None) -> int:
+        """存档数量；由触发器维护的计数表直接给出，不扫描索引"""
+        if finished is None:
+            return self.conn.execute("SELECT SUM(n) FROM save_counts").fetchone()[0]
+        return self.conn.execute("SELECT n FROM save_counts WHERE finished = ?", (int(finished),)).fetchone()[0]
+
+    def list_slots(self, limit: int = PAGE_SIZE, after: Optional[Tuple[float, int]] = None,
+                   player: Optional[str] = None, finished: Optional[bool] = None) -> List[SaveSlot]:
+        """
+        按修改时间从新到旧列出一页槽位。
+        after 传上一页最后一项的 page_key()，即可取下一页（键集分页，不用 OFFSET）。
+        player 只列出含有该玩家的存档；finished 只列出已结束 / 未结束的存档。
+        """
+        where, params = [], []
+        if player is not None:
+            sql = (f"SELECT {', '.join('s.' + c for c in _COLUMNS.split(', '))} FROM save_players p "
+                   f"JOIN saves s ON s.id = p.save_id")
+            where.append("p.player = ?")
+            params.append(player)
+            order = "p.modified DESC, p.save_id DESC"
+            key = "(p.modified, p.save_id)"
+            if finished is not None:
+                where.append("s.finished = ?")
+                params.append(int(finished))
+        else:
+            sql = f"SELECT {_COLUMNS} FROM saves"
+            order = "modified DESC, id DESC"
+            key = "(modified, id)"
+            if finished is not None:
+                where.append("finished = ?")
+                params.append(int(finished))
+        if after is not None:
+            where.append(f"{key} < (?, ?)")
+            params += after
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += f" ORDER BY {order} LIMIT ?"
+        params.append(limit)
+        return [SaveSlot(*row) for row in self.conn.execute(sql, params)]
+
+    @staticmethod
+    def page_key(slot: SaveSlot) -> Tuple[float, int]:
+        return slot.modified, slot.id
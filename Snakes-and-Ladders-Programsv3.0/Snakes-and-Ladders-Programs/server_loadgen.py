@@ -0,0 +1,112 @@
+"""game_server 的本地压测工具：建立大量会话并并发掷骰，统计延迟分位数"""
+"""
+默认在子进程里启动服务器（监听临时 Unix socket），也可以用 --unix/--port 连接已有服务器：
+    python server_loadgen.py --sessions 10000 --connections 16 --rolls 20
+"""
+
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import tempfile
+import time
+from typing import List
+
+from game_server import GameServer
+
+
+class Client:
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.reader = reader
+        self.writer = writer
+
+    async def call(self, request: dict) -> dict:
+        self.writer.write(json.dumps(request).encode() + b"\n")
+        await self.writer.drain()
+        return json.loads(await self.reader.readline())
+
+
+async def _connect(args) -> Client:
+    if args.unix:
+        reader, writer = await asyncio.open_unix_connection(args.unix, limit=1 << 20)
+    else:
+        reader, writer = await asyncio.open_connection(args.host, args.port, limit=1 << 20)
+    return Client(reader, writer)
+
+
+async def _drive(client: Client, sessions: List[str], rolls: int, latencies: List[float]):
+    """每个连接轮流为自己负责的会话掷骰；结束的对局就不再掷"""
+    live = list(sessions)
+    for _ in range(rolls):
+        still = []
+        for sid in live:
+            start = time.perf_counter()
+            response = await client.call({"op": "roll", "session": sid})
+            latencies.append(time.perf_counter() - start)
+            if response.get("ok") and response.get("state") != "GAME_OVER":
+                still.append(sid)
+        live = still
+
+
+def _percentile(sorted_values: List[float], q: float) -> float:
+    return sorted_values[min(len(sorted_values) - 1, int(q * len(sorted_values)))]
+
+
+def _serve_forever(unix_path: str, save_dir: str):
+    """在子进程里运行服务器，避免压测客户端和服务器抢同一个事件循环"""
+    async def main():
+        server = await GameServer(save_dir).start(unix_path=unix_path)
+        async with server:
+            await server.serve_forever()
+    asyncio.run(main())
+
+
+async def run(args):
+    server_proc = None
+    if not args.unix and not args.port:
+        # 没有指定目标时，在子进程里启动一个服务器
+        tmp = tempfile.mkdtemp(prefix="sl_loadgen_")
+        args.unix = os.path.join(tmp, "server.sock")
+        server_proc = multiprocessing.Process(
+            target=_serve_forever, args=(args.unix, os.path.join(tmp, "sessions")), daemon=True)
+        server_proc.start()
+        while not os.path.exists(args.unix):
+            await asyncio.sleep(0.01)
+
+    clients = [await _connect(args) for _ in range(args.connections)]
+    start = time.perf_counter()
+    sessions = [[] for _ in clients]
+    for i in range(args.sessions):
+        client = clients[i % len(clients)]
+        response = await client.call({"op": "create", "players": ["P1", "P2", "P3", "P4"]})
+        sessions[i % len(clients)].append(response["session"])
+    create_time = time.perf_counter() - start
+
+    latencies: List[float] = []
+    start = time.perf_counter()
+    await asyncio.gather(*[_drive(c, s, args.rolls, latencies) for c, s in zip(clients, sessions)])
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    print(f"sessions={args.sessions} connections={args.connections} create={create_time:.2f}s")
+    print(f"rolls={len(latencies)} in {elapsed:.2f}s ({len(latencies) / elapsed:.0f} rolls/s)")
+    print(f"latency p50={_percentile(latencies, 0.50) * 1000:.2f}ms "
+          f"p99={_percentile(latencies, 0.99) * 1000:.2f}ms max={latencies[-1] * 1000:.2f}ms")
+
+    for c in clients:
+        c.writer.close()
+    if server_proc is not None:
+        server_proc.terminate()
+        server_proc.join()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="load generator for game_server.py")
+    parser.add_argument("--sessions", type=int, default=10000)
+    parser.add_argument("--connections", type=int, default=16)
+    parser.add_argument("--rolls", type=int, default=20, help="rolls per session")
+    parser.add_argument("--unix", help="connect to an existing server on this Unix socket")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=0, help="connect to an existing TCP server")
+    asyncio.run(run(parser.parse_args()))
@@ -1,4 +1,6 @@
 class Snake:
+    __slots__ = ("head", "tail")
+
     def __init__(self,head:int,tail:int):
         self.head=head
         self.tail=tail
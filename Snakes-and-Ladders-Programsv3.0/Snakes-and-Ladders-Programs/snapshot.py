@@ -0,0 +1,268 @@
+"""紧凑的二进制存档格式（与 JSON 存档并存）"""
+"""
+文件结构（小端）：
+    头部 16 字节: magic b"SLSV" | version u8 | flags u8 | 保留 u16 | payload 长度 u32 | payload 的 CRC32 u32
+    payload:    终点 u32 | 行数 u32 | 列数 u32 | 编号方式 u8 | current_index u8 | turn u32 |
+                规则开关 u8 | 越界规则 u8 | penalty_streak u8 | streak u8 | turn_start u32 |
+                玩家数 u8 | 蛇数 u16 | 梯子数 u16 | 字符串区长度 u16
+                每个玩家定长记录: number u8 | is_bot u8 | position
+                蛇 (head, tail) 对，然后是梯子 (bottom, top) 对
+                字符串区: 所有玩家的 名字\\0颜色\\0名字\\0颜色 ... (UTF-8)
+格子编号默认用 u16 存；终点超过 65535 时设置 FLAG_WIDE，改用 u32。
+玩家记录和蛇梯对按数量拼成一个 struct 格式，一次 pack/unpack 完成。
+规则开关按位存 choose_die / allow_skip / snakes_to_start / extra_roll，越界规则是 OVERSHOOTS 里的下标；
+streak / turn_start 是一串“再掷一次”进行到一半时的状态。
+版本 1 没有行数、列数和编号方式，读取时沿用目标棋盘的形状（终点必须一致）；
+版本 1、2 没有规则和连续次数，读取时沿用目标 Game 的规则、从新的一轮开始。
+"""
+
+import struct
+import zlib
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+from board import NUMBERINGS, OVERSHOOTS
+from player import Player
+from rules import GameRules
+
+MAGIC = b"SLSV"
+VERSION = 3
+EXTENSION = ".slsv"
+FLAG_WIDE = 0x01
+
+_HEADER = struct.Struct("<4sBBHII")
+_GAMES = {1: struct.Struct("<IBIBHHH"), 2: struct.Struct("<IIIBBIBHHH"), 3: struct.Struct("<IIIBBIBBBBIBHHH")}
+_RULE_FLAGS = ("choose_die", "allow_skip", "snakes_to_start", "extra_roll")
+_GAME = _GAMES[VERSION]
+_bodies: Dict[Tuple[int, int, bool], struct.Struct] = {}
+_rule_sets: Dict[Tuple[int, int, int], GameRules] = {}
+RESTORE_CACHE_SIZE = 64 # 最近恢复过的快照个数（见 _prepared）
+_restored: "OrderedDict[bytes, tuple]" = OrderedDict()
+
+# 棋盘形状：(行数, 列数, 编号方式)
+Shape = Tuple[int, int, str]
+
+
+class SnapshotError(ValueError):
+    """二进制存档损坏或版本不支持"""
+
+
+def _body(n_players: int, n_jumps: int, wide: bool) -> struct.Struct:
+    """玩家记录 + 蛇梯对的 struct，按 (人数, 蛇梯数, 宽度) 缓存；is_bot 用 "?" 直接解出 bool"""
+    key = (n_players, n_jumps, wide)
+    body = _bodies.get(key)
+    if body is None:
+        sq = "I" if wide else "H"
+        body = _bodies[key] = struct.Struct("<" + ("B?" + sq) * n_players + sq * (2 * n_jumps))
+    return body
+
+
+def is_snapshot(data: bytes) -> bool:
+    """只看前 4 个字节，用于自动识别存档格式"""
+    return data[:4] == MAGIC
+
+
+def validate(data: bytes) -> bool:
+    """快速校验：魔数、版本、长度和 CRC32，不解析内容"""
+    if len(data) < _HEADER.size:
+        return False
+    magic, version, _, _, length, crc = _HEADER.unpack_from(data)
+    if magic != MAGIC or not 1 <= version <= VERSION or len(data) != _HEADER.size + length:
+        return False
+    return zlib.crc32(memoryview(data)[_HEADER.size:]) == crc
+
+
+def _rules_fields(rules: GameRules) -> Tuple[int, int, int]:
+    flags = sum(1 << i for i, name in enumerate(_RULE_FLAGS) if getattr(rules, name))
+    return flags, OVERSHOOTS.index(rules.overshoot), rules.penalty_streak
+
+
+def _rules_from(flags: int, overshoot: int, penalty_streak: int) -> GameRules:
+    """
+    非法的组合（例如没有 extra_roll 却有 penalty_streak）由 GameRules 抛出 ValueError。
+    GameRules 创建后不再修改，同样的字段共用一个对象。
+    """
+    key = (flags, overshoot, penalty_streak)
+    rules = _rule_sets.get(key)
+    if rules is None:
+        on = {name: bool(flags >> i & 1) for i, name in enumerate(_RULE_FLAGS)}
+        rules = _rule_sets[key] = GameRules(on["choose_die"], on["allow_skip"], OVERSHOOTS[overshoot],
+                                            on["snakes_to_start"], on["extra_roll"], penalty_streak)
+    return rules
+
+
+def _pack(final_square: int, shape: Shape, current_index: int, turn: int, rules: GameRules, streak: int,
+          turn_start: int, players: List[Tuple[int, bool, int, str, str]], jumps: List[int], n_snakes: int) -> bytes:
+    rows, cols, numbering = shape
+    wide = final_square > 0xFFFF
+    strings = []
+    values = []
+    for number, is_bot, position, name, color in players:
+        if "\0" in name or "\0" in color:
+            raise SnapshotError("player name and color must not contain NUL")
+        strings.append(name)
+        strings.append(color)
+        values += (number, is_bot, position)
+    blob = "\0".join(strings).encode("utf-8")
+    try:
+        payload = (_GAME.pack(final_square, rows, cols, NUMBERINGS.index(numbering), current_index, turn,
+                              *_rules_fields(rules), streak, turn_start,
+                              len(players), n_snakes, len(jumps) // 2 - n_snakes, len(blob)) +
+                   _body(len(players), len(jumps) // 2, wide).pack(*values, *jumps) + blob)
+    except struct.error as e:
+        raise SnapshotError(f"value out of range for snapshot: {e}")
+    return _HEADER.pack(MAGIC, VERSION, FLAG_WIDE if wide else 0, 0, len(payload), zlib.crc32(payload)) + payload
+
+
+def capture(game) -> tuple:
+    """
+    把 Game 的存档内容拷贝成只含不可变值的元组（不做编码，很便宜）。
+    之后可以交给别的线程用 encode_captured() 编码，不会和游戏本身产生竞争。
+    """
+    jumps = []
+    for s in game.board.snakes:
+        jumps += (s.head, s.tail)
+    n_snakes = len(game.board.snakes)
+    for l in game.board.ladders:
+        jumps += (l.bottom, l.top)
+    players = [(p.number, p.is_bot, p.position, p.name, p.color) for p in game.players]
+    board = game.board
+    return (board.final_square, (board.rows, board.cols, board.numbering), game.current_index, game.turn,
+            game.rules, game.streak, game.turn_start, players, jumps, n_snakes)
+
+
+def encode_captured(state: tuple) -> bytes:
+    return _pack(*state)
+
+
+def encode_game(game) -> bytes:
+    """直接从 Game 对象编码，不经过中间的 dict"""
+    return _pack(*capture(game))
+
+
+def encode(data: dict) -> bytes:
+    """把 Game.to_dict() 结构编码成二进制快照（棋盘形状取自其中的 rows / cols / numbering）"""
+    jumps = [sq for pair in data["snakes"] for sq in pair] + [sq for pair in data["ladders"] for sq in pair]
+    players = [(p["number"], p["is_bot"], p["position"], p["name"], p["color"]) for p in data["players"]]
+    shape = (data["rows"], data["cols"], data["numbering"])
+    rules = GameRules(*data["rules"]) if "rules" in data else GameRules()
+    return _pack(data["rows"] * data["cols"], shape, data["current_index"], data["turn"], rules,
+                 data.get("streak", 0), data.get("turn_start", 0), players, jumps, len(data["snakes"]))
+
+
+def _parse(data: bytes) -> tuple:
+    """
+    校验并拆出原始字段（头部只解析一次，CRC 直接算在字节串上）：
+    (终点, 形状或 None, current_index, turn, (规则, streak, turn_start) 或 None, 玩家数, 蛇数, 定长区的值元组, 字符串列表)
+    定长区依次是每个玩家的 number / is_bot / position，然后是蛇梯的扁平格子对。
+    """
+    try:
+        magic, version, flags, _, length, crc = _HEADER.unpack_from(data)
+    except struct.error:
+        raise SnapshotError("snapshot too short")
+    if magic != MAGIC or len(data) != _HEADER.size + length or zlib.crc32(data[_HEADER.size:]) != crc:
+        raise SnapshotError("not a valid snapshot (bad magic, length or checksum)")
+    game = _GAMES.get(version)
+    if game is None:
+        raise SnapshotError(f"unsupported snapshot version {version}")
+    try:
+        if version == 1:
+            final_square, current_index, turn, n_players, n_snakes, n_ladders, n_blob = \
+                game.unpack_from(data, _HEADER.size)
+            shape = turn_state = None
+        elif version == 2:
+            final_square, rows, cols, numbering, current_index, turn, n_players, n_snakes, n_ladders, n_blob = \
+                game.unpack_from(data, _HEADER.size)
+            shape = (rows, cols, NUMBERINGS[numbering])
+            turn_state = None
+        else:
+            (final_square, rows, cols, numbering, current_index, turn, flags_rules, overshoot, penalty, streak,
+             turn_start, n_players, n_snakes, n_ladders, n_blob) = game.unpack_from(data, _HEADER.size)
+            shape = (rows, cols, NUMBERINGS[numbering])
+            turn_state = (_rules_from(flags_rules, overshoot, penalty), streak, turn_start)
+        body = _body(n_players, n_snakes + n_ladders, bool(flags & FLAG_WIDE))
+        offset = _HEADER.size + game.size
+        values = body.unpack_from(data, offset)
+        offset += body.size
+        if offset + n_blob != len(data):
+            raise SnapshotError("string table size mismatch")
+        strings = tuple(data[offset:].decode("utf-8").split("\0")) if n_blob else ()
+    except (struct.error, UnicodeDecodeError, IndexError, ValueError) as e:
+        raise SnapshotError(f"corrupted snapshot: {e}")
+    if len(strings) != 2 * n_players:
+        raise SnapshotError("string table does not match player count")
+    return final_square, shape, current_index, turn, turn_state, n_players, n_snakes, values, strings
+
+
+def _prepared(data: bytes) -> tuple:
+    """
+    restore_game 要用的字段，按快照内容缓存（字节完全相同才命中，不会读到过期的内容）：
+    (终点, 形状, current_index, turn, turn_state, 玩家 (名字, 颜色, 编号, is_bot, 位置) 元组, 扁平布局, 蛇, 梯子)
+    反复读同一份存档、日志反复从同一个检查点跳转时，校验、解包和拼格子对都只做一次。
+    """
+    prepared = _restored.get(data)
+    if prepared is None:
+        final_square, shape, current_index, turn, turn_state, n_players, n_snakes, values, strings = \
+            _parse(data)
+        split = 3 * n_players
+        players = tuple(zip(strings[0::2], strings[1::2], values[0:split:3], values[1:split:3], values[2:split:3]))
+        jumps = tuple(zip(values[split::2], values[split + 1::2]))
+        prepared = (final_square, shape, current_index, turn, turn_state, players,
+                    (n_snakes,) + values[split:], jumps[:n_snakes], jumps[n_snakes:])
+        _restored[bytes(data)] = prepared
+        if len(_restored) > RESTORE_CACHE_SIZE:
+            _restored.popitem(last=False)
+    return prepared
+
+
+def decode(data: bytes) -> dict:
+    """
+    解码为与 Game.to_dict() 相同的结构，另外带上 "final_square" 字段
+    （版本 1 没有 rows / cols / numbering，版本 1、2 没有 rules / streak / turn_start）
+    """
+    final_square, shape, current_index, turn, turn_state, n_players, n_snakes, values, strings = _parse(data)
+    split = 3 * n_players
+    jumps = list(zip(values[split::2], values[split + 1::2]))
+    data = {"final_square": final_square}
+    if shape:
+        data["rows"], data["cols"], data["numbering"] = shape
+    data["current_index"], data["turn"] = current_index, turn
+    if turn_state:
+        rules, data["streak"], data["turn_start"] = turn_state
+        data["rules"] = list(rules.key())
+    data["players"] = [{"name": name, "color": color, "number": number, "position": position, "is_bot": is_bot}
+                       for number, is_bot, position, name, color in
+                       zip(values[0:split:3], values[1:split:3], values[2:split:3], strings[0::2], strings[1::2])]
+    data["snakes"], data["ladders"] = jumps[:n_snakes], jumps[n_snakes:]
+    return data
+
+
+def restore_game(game, data: bytes) -> Optional[List[Player]]:
+    """
+    把快照直接恢复进 Game 对象（与 Game.from_dict 的结果相同）；损坏时返回 None。
+    棋盘形状不同时 game.board 换成按快照形状新建的棋盘；终点对不上时抛出 ValueError。
+    规则和连续次数（版本 3 起）一并恢复。
+    每次都新建 Player（游戏会修改它们）；布局没变时直接沿用 Board.layout，restore 不会重新编译。
+    """
+    try:
+        final_square, shape, current_index, turn, turn_state, players, flat, snakes, ladders = _prepared(data)
+    except SnapshotError:
+        return None
+    loaded = []
+    for name, color, number, is_bot, position in players:
+        player = Player(name, color, number, is_bot)
+        player.position = position
+        loaded.append(player)
+    board = game.board
+    if flat == board.layout_flat:
+        snakes, ladders = board.layout # 布局没变（最常见）
+    return game.restore(loaded, current_index, turn, snakes, ladders, shape, final_square, turn_state)
+
+
+def read(path: str) -> Optional[dict]:
+    """读取并解码一个二进制存档；文件不存在或损坏时返回 None"""
+    try:
+        with open(path, "rb") as f:
+            return decode(f.read())
+    except (OSError, SnapshotError):
+        return None
@@ -0,0 +1,124 @@
+"""SpriteCache：预处理好的精灵图（去背景、缩放、灰度）的两级缓存"""
+"""
+第一级是进程内的 LRU（OrderedDict），重新开局时直接复用已经处理好的 Image；
+第二级是磁盘上按内容寻址的文件：键由源文件内容的 SHA-1、目标尺寸、去背景容差、
+是否灰度等参数一起哈希得到，源图片一改，键就变了，旧缓存自然失效。
+磁盘文件是原始 RGBA 像素（带一个小头部），读回来不需要解码 PNG，也不做任何像素处理。
+"""
+
+import hashlib
+import os
+import struct
+from collections import OrderedDict
+from typing import Callable, Dict, Optional, Tuple
+
+from PIL import Image
+
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".sprite_cache")
+CAPACITY = 64
+"""预处理流程改变时加一，旧的磁盘缓存会全部失效"""
+FORMAT_VERSION = 1
+
+MAGIC = b"SPRT"
+_HEADER = struct.Struct("<4sII")
+_EXTENSION = ".rgba"
+
+
+class SpriteCache:
+    def __init__(self, cache_dir: Optional[str] = CACHE_DIR, capacity: int = CAPACITY):
+        """cache_dir 为 None 时只用内存缓存"""
+        self.cache_dir = cache_dir
+        self.capacity = capacity
+        self._memory: "OrderedDict[str, Image.Image]" = OrderedDict()
+        """(路径, mtime_ns, 文件大小) -> 内容哈希，同一个文件在进程里只读一次"""
+        self._digests: Dict[Tuple[str, int, int], str] = {}
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    def source_digest(self, path: str) -> str:
+        st = os.stat(path)
+        stamp = (path, st.st_mtime_ns, st.st_size)
+        digest = self._digests.get(stamp)
+        if digest is None:
+            with open(path, "rb") as f:
+                digest = self._digests[stamp] = hashlib.sha1(f.read()).hexdigest()
+        return digest
+
+    def key(self, source: str, size, tolerance: Optional[int] = None, grayscale: bool = False, *extra) -> str:
+        """
+        source 是存在的文件时按文件内容寻址；否则把它当作生成器的名字（例如程序画出来的骰子）。
+        size、tolerance、grayscale 和 extra 里的任何参数不同，都会得到不同的键。
+        """
+        origin = self.source_digest(source) if os.path.isfile(source) else source
+        parts = repr((FORMAT_VERSION, origin, size, tolerance, bool(grayscale), extra))
+        return hashlib.sha1(parts.encode("utf-8")).hexdigest()
+
+    def get(self, key: str, build: Callable[[], Optional[Image.Image]]) -> Optional[Image.Image]:
+        """依次查内存、磁盘；都没有时调用 build() 生成并写回两级缓存。build 返回 None 时不缓存。"""
+        img = self._memory.get(key)
+        if img is not None:
+            self._memory.move_to_end(key)
+            self.hits += 1
+            return img
+
+        img = self._read(key)
+        if img is not None:
+            self.disk_hits += 1
+        else:
+            img = build()
+            if img is None:
+                return None
+            self.misses += 1
+            self._write(key, img)
+
+        self._memory[key] = img
+        if len(self._memory) > self.capacity:
+            self._memory.popitem(last=False)
+        return img
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key[:2], key + _EXTENSION)
+
+    def _read(self, key: str) -> Optional[Image.Image]:
+        if not self.cache_dir:
+            return None
+        try:
+            with open(self._path(key), "rb") as f:
+                data = f.read()
+            magic, width, height = _HEADER.unpack_from(data)
+            if magic != MAGIC or len(data) != _HEADER.size + width * height * 4:
+                return None
+            return Image.frombytes("RGBA", (width, height), data[_HEADER.size:])
+        except (OSError, struct.error, ValueError):
+            return None # 没有缓存或缓存文件损坏：当作未命中
+
+    def _write(self, key: str, img: Image.Image):
+        """写临时文件再改名，多个进程同时写同一个键也不会读到半个文件"""
+        if not self.cache_dir:
+            return
+        if img.mode != "RGBA":
+            img = img.convert("RGBA")
+        path = self._path(key)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(tmp, "wb") as f:
+                f.write(_HEADER.pack(MAGIC, img.width, img.height))
+                f.write(img.tobytes())
+            os.replace(tmp, path)
+        except OSError:
+            pass # 缓存只是加速手段，写不了（只读目录、磁盘满）就算了
+
+    def clear_memory(self):
+        self._memory.clear()
+
+
+_default_cache: Optional[SpriteCache] = None
+
+def default_cache() -> SpriteCache:
+    """整个进程共用的缓存，所有 GameUI 实例共享同一个 LRU"""
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = SpriteCache()
+    return _default_cache
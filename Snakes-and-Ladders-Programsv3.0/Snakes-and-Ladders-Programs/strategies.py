@@ -0,0 +1,328 @@
+"""电脑玩家的策略：规则给出多个选项时（见 rules.py）由策略决定走几步"""
+"""
+接口只有 choose(game, rolls, options) -> 选中的步数（必须是 options 之一）；
+prepare(game) 可选，用来在开局时做好预计算，之后每一步都很快。
+
+- GreedyStrategy：选落地（含蛇梯跳转）后最靠前的格子
+- RandomStrategy：随机选，给锦标赛当基准
+- ExpectimaxStrategy：在骰子分布上做 expectimax 搜索，直接最大化自己的获胜概率。
+  对手按单人最优策略走（各玩家互不影响，这个假设下叶子上的胜率可以精确算出）；
+  越界和蛇回起点规则已经编译进落点表，掷出 6 再掷一次这类轮次规则不在模型里（近似）；
+  迭代加深直到用完每步的时间预算：到点时立即停下，用已经搜完的最深一层（加上没搜完那层里
+  已经比上一层最优更好的选项）作答；搜索结果存进有上限的置换表，跨步复用。
+"""
+
+import random
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Dict, List, Optional, Sequence, Tuple, TYPE_CHECKING
+
+from board import Board
+from dice import Dice
+from rules import GameRules
+
+if TYPE_CHECKING:
+    from game_core import Game
+
+TIME_BUDGET = 0.005 # 每步最多思考的秒数：10 ms 的目标留一半给 GC 和线程调度的抖动
+MAX_DEPTH = 12 # 迭代加深的最大层数（一层 = 一名玩家掷一次）
+TABLE_SIZE = 1 << 16 # 置换表最多保存的局面数
+SURVIVAL_EPS = 1e-7 # 剩余概率小于它时停止展开到达时间的分布
+MODEL_CACHE_SIZE = 16
+
+
+def landing(game: "Game", position: int, steps: int) -> int:
+    """从 position 走 steps 步并按规则结算越界和蛇梯后的格子（0 步就是原地）"""
+    return game.rules.land(game.board, position, steps)
+
+
+class Strategy(ABC):
+    name = "strategy"
+
+    def prepare(self, game: "Game"):
+        """开局前调用（可选）"""
+
+    @abstractmethod
+    def choose(self, game: "Game", rolls: Sequence[int], options: Sequence[int]) -> int:
+        """从 options 里选一个步数"""
+
+    def __repr__(self):
+        return f"{type(self).__name__}()"
+
+
+class GreedyStrategy(Strategy):
+    name = "greedy"
+
+    def choose(self, game, rolls, options):
+        position = game.current_player().position
+        return max(options, key=lambda steps: landing(game, position, steps))
+
+
+class RandomStrategy(Strategy):
+    name = "random"
+
+    def __init__(self, seed: Optional[int] = None):
+        self.rng = random.Random(seed)
+
+    def choose(self, game, rolls, options):
+        return self.rng.choice(list(options))
+
+
+GREEDY = GreedyStrategy()
+
+
+# --- 单人模型：期望步数、单人最优策略、到达时间的分布 ---
+
+class RaceModel:
+    """
+    一个 (棋盘, 骰子, 规则) 组合上的预计算表：
+    - moves[s]：从 s 出发的每种骰子结果 (概率, 各选项落地的格子)
+    - expected[s]：单人最优策略下到终点的期望掷骰次数（值迭代）
+    - chance[s]：按单人最优策略走时 (概率, 下一格) 的合并列表，用于对手节点
+    - survival[s][k]：从 s 出发 k 次掷骰后仍未到终点的概率
+    """
+    def __init__(self, board: Board, dice: Dice, rules: GameRules):
+        self.final = final = board.final_square
+        table = rules.table(board, dice.max_roll)
+        outcomes = rules.outcomes(dice)
+        self.moves: List[List[Tuple[float, Tuple[int, ...]]]] = [
+            [(p, tuple(table[s][steps] for steps in options)) for p, options in outcomes] for s in range(final)]
+        self.expected = self._solve_expected(rules.allow_skip)
+        self.chance = self._single_player_policy()
+        self.survival = self._survival()
+
+    def _solve_expected(self, allow_skip: bool) -> List[float]:
+        """
+        Gauss-Seidel 值迭代，从高格到低格扫描（大部分移动向前，收敛很快）。
+        允许跳过时先按“不跳过”求出一个上界，再放开跳过继续迭代，避免从 0 起步时在原地打转。
+        """
+        final = self.final
+        expected = [0.0] * (final + 1)
+        passes = (False, True) if allow_skip else (False,)
+        for with_skip in passes:
+            # 每格每种结果可去的格子（去重）；只有一个去处的结果合并成一项，扫描时不用取最小值
+            forced, choices = [], []
+            for s in range(final):
+                fixed: Dict[int, float] = {}
+                free = []
+                for p, nexts in self.moves[s]:
+                    targets = tuple(set(nexts if with_skip or not allow_skip else nexts[:-1]))
+                    if len(targets) == 1:
+                        fixed[targets[0]] = fixed.get(targets[0], 0.0) + p
+                    else:
+                        free.append((p, targets))
+                forced.append(list(fixed.items()))
+                choices.append(free)
+            for _ in range(100000):
+                delta = 0.0
+                for s in range(final - 1, -1, -1):
+                    value = 1.0
+                    for n, p in forced[s]:
+                        value += p * expected[n]
+                    for p, targets in choices[s]:
+                        value += p * min([expected[n] for n in targets])
+                    delta = max(delta, abs(value - expected[s]))
+                    expected[s] = value
+                if delta < 1e-9:
+                    break
+        return expected
+
+    def _single_player_policy(self) -> List[List[Tuple[float, int]]]:
+        expected = self.expected
+        chance = []
+        for s in range(self.final):
+            merged: Dict[int, float] = {}
+            for p, nexts in self.moves[s]:
+                # 期望相同时选更靠前的格子
+                best = min(nexts, key=lambda n: (expected[n], -n))
+                merged[best] = merged.get(best, 0.0) + p
+            chance.append([(p, n) for n, p in merged.items()])
+        return chance
+
+    def _survival(self) -> List[List[float]]:
+        final = self.final
+        current = [1.0] * final + [0.0]
+        columns = [current]
+        while max(current) >= SURVIVAL_EPS and len(columns) < 100000:
+            current = [sum(p * current[n] for p, n in self.chance[s]) for s in range(final)] + [0.0]
+            columns.append(current)
+        # 转成按格子存放，叶子估值时按格子取整行
+        return [list(row) for row in zip(*columns)]
+
+    def win_probability(self, positions: Sequence[int], mover: int, me: int) -> float:
+        """
+        轮到 mover 掷骰、各玩家都按单人最优策略走时，me 获胜的概率。
+        me 在第 k 次掷骰到达的前提下：本轮排在 me 前面的玩家前 k 次都没到，后面的前 k-1 次都没到。
+        """
+        n = len(positions)
+        survival = self.survival
+        mine = survival[positions[me]]
+        rank = (me - mover) % n
+        before = [survival[positions[j]] for j in range(n) if j != me and (j - mover) % n < rank]
+        after = [survival[positions[j]] for j in range(n) if j != me and (j - mover) % n > rank]
+        total = 0.0
+        for k in range(1, len(mine)):
+            pk = mine[k - 1] - mine[k]
+            if pk <= 0.0:
+                continue
+            for row in before:
+                pk *= row[k]
+            for row in after:
+                pk *= row[k - 1]
+            total += pk
+        return total
+
+
+_models: "OrderedDict[tuple, RaceModel]" = OrderedDict()
+
+def race_model(board: Board, dice: Dice, rules: GameRules) -> RaceModel:
+    """同一种 (布局, 骰子分布, 规则) 在进程里只预计算一次"""
+    key = (board.final_square, board.layout, tuple(dice.distribution()), rules.key())
+    model = _models.get(key)
+    if model is None:
+        model = _models[key] = RaceModel(board, dice, rules)
+        if len(_models) > MODEL_CACHE_SIZE:
+            _models.popitem(last=False)
+    else:
+        _models.move_to_end(key)
+    return model
+
+
+# --- expectimax ---
+
+class TranspositionTable:
+    """有上限的局面缓存：满了以后淘汰最久没用过的"""
+    def __init__(self, capacity: int = TABLE_SIZE):
+        self.capacity = capacity
+        self._data: "OrderedDict[tuple, float]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: tuple) -> Optional[float]:
+        value = self._data.get(key)
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+            self._data.move_to_end(key)
+        return value
+
+    def put(self, key: tuple, value: float):
+        self._data[key] = value
+        if len(self._data) > self.capacity:
+            self._data.popitem(last=False)
+
+    def clear(self):
+        self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+class _OutOfTime(Exception):
+    pass
+
+
+class ExpectimaxStrategy(Strategy):
+    name = "expectimax"
+
+    def __init__(self, time_budget: float = TIME_BUDGET, max_depth: int = MAX_DEPTH, table_size: int = TABLE_SIZE):
+        self.time_budget = time_budget
+        self.max_depth = max_depth
+        self.table = TranspositionTable(table_size)
+        self._model: Optional[RaceModel] = None
+        self._deadline = 0.0
+        """上一次决策完成的搜索深度和展开的节点数"""
+        self.last_depth = 0
+        self.last_nodes = 0
+
+    def prepare(self, game: "Game") -> RaceModel:
+        model = race_model(game.board, game.dice, game.rules)
+        if model is not self._model:
+            self.table.clear() # 换了棋盘或规则，旧局面的估值都不再成立
+            self._model = model
+        return model
+
+    def choose(self, game, rolls, options):
+        if len(options) == 1:
+            return options[0]
+        started = time.perf_counter()
+        model = self.prepare(game)
+        me = game.current_index
+        positions = tuple(p.position for p in game.players)
+        after = [(steps, landing(game, positions[me], steps)) for steps in options]
+        for steps, square in after:
+            if square == model.final:
+                return steps
+
+        nxt = (me + 1) % len(positions)
+        children = [(steps, positions[:me] + (square,) + positions[me + 1:]) for steps, square in after]
+        self._deadline = started + self.time_budget
+        self.last_nodes = 0
+        best = children[0][0]
+        for depth in range(self.max_depth + 1):
+            begun = time.perf_counter()
+            scores = []
+            try:
+                # 上一层的最优先搜：这一层没搜完时，已经搜完的选项里有比它更好的才换
+                for steps, child in children:
+                    scores.append((self._value(model, child, nxt, me, depth), steps))
+            except _OutOfTime:
+                if depth == 0: # 连叶子估值都来不及（机器极慢）：退回贪心
+                    best = GREEDY.choose(game, rolls, options)
+                elif scores:
+                    best = max(scores)[1]
+                break
+            best = max(scores)[1]
+            self.last_depth = depth
+            children.sort(key=lambda c: c[0] != best)
+            # 下一层至少要多花一个分支因子的时间，明显来不及就不开始了
+            now = time.perf_counter()
+            if now + (now - begun) * 4 > self._deadline:
+                break
+        return best
+
+    def _value(self, model: RaceModel, positions: tuple, mover: int, me: int, depth: int) -> float:
+        """轮到 mover 掷骰时 me 的获胜概率，再往下看 depth 次掷骰"""
+        key = (positions, mover, me, depth)
+        value = self.table.get(key)
+        if value is not None:
+            return value
+        self.last_nodes += 1
+        if time.perf_counter() > self._deadline:
+            raise _OutOfTime()
+        if depth == 0:
+            value = model.win_probability(positions, mover, me)
+        else:
+            final = model.final
+            nxt = (mover + 1) % len(positions)
+            head, tail = positions[:mover], positions[mover + 1:]
+            value = 0.0
+            if mover == me:
+                # 自己：每种骰子结果下取最好的选项
+                for p, nexts in model.moves[positions[mover]]:
+                    best = 0.0
+                    for square in nexts:
+                        if square == final:
+                            best = 1.0
+                            break
+                        best = max(best, self._value(model, head + (square,) + tail, nxt, me, depth - 1))
+                    value += p * best
+            else:
+                # 对手：按单人最优策略走，是机会节点；对手到达终点时 me 输
+                for p, square in model.chance[positions[mover]]:
+                    if square != final:
+                        value += p * self._value(model, head + (square,) + tail, nxt, me, depth - 1)
+        self.table.put(key, value)
+        return value
+
+    def __repr__(self):
+        return f"ExpectimaxStrategy(time_budget={self.time_budget}, table={len(self.table)}/{self.table.capacity})"
+
+
+STRATEGIES = {
+    "greedy": GreedyStrategy,
+    "random": RandomStrategy,
+    "expectimax": ExpectimaxStrategy,
+}
@@ -0,0 +1,42 @@
+"""对局日志回放与实际对局逐步一致（python -m pytest test_journal.py）"""
+
+from board import Board, DEFAULT_LADDERS, DEFAULT_SNAKES
+from dice import Dice
+from game_core import Game
+from game_state import GameState
+from journal import Journal
+from player import Player
+from rules import GameRules
+
+GAMES = 200
+MAX_STEPS = 2000
+
+
+def _state(game: Game) -> tuple:
+    return (tuple(p.position for p in game.players), game.current_index, game.turn,
+            game.state, game.streak, game.turn_start)
+
+
+def _play(seed: int, rules: GameRules):
+    """用 seed 下一局，返回日志和每一步之后的实际局面"""
+    board = Board(DEFAULT_LADDERS, DEFAULT_SNAKES)
+    game = Game(board, [Player(f"P{i}", "red", i + 1, is_bot=True) for i in range(3)], Dice(seed=seed), rules)
+    journal = Journal(checkpoint_every=8)
+    game.start_new_game()
+    game.attach_journal(journal)
+    live = []
+    while game.state != GameState.GAME_OVER and len(live) < MAX_STEPS:
+        game.take_turn()
+        live.append(_state(game))
+    return journal, live
+
+
+def test_replay_matches_live_game_with_bonus_rolls():
+    rules = GameRules(extra_roll=True, penalty_streak=2)
+    for seed in range(GAMES):
+        journal, live = _play(seed, rules)
+        replayed = [_state(game) for _, game in journal.replay()]
+        assert replayed == live, f"seed {seed}"
+        # 从检查点跳到任意一步，结果也与实际对局相同
+        for step in range(1, len(live) + 1):
+            assert _state(journal.seek(step)) == live[step - 1], f"seed {seed} step {step}"
@@ -0,0 +1,343 @@
+"""电脑策略锦标赛：循环赛或瑞士制配对，多进程对局，Elo 增量更新，可断点续跑"""
+"""
+- 参赛者是策略描述串："greedy"、"random"、"expectimax:time_budget=0.002" ...（见 make_strategy）
+- 一场对决 = 两名参赛者在一个棋盘上连下 games 局。座次每局轮换，并且第 2k 和 2k+1 局
+  用同一条骰子序列、只交换座次，先手优势和运气都互相抵消
+- 对局在进程池里跑，每场结束就按局依次更新 Elo，并把结果追加写进检查点文件（JSON Lines）
+- 进程被杀后用同一个检查点再跑：已完成的对决直接从文件读回（按文件顺序重放 Elo），不会重下；
+  瑞士制每一轮的配对只由之前各轮的结果决定，续跑时得到完全相同的配对
+"""
+
+import inspect
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from board import Board
+from dice import Dice
+from game_core import Game
+from game_state import GameState
+from player import Player
+from rules import GameRules
+from strategies import STRATEGIES, Strategy
+
+DEFAULT_RATING = 1500.0
+ELO_K = 16.0
+MAX_TURNS = 10000 # 超过这么多回合还没分出胜负就记为和局
+PAIRINGS = ("round-robin", "swiss")
+
+Layout = Tuple[Tuple[Tuple[int, int], ...], Tuple[Tuple[int, int], ...]] # Board.layout 的形状
+BoardSpec = Tuple[int, int, Layout] # (行数, 列数, 布局)：对局只关心这些，不关心格子怎么编号
+
+
+class TournamentError(ValueError):
+    """配置不合法，或检查点文件属于另一场锦标赛"""
+
+
+def make_strategy(spec: str, seed: Optional[str] = None) -> Strategy:
+    """
+    "name" 或 "name:key=value,key=value"；数值参数自动转成 int / float。
+    策略接受 seed 而描述串里没给时用这里的 seed，这样锦标赛的每一局都可以复现。
+    """
+    name, _, params = spec.partition(":")
+    cls = STRATEGIES.get(name)
+    if cls is None:
+        raise TournamentError(f"unknown strategy {name!r} (known: {', '.join(STRATEGIES)})")
+    kwargs = {}
+    for item in filter(None, params.split(",")):
+        key, sep, value = item.partition("=")
+        if not sep:
+            raise TournamentError(f"bad strategy parameter {item!r} in {spec!r}")
+        for convert in (int, float, str):
+            try:
+                kwargs[key] = convert(value)
+                break
+            except ValueError:
+                continue
+    if seed is not None and "seed" not in kwargs and "seed" in inspect.signature(cls).parameters:
+        kwargs["seed"] = seed
+    try:
+        return cls(**kwargs)
+    except TypeError as e:
+        raise TournamentError(f"{spec}: {e}")
+
+
+class Match:
+    __slots__ = ("id", "round", "board", "a", "b")
+
+    def __init__(self, round_: int, board: int, a: str, b: str):
+        self.id = f"r{round_}-b{board}-{a}-{b}"
+        self.round = round_
+        self.board = board
+        self.a = a
+        self.b = b
+
+    def __repr__(self):
+        return f"Match({self.id})"
+
+
+# --- 对局（在子进程里执行） ---
+
+_boards: Dict[BoardSpec, Board] = {}
+
+def _board(spec: BoardSpec) -> Board:
+    """每个进程里同一棋盘只编译一次"""
+    board = _boards.get(spec)
+    if board is None:
+        rows, cols, layout = spec
+        board = _boards[spec] = Board(rows=rows, cols=cols)
+        board.set_layout(*layout)
+    return board
+
+
+def play_game(board: Board, rules: GameRules, first: Strategy, second: Strategy, seed: str) -> int:
+    """下一局：返回胜者座位（0 先手，1 后手），和局返回 -1"""
+    players = [Player("first", "red", 1, is_bot=True, strategy=first),
+               Player("second", "blue", 2, is_bot=True, strategy=second)]
+    game = Game(board, players, Dice(seed=seed), rules)
+    game.start_new_game()
+    first.prepare(game)
+    second.prepare(game)
+    while game.state != GameState.GAME_OVER:
+        if game.turn >= MAX_TURNS:
+            return -1
+        game.take_turn()
+    return players.index(game.winner)
+
+
+def play_match(match_id: str, a_spec: str, b_spec: str, board_spec: BoardSpec, rules_key: Tuple,
+               games: int, seed: int) -> List[int]:
+    """
+    一场对决，返回每局的结果：0 = a 胜，1 = b 胜，-1 = 和局。
+    第 g 局的骰子种子只取决于 (锦标赛种子, 对决, g // 2)，双数局 a 先手、单数局 b 先手。
+    按时间预算搜索的策略（expectimax）搜到多深取决于机器快慢，结果不保证逐位复现。
+    """
+    board = _board(board_spec)
+    rules = GameRules(*rules_key)
+    a = make_strategy(a_spec, f"{seed}:{match_id}:a")
+    b = make_strategy(b_spec, f"{seed}:{match_id}:b")
+    results = []
+    for g in range(games):
+        dice_seed = f"{seed}:{match_id}:{g // 2}"
+        if g % 2 == 0:
+            winner = play_game(board, rules, a, b, dice_seed)
+        else:
+            winner = play_game(board, rules, b, a, dice_seed)
+            winner = -1 if winner < 0 else 1 - winner
+        results.append(winner)
+    return results
+
+
+# --- 积分 ---
+
+class Standing:
+    __slots__ = ("name", "rating", "games", "wins", "losses", "draws", "points", "byes", "opponents")
+
+    def __init__(self, name: str):
+        self.name = name
+        self.rating = DEFAULT_RATING
+        self.games = self.wins = self.losses = self.draws = self.byes = 0
+        """瑞士制的对决积分：赢一场对决 1 分，平 0.5 分，轮空 1 分"""
+        self.points = 0.0
+        self.opponents: List[str] = []
+
+
+class Ratings:
+    """Elo 评分和战绩；对决结果到达一场就更新一场"""
+    def __init__(self, entrants: Sequence[str], k: float = ELO_K):
+        self.k = k
+        self.table: Dict[str, Standing] = {name: Standing(name) for name in entrants}
+
+    def expected(self, a: str, b: str) -> float:
+        return 1.0 / (1.0 + 10 ** ((self.table[b].rating - self.table[a].rating) / 400))
+
+    def record_match(self, a: str, b: str, results: Iterable[int]):
+        sa, sb = self.table[a], self.table[b]
+        score = 0.0
+        for winner in results:
+            s = 0.5 if winner < 0 else (1.0 if winner == 0 else 0.0)
+            delta = self.k * (s - self.expected(a, b))
+            sa.rating += delta
+            sb.rating -= delta
+            score += s - 0.5
+            sa.games += 1
+            sb.games += 1
+            if winner < 0:
+                sa.draws += 1
+                sb.draws += 1
+            elif winner == 0:
+                sa.wins += 1
+                sb.losses += 1
+            else:
+                sa.losses += 1
+                sb.wins += 1
+        match_points = 1.0 if score > 0 else (0.0 if score < 0 else 0.5)
+        sa.points += match_points
+        sb.points += 1.0 - match_points
+        sa.opponents.append(b)
+        sb.opponents.append(a)
+
+    def record_bye(self, name: str):
+        self.table[name].points += 1.0
+        self.table[name].byes += 1
+
+    def standings(self) -> List[Standing]:
+        return sorted(self.table.values(), key=lambda s: (-s.rating, s.name))
+
+
+# --- 锦标赛 ---
+
+class Tournament:
+    def __init__(self,
+                 entrants: Sequence[str],
+                 boards: Sequence[Board],
+                 rules: GameRules = None,
+                 games: int = 10,
+                 pairing: str = "round-robin",
+                 rounds: int = 1,
+                 seed: int = 0,
+                 workers: int = 1,
+                 checkpoint: Optional[str] = None):
+        if len(set(entrants)) != len(entrants) or len(entrants) < 2:
+            raise TournamentError("need at least two distinct entrants")
+        if pairing not in PAIRINGS:
+            raise TournamentError(f"pairing must be one of {PAIRINGS}")
+        if not boards or games < 1 or rounds < 1:
+            raise TournamentError("need at least one board, one game per match and one round")
+        for spec in entrants:
+            make_strategy(spec) # 提前报错，不要等到子进程里
+        self.entrants = list(entrants)
+        self.boards: List[BoardSpec] = [(board.rows, board.cols, board.layout) for board in boards]
+        self.rules = rules if rules else GameRules(choose_die=True, allow_skip=True)
+        self.games = games
+        self.pairing = pairing
+        self.rounds = rounds
+        self.seed = seed
+        self.workers = workers
+        self.checkpoint = checkpoint
+        self.ratings = Ratings(self.entrants)
+        """本次运行里新下的对决数和从检查点读回的对决数"""
+        self.played = 0
+        self.resumed = 0
+
+    # --- 检查点 ---
+    def _header(self) -> dict:
+        return {"type": "tournament", "entrants": self.entrants, "boards": self.boards,
+                "rules": list(self.rules.key()), "games": self.games, "pairing": self.pairing,
+                "rounds": self.rounds, "seed": self.seed}
+
+    def _load_checkpoint(self) -> Optional[Dict[str, dict]]:
+        """
+        读回已完成的对决（dict 保持文件顺序）；没有检查点时返回 None。
+        被杀时写了一半的最后一行会被截掉，之后追加的记录才能接在完整的行后面。
+        """
+        if not self.checkpoint or not os.path.exists(self.checkpoint):
+            return None
+        records, valid = [], 0
+        with open(self.checkpoint, "rb") as f:
+            for line in f:
+                try:
+                    records.append(json.loads(line))
+                except ValueError:
+                    break
+                if not line.endswith(b"\n"):
+                    records.pop() # 最后一行没写完换行，也当作不完整
+                    break
+                valid += len(line)
+        if not records:
+            os.truncate(self.checkpoint, 0)
+            return None
+        # JSON 往返后元组会变成列表，统一比较 JSON 形式
+        if records[0] != json.loads(json.dumps(self._header())):
+            raise TournamentError(f"{self.checkpoint} belongs to a tournament with different settings")
+        if valid != os.path.getsize(self.checkpoint):
+            os.truncate(self.checkpoint, valid)
+        return {record["id"]: record for record in records[1:] if record.get("type") == "match"}
+
+    def _append(self, f, record: dict):
+        """一行一条记录，写完立即落盘：进程随时被杀也最多丢掉正在写的那一行"""
+        f.write(json.dumps(record) + "\n")
+        f.flush()
+        os.fsync(f.fileno())
+
+    # --- 配对 ---
+    def pairings(self, round_: int) -> List[Match]:
+        if self.pairing == "round-robin":
+            names = self.entrants
+            return [Match(round_, board, names[i], names[j])
+                    for board in range(len(self.boards))
+                    for i in range(len(names)) for j in range(i + 1, len(names))]
+        return self._swiss(round_)
+
+    def _swiss(self, round_: int) -> List[Match]:
+        """
+        按 (积分, Elo) 排名，从上往下给每人配排名最近、还没交过手的对手（都交过手就配最近的）。
+        人数为奇数时，排名最低且还没轮空过的人轮空。每轮换一个棋盘。
+        """
+        table = self.ratings.table
+        ranked = sorted(self.entrants, key=lambda n: (-table[n].points, -table[n].rating, n))
+        if len(ranked) % 2:
+            bye = next((n for n in reversed(ranked) if not table[n].byes), ranked[-1])
+            ranked.remove(bye)
+            self.ratings.record_bye(bye)
+        board = round_ % len(self.boards)
+        matches = []
+        while ranked:
+            a = ranked.pop(0)
+            b = next((n for n in ranked if n not in table[a].opponents), ranked[0])
+            ranked.remove(b)
+            matches.append(Match(round_, board, a, b))
+        return matches
+
+    # --- 运行 ---
+    def _job(self, match: Match):
+        return (match.id, match.a, match.b, self.boards[match.board], self.rules.key(), self.games, self.seed)
+
+    def run(self, on_result=None) -> Ratings:
+        """
+        跑完（或续跑完）整个锦标赛。on_result(match, results, ratings) 在每场对决记入后调用，
+        可以用来打印进度。
+        """
+        done = self._load_checkpoint()
+        out = None
+        if self.checkpoint:
+            out = open(self.checkpoint, "a", encoding="utf-8")
+            if done is None:
+                self._append(out, self._header())
+        done = done or {}
+        pool = ProcessPoolExecutor(max_workers=self.workers) if self.workers > 1 else None
+        try:
+            for round_ in range(self.rounds):
+                matches = self.pairings(round_)
+                # 先按文件顺序重放这一轮已完成的对决，再只下剩下的
+                for record in done.values():
+                    if record["round"] == round_:
+                        self.ratings.record_match(record["a"], record["b"], record["results"])
+                        self.resumed += 1
+                pending = [match for match in matches if match.id not in done]
+                for match, results in self._play(pool, pending):
+                    self.ratings.record_match(match.a, match.b, results)
+                    self.played += 1
+                    if out is not None:
+                        self._append(out, {"type": "match", "id": match.id, "round": match.round,
+                                           "board": match.board, "a": match.a, "b": match.b,
+                                           "results": results})
+                    if on_result is not None:
+                        on_result(match, results, self.ratings)
+        finally:
+            if pool is not None:
+                pool.shutdown(cancel_futures=True)
+            if out is not None:
+                out.close()
+        return self.ratings
+
+    def _play(self, pool, matches: List[Match]):
+        """按完成顺序产出 (对决, 结果)"""
+        if pool is None:
+            for match in matches:
+                yield match, play_match(*self._job(match))
+            return
+        futures = {pool.submit(play_match, *self._job(match)): match for match in matches}
+        for future in as_completed(futures):
+            yield futures[future], future.result()